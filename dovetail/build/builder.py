@@ -4,6 +4,7 @@ Dovetail 构建编排器
 
 职责：读取 dovetail.toml → 执行 pre_build hook → 调用编译器 → 执行 post_build hook
 编译器本身不读取 dovetail.toml，构建工具负责将配置转换为编译器命令行参数。
+常驻编译服务（dovetail serve）在线时直接交给服务编译，否则以子进程调用编译器。
 """
 from __future__ import annotations
 
@@ -13,6 +14,7 @@ from pathlib import Path
 
 from dovetail.build.config import BuildConfig
 from dovetail.build.hooks import run_hook
+from dovetail.server import CompileClient, CompileServerError, format_address
 from dovetail.utils.logger import get_logger
 from dovetail.utils.resource import IS_COMPILED
 
@@ -93,6 +95,24 @@ class Builder:
 
     # ── 编译器调用 ────────────────────────────────────────────
 
+    @staticmethod
+    def _get_compiler_command() -> list[str]:
+        """
+        获取编译器可执行文件的调用命令
+
+        Returns:
+            命令前缀，后接编译器命令行参数即可调用
+        """
+        if IS_COMPILED:
+            # 打包环境：同目录下的 dovetail.exe
+            compiler_exe = Path(sys.executable).parent / "dovetail.exe"
+            return [str(compiler_exe)]
+        else:
+            # 普通 Python 环境
+            import sys as _sys
+            _main = Path(_sys.argv[0]).resolve().parent / "main.py" # build_main和main在同目录
+            return [sys.executable, str(_main)]
+
     def _build_compiler_args(self, config: BuildConfig) -> list[str]:
         """
         将 dovetail.toml 配置转换为编译器命令行参数（DFP-604 §4.3）
@@ -101,20 +121,12 @@ class Builder:
             config: 构建配置
 
         Returns:
-            编译器命令行参数列表
+            编译器命令行参数列表（不含编译器可执行文件）
 
         Raises:
             FileNotFoundError: 入口文件不存在
         """
-        if IS_COMPILED:
-            # 打包环境：同目录下的 dovetail.exe
-            compiler_exe = Path(sys.executable).parent / "dovetail.exe"
-            args = [str(compiler_exe)]
-        else:
-            # 普通 Python 环境
-            import sys as _sys
-            _main = Path(_sys.argv[0]).resolve().parent / "main.py" # build_main和main在同目录
-            args = [sys.executable, str(_main)]
+        args: list[str] = []
 
         # 入口文件（必需）
         entry = self.project_root / config.entry
@@ -160,7 +172,7 @@ class Builder:
 
     def _invoke_compiler(self, args: list[str]) -> int:
         """
-        以子进程调用编译器（DFP-604 §2）
+        调用编译器：优先交给常驻编译服务，服务不可用时以子进程调用（DFP-604 §2）
 
         Args:
             args: 编译器命令行参数
@@ -168,9 +180,21 @@ class Builder:
         Returns:
             编译器退出码
         """
-        logger.debug(f"编译器命令: {' '.join(args)}")
+        client = CompileClient.from_env()
+        if client is not None and client.is_available():
+            logger.debug(f"通过编译服务 {format_address(client.address)} 编译: {' '.join(args)}")
+            try:
+                exit_code, output = client.compile(args, Path.cwd())
+                sys.stdout.write(output)
+                sys.stdout.flush()
+                return exit_code
+            except (OSError, ValueError, CompileServerError) as e:
+                logger.warning(f"编译服务调用失败，回退为子进程编译: {e}")
+
+        command = self._get_compiler_command() + args
+        logger.debug(f"编译器命令: {' '.join(command)}")
         try:
-            result = subprocess.run(args)
+            result = subprocess.run(command)
             return result.returncode
         except FileNotFoundError:
             logger.error("编译器可执行文件未找到")
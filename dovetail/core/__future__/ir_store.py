@@ -0,0 +1,223 @@
+# coding=utf-8
+"""
+IRStore — 紧凑数组存储的指令序列
+
+默认的 IRBuilder 以 list[IRInstruction] 保存指令，每条指令都是独立的对象，
+操作数列表和其中的 Literal 也各自占用一块堆内存。IRStore 改为并行数组：
+
+  - _opcodes:  每条指令一个字节，指向操作码表
+  - _counts:   每条指令一个字节，操作数个数（OVERFLOW 表示操作数整体存放在符号表的一项中）
+  - _operands: 每条指令 WIDTH 个槽位，指向驻留的符号表
+
+符号表按值驻留字符串、数值、枚举与 Literal，其余对象（Reference、Variable、参数字典等）按身份驻留，
+相同的操作数在整个程序中只保存一份。
+
+IRStore 实现 MutableSequence，可直接替代 IRBuilder 内部的 list：
+IRBuilderIterator、get_instructions() 的切片读写与 del 等用法保持不变。
+读取时按需构造 IRInstruction，对最近一次读取的指令原地修改操作数会在下次访问时写回；
+更早读取的指令上的原地修改不会写回，需要通过下标赋值或迭代器的 set_current 更新。
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import MutableSequence
+from enum import Enum
+from typing import Any, Iterable, Iterator, Optional
+
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.symbols import Literal
+
+__all__ = ["IRStore"]
+
+WIDTH = 4  # 每条指令内联的操作数槽位，覆盖全部位置操作数
+OVERFLOW = 0xFF  # 操作数超出槽位（含命名操作数）时的计数标记
+
+# 按值驻留的操作数类型
+_VALUE_TYPES = (str, int, float, type(None), Enum, Literal)
+_EMPTY_ROW = (0,) * WIDTH
+_new_instruction = object.__new__
+
+
+class IRStore(MutableSequence):
+    # 修改次数，供操作码索引判断是否过期
+    version = 0
+
+    def __init__(self, instructions: Iterable[IRInstruction] = ()):
+        self._opcodes = array('B')
+        self._counts = array('B')
+        self._operands = array('I')
+        self._opcode_table: list[IROpCode] = []
+        self._opcode_index: dict[IROpCode, int] = {}
+        self._table: list[Any] = []
+        self._index: dict[Any, int] = {}
+        # 最近一次读取的 (位置, 指令, 读取时的操作码, 读取时的操作数)，用于写回原地修改
+        self._last: Optional[tuple[int, IRInstruction, IROpCode, tuple]] = None
+        self.extend(instructions)
+
+    # ── 编码 ──────────────────────────────────────────────────────
+
+    def _intern(self, value: Any) -> int:
+        key: Any = id(value)
+        if isinstance(value, _VALUE_TYPES):
+            try:
+                key = (type(value), value)
+                hash(key)
+            except TypeError:
+                key = id(value)
+        index = self._index.get(key)
+        if index is None:
+            index = len(self._table)
+            self._table.append(value)
+            self._index[key] = index
+        return index
+
+    def _encode(self, instr: IRInstruction) -> tuple[int, int, tuple]:
+        opcode = self._opcode_index.get(instr.opcode)
+        if opcode is None:
+            opcode = len(self._opcode_table)
+            self._opcode_table.append(instr.opcode)
+            self._opcode_index[instr.opcode] = opcode
+        operands = instr.operands
+        if len(operands) > WIDTH or any(isinstance(op, dict) for op in operands):
+            # 操作数整体作为一项保存，元组按身份驻留
+            return opcode, OVERFLOW, (self._intern(tuple(operands)),) + _EMPTY_ROW[1:]
+        row = tuple(self._intern(op) for op in operands)
+        return opcode, len(row), row + _EMPTY_ROW[len(row):]
+
+    def _decode(self, index: int) -> IRInstruction:
+        count = self._counts[index]
+        start = index * WIDTH
+        table = self._table
+        if count == OVERFLOW:
+            operands = list(table[self._operands[start]])
+        else:
+            operands = [table[i] for i in self._operands[start:start + count]]
+        # 绕过 __init__ 的参数合并，操作数已是最终形式
+        instr = _new_instruction(IRInstruction)
+        instr.opcode = self._opcode_table[self._opcodes[index]]
+        instr.operands = operands
+        instr._hash_cache = None
+        return instr
+
+    def _write(self, index: int, instr: IRInstruction):
+        opcode, count, row = self._encode(instr)
+        self._opcodes[index] = opcode
+        self._counts[index] = count
+        self._operands[index * WIDTH:(index + 1) * WIDTH] = array('I', row)
+        self.version += 1
+
+    def _flush(self):
+        """写回最近一次读取的指令上的原地修改"""
+        if self._last is None:
+            return
+        position, instr, opcode, operands = self._last
+        self._last = None
+        if (
+                instr.opcode is not opcode or len(instr.operands) != len(operands)
+                or any(a is not b for a, b in zip(instr.operands, operands))
+        ):
+            self._write(position, instr)
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("IRStore index out of range")
+        return index
+
+    # ── MutableSequence ──────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._opcodes)
+
+    def __getitem__(self, index):
+        self._flush()
+        if isinstance(index, slice):
+            return [self._decode(i) for i in range(*index.indices(len(self)))]
+        index = self._normalize(index)
+        instr = self._decode(index)
+        self._last = (index, instr, instr.opcode, tuple(instr.operands))
+        return instr
+
+    def __setitem__(self, index, value):
+        self._flush()
+        if not isinstance(index, slice):
+            self._write(self._normalize(index), value)
+            return
+        values = list(value)
+        start, stop, step = index.indices(len(self))
+        if step != 1:
+            positions = range(start, stop, step)
+            if len(positions) != len(values):
+                raise ValueError(
+                    f"attempt to assign sequence of size {len(values)} to extended slice of size {len(positions)}"
+                )
+            for position, instr in zip(positions, values):
+                self._write(position, instr)
+            return
+        stop = max(start, stop)
+        rows = [self._encode(instr) for instr in values]
+        self._opcodes[start:stop] = array('B', (row[0] for row in rows))
+        self._counts[start:stop] = array('B', (row[1] for row in rows))
+        self._operands[start * WIDTH:stop * WIDTH] = array('I', (i for row in rows for i in row[2]))
+        self.version += 1
+
+    def __delitem__(self, index):
+        self._flush()
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                for position in sorted(range(start, stop, step), reverse=True):
+                    del self[position]
+                return
+            stop = max(start, stop)
+        else:
+            start = self._normalize(index)
+            stop = start + 1
+        del self._opcodes[start:stop]
+        del self._counts[start:stop]
+        del self._operands[start * WIDTH:stop * WIDTH]
+        self.version += 1
+
+    def insert(self, index: int, value: IRInstruction):
+        self._flush()
+        # 与 list.insert 一致，越界下标截断到两端
+        size = len(self)
+        if index < 0:
+            index = max(0, index + size)
+        index = min(index, size)
+        opcode, count, row = self._encode(value)
+        self._opcodes.insert(index, opcode)
+        self._counts.insert(index, count)
+        self._operands[index * WIDTH:index * WIDTH] = array('I', row)
+        self.version += 1
+
+    def append(self, value: IRInstruction):
+        opcode, count, row = self._encode(value)
+        self._opcodes.append(opcode)
+        self._counts.append(count)
+        self._operands.extend(row)
+        self.version += 1
+
+    def extend(self, values: Iterable[IRInstruction]):
+        for value in values:
+            self.append(value)
+
+    def __iter__(self) -> Iterator[IRInstruction]:
+        index = 0
+        while index < len(self._opcodes):
+            self._flush()
+            instr = self._decode(index)
+            self._last = (index, instr, instr.opcode, tuple(instr.operands))
+            yield instr
+            index += 1
+
+    # ── 统计 ──────────────────────────────────────────────────────
+
+    def nbytes(self) -> int:
+        """指令数组占用的字节数，不含共享的符号表"""
+        return sum(a.buffer_info()[1] * a.itemsize for a in (self._opcodes, self._counts, self._operands))
+
+    def symbol_count(self) -> int:
+        """符号表中驻留的操作数个数"""
+        return len(self._table)
@@ -10,6 +10,7 @@ from .output import (
     OutputWriter, OutputManager,
     CommandWriter, FunctionWriter, MetadataWriter, TagWriter
 )
+from .output_files import OutputFiles
 from .processor import IRProcessor, ProcessorRegistry, ir_processor
 
 __all__ = [
@@ -28,6 +29,7 @@ __all__ = [
     # 输出
     'OutputWriter',
     'OutputManager',
+    'OutputFiles',
     'CommandWriter',
     'FunctionWriter',
     'MetadataWriter',
@@ -1,19 +1,46 @@
 # coding=utf-8
 """
 后端基类
+
+指令生成可按顶层函数并行：
+    1. 主进程顺序处理所有顶层指令，遇到顶层函数作用域时只创建作用域，跳过函数体
+    2. fork 出的工作进程继承已建立的作用域树，各自生成若干函数体的指令
+    3. 主进程按函数在 IR 中的顺序合并各函数的作用域子树与共享状态，结果与顺序生成一致
 """
+import multiprocessing
+import os
 from abc import ABC, abstractmethod, ABCMeta
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Any, Optional
 
-from dovetail.core.backend.context import GenerationContext
+from dovetail.core.backend.context import GenerationContext, Scope
+from dovetail.core.backend.cost import CostAnalyzer, CostModel, CostReport
 from dovetail.core.backend.output import OutputManager
 from dovetail.core.backend.processor import ProcessorRegistry
 from dovetail.core.compile_config import CompileConfig
+from dovetail.core.config import PARALLEL_CODEGEN_MIN_INSTRUCTIONS
+from dovetail.core.enums import StructureType
+from dovetail.core.instructions import IRInstruction, IROpCode
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 工作进程通过 fork 继承的生成状态: (后端, 上下文, 指令列表, 函数单元列表)
+_worker_state: Optional[tuple['Backend', GenerationContext, list[IRInstruction], list[tuple[Scope, int, int]]]] = None
+
+# 作用域子树的可序列化形式: (指令列表, 标志, [(子作用域名, 子作用域类型, 子树), ...])
+ScopeDump = tuple[list[str], dict[str, Any], list[tuple[str, StructureType, Any]]]
+
+
+def _generate_unit(index: int) -> tuple[ScopeDump, Any]:
+    """工作进程入口：生成一个函数体，返回函数作用域子树与期间产生的共享状态变化"""
+    backend, context, instructions, units = _worker_state
+    snapshot = backend._snapshot_shared_state()
+    backend._generate_unit(context, instructions, units[index])
+    return backend._dump_scope(units[index][0]), backend._collect_shared_state(snapshot)
+
 
 class BackendMeta(ABCMeta):
     """元类，确保每个子类有独立的类属性"""
@@ -41,6 +68,8 @@ class Backend(ABC, metaclass=BackendMeta):
         self.ir_builder = ir_builder
         self.target = target
         self.config = config
+        # 最近一次生成的上下文，供生成后的分析使用
+        self.context: Optional[GenerationContext] = None
 
     @staticmethod
     @abstractmethod
@@ -67,18 +96,180 @@ class Backend(ABC, metaclass=BackendMeta):
 
     def _process_instructions(self, context: GenerationContext):
         """处理所有IR指令"""
-        for instruction in self.ir_builder:
-            if context.config.debug and instruction.opcode:
-                context.add_commands([f"# {_}" for _ in f"{instruction.opcode.value[1]}:{instruction!r}".split("\n")])
-            processor = self.processor_registry.get_processor(instruction.opcode)
+        instructions = list(self.ir_builder)
+        workers = self._get_codegen_workers(len(instructions))
+        if workers >= 2:
+            self._process_instructions_parallel(instructions, context, workers)
+            return
+
+        for instruction in instructions:
+            self._process_instruction(instruction, context)
+
+    def _process_instruction(self, instruction: IRInstruction, context: GenerationContext):
+        """处理单条IR指令"""
+        if context.config.debug and instruction.opcode:
+            context.add_commands([f"# {_}" for _ in f"{instruction.opcode.value[1]}:{instruction!r}".split("\n")])
+        processor = self.processor_registry.get_processor(instruction.opcode)
+
+        try:
+            processor.process(instruction, context)
+        except Exception as e:
+            logger.error(f"Failed to process {instruction.opcode.name}: {e.__repr__()}")
+            if self.config.debug:
+                raise
 
+    # ==================== 并行生成 ====================
+
+    @staticmethod
+    def _get_codegen_workers(instruction_count: int) -> int:
+        """
+        获取并行生成指令的工作进程数，返回值小于 2 时顺序生成
+
+        环境变量 DOVETAIL_CODEGEN_WORKERS 可强制指定进程数（0 或 1 为禁用），不是整数时警告并顺序生成
+        """
+        if not hasattr(os, "fork"):
+            # 工作进程需要继承主进程已建立的作用域树与各类注册表，只有 fork 能做到
+            return 0
+        if env := os.environ.get("DOVETAIL_CODEGEN_WORKERS"):
             try:
-                processor.process(instruction, context)
-            except Exception as e:
-                logger.error(f"Failed to process {instruction.opcode.name}: {e.__repr__()}")
-                if self.config.debug:
-                    raise
+                return int(env)
+            except ValueError:
+                logger.warning(f"DOVETAIL_CODEGEN_WORKERS 的值 '{env}' 不是整数，改为顺序生成")
+                return 0
+        if instruction_count < PARALLEL_CODEGEN_MIN_INSTRUCTIONS:
+            return 0
+        return os.cpu_count() or 1
+
+    def _process_instructions_parallel(
+            self,
+            instructions: list[IRInstruction],
+            context: GenerationContext,
+            workers: int
+    ):
+        """按顶层函数并行处理IR指令"""
+        global _worker_state
+
+        # 第一步：顺序处理顶层指令，顶层函数只创建作用域，函数体留给工作进程
+        units: list[tuple[Scope, int, int]] = []
+        index = 0
+        while index < len(instructions):
+            instruction = instructions[index]
+            self._process_instruction(instruction, context)
+            index += 1
+            if (
+                    instruction.opcode == IROpCode.SCOPE_BEGIN
+                    and instruction.operands[1] == StructureType.FUNCTION
+                    and len(context.scope_stack) == 2
+            ):
+                end = self._find_scope_end(instructions, index)
+                units.append((context.current_scope, index, end))
+                context.pop_scope()
+                index = end
+
+        if len(units) < 2:
+            for unit in units:
+                self._generate_unit(context, instructions, unit)
+            return
+
+        # 第二步：fork 工作进程生成函数体，按函数顺序合并
+        _worker_state = (self, context, instructions, units)
+        try:
+            with ProcessPoolExecutor(
+                    max_workers=min(workers, len(units)),
+                    mp_context=multiprocessing.get_context("fork")
+            ) as executor:
+                results = executor.map(_generate_unit, range(len(units)), chunksize=max(1, len(units) // (workers * 4)))
+                for (scope, _, _), (dump, state) in zip(units, results):
+                    self._load_scope(scope, dump)
+                    self._merge_shared_state(state)
+        finally:
+            _worker_state = None
+        logger.debug(f"使用 {min(workers, len(units))} 个进程并行生成了 {len(units)} 个函数")
+
+    @staticmethod
+    def _find_scope_end(instructions: list[IRInstruction], start: int) -> int:
+        """查找从 start 开始的函数体的结束位置（不含），即匹配的 SCOPE_END 之后"""
+        depth = 1
+        for index in range(start, len(instructions)):
+            opcode = instructions[index].opcode
+            if opcode == IROpCode.SCOPE_BEGIN:
+                depth += 1
+            elif opcode == IROpCode.SCOPE_END:
+                depth -= 1
+                if depth == 0:
+                    return index + 1
+        return len(instructions)
+
+    def _generate_unit(self, context: GenerationContext, instructions: list[IRInstruction], unit: tuple[Scope, int, int]):
+        """在函数作用域中生成一个函数体"""
+        scope, start, end = unit
+        context.scope_stack = [context.root_scope, scope]
+        context.current_scope = scope
+        for instruction in instructions[start:end]:
+            self._process_instruction(instruction, context)
+        context.scope_stack = [context.root_scope]
+        context.current_scope = context.root_scope
+
+    @classmethod
+    def _dump_scope(cls, scope: Scope) -> ScopeDump:
+        return (
+            scope.commands,
+            scope.flags,
+            [(child.name, child.scope_type, cls._dump_scope(child)) for child in scope.children]
+        )
+
+    @classmethod
+    def _load_scope(cls, scope: Scope, dump: ScopeDump):
+        """
+        将作用域子树写回主进程的作用域树
+
+        符号表不会被合并：函数体内的符号只在该函数体内解析，生成结束后不再使用。
+        """
+        scope.commands, scope.flags, children = dump
+        for name, scope_type, child_dump in children:
+            child = Scope(name=name, scope_type=scope_type, parent=scope)
+            scope.children.append(child)
+            cls._load_scope(child, child_dump)
+
+    def _snapshot_shared_state(self) -> Any:
+        """
+        记录进程级共享状态（如类属性中的登记表），生成函数体前调用
+
+        函数体在工作进程中生成，其中对进程级状态的修改需要由子类在
+        _collect_shared_state 中收集、在 _merge_shared_state 中合并回主进程。
+        """
+        return None
+
+    def _collect_shared_state(self, snapshot: Any) -> Any:
+        """收集生成函数体期间共享状态的变化"""
+        return None
+
+    def _merge_shared_state(self, state: Any):
+        """将工作进程中共享状态的变化合并回主进程"""
+        pass
 
     def _write_outputs(self, context: GenerationContext):
         """写入所有输出"""
+        self.context = context
         self.output_manager.write_all(context)
+
+    # ==================== 开销估算 ====================
+
+    def _collect_functions(self, context: GenerationContext) -> dict[str, list[str]]:
+        """收集生成的所有函数的命令，子类可补充内置函数等不在作用域树中的函数"""
+        return CostAnalyzer.collect_functions(context)
+
+    def _get_tick_entries(self, context: GenerationContext) -> list[tuple[str, int, int]]:
+        """获取 tick 入口的 (函数名, 执行间隔, 相位)"""
+        return []
+
+    def estimate_cost(self, model: Optional[CostModel] = None) -> CostReport:
+        """
+        估算最近一次生成的数据包的命令开销
+
+        Args:
+            model: 开销模型，不填时使用默认权重
+        """
+        if self.context is None:
+            raise RuntimeError("Backend has not generated yet")
+        return CostAnalyzer(model).analyze(self._collect_functions(self.context), self._get_tick_entries(self.context))
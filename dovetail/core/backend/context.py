@@ -9,6 +9,8 @@ from typing import Optional, Callable, Any
 
 from attrs import define, field
 
+from dovetail.core.backend.naming import NamingService
+from dovetail.core.backend.output_files import OutputSink, create_output_files
 from dovetail.core.compile_config import CompileConfig
 from dovetail.core.enums import StructureType, MinecraftVersion
 from dovetail.core.ir_builder import IRBuilder
@@ -154,9 +156,20 @@ class PackMcmeta:
                 }
             }
 
-    def save_file(self, version: MinecraftVersion):
-        with open(self.path, "wt") as f:
-            json.dump(self._pickle(version), f)
+    def save_file(self, version: MinecraftVersion, output_files: Optional[OutputSink] = None):
+        """
+        保存 pack.mcmeta
+
+        Args:
+            version: 目标游戏版本
+            output_files: 输出接收器，未提供时直接写入 path
+        """
+        content = json.dumps(self._pickle(version))
+        if output_files is not None:
+            output_files.write_text(self.path, content)
+        else:
+            with open(self.path, "wt") as f:
+                f.write(content)
 
 
 @define
@@ -169,6 +182,8 @@ class Scope:
     commands: list[str] = field(factory=list)
     symbols: dict[str, Symbol] = field(factory=dict)
     flags: dict[str, Any] = field(factory=dict)
+    # 指令处理器之间传递的分析信息，只在生成同一函数体期间使用，不写入输出
+    metadata: dict[str, Any] = field(factory=dict)
 
     def add_command(self, command: str | None):
         """添加命令"""
@@ -266,13 +281,14 @@ class GenerationContext:
     # 全局状态
     namespace: str = ""
     objective: str = "dovetail"
-    temp_var_counter: int = 0
+    names: NamingService = field(factory=NamingService)
 
     # 缓存和优化
     scope_cache: dict[str, Scope] = field(factory=dict)
 
     # 其他文件
     pack_meta: PackMcmeta = None
+    output_files: OutputSink = None
 
     def __attrs_post_init__(self):
         """初始化根作用域"""
@@ -285,6 +301,7 @@ class GenerationContext:
         self.scope_stack = [self.root_scope]
         self.scope_cache[self.namespace] = self.root_scope
         self.pack_meta = PackMcmeta(self.target / self.namespace / 'pack.mcmeta')
+        self.output_files = create_output_files(self.target / self.namespace, self.config.output_format)
 
     def create_scope(self, name: str, scope_type: StructureType) -> Scope:
         """创建新作用域"""
@@ -338,10 +355,16 @@ class GenerationContext:
 
         return result
 
+    def get_function_path(self) -> str:
+        """获取当前所在函数作用域的完整路径，不在函数内时返回根作用域路径"""
+        for scope in reversed(self.scope_stack):
+            if scope.scope_type == StructureType.FUNCTION:
+                return scope.get_absolute_path()
+        return self.root_scope.get_absolute_path()
+
     def allocate_temp_var(self, prefix: str = "temp") -> str:
-        """分配临时变量名"""
-        self.temp_var_counter += 1
-        return f"{prefix}_{self.temp_var_counter}"
+        """分配临时变量名，按所在函数计数，相同的 IR 总是得到相同的名称"""
+        return self.names.next_name(prefix, self.get_function_path())
 
     def add_command(self, command: str):
         """在当前作用域添加命令"""
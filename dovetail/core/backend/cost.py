@@ -0,0 +1,363 @@
+# coding=utf-8
+"""
+生成后命令开销估算
+
+在指令生成完成后静态分析各 mcfunction 的命令：
+    - 按命令种类（记分板、NBT 数据、函数调用、宏命令等）加权计算每个函数自身的开销
+    - 解析 `function <命名空间>:<路径>` 调用建立调用图，估算每次调用的最坏情况开销
+      （条件执行的调用视为总是执行，未知的外部函数只计调用本身）
+    - 对 tick 入口按执行间隔与相位换算为每 tick 的平均开销与峰值开销
+
+调用图中的环（循环作用域的自递归、相互递归）无法静态确定执行次数，
+环中的函数按 CostModel.loop_iterations 次迭代估算，并标记为递归。
+"""
+from __future__ import annotations
+
+import json
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+from attrs import define, field, asdict
+
+from dovetail.utils.safe_enum import SafeEnum
+
+if TYPE_CHECKING:
+    from dovetail.core.backend.context import GenerationContext
+
+# 超周期（所有 tick 间隔的最小公倍数）不超过该值时逐 tick 计算负载
+MAX_SIMULATED_PERIOD = 1 << 16
+
+
+class CommandKind(SafeEnum):
+    """命令种类"""
+    SCOREBOARD = "scoreboard"
+    DATA = "data"
+    FUNCTION = "function"
+    MACRO = "macro"
+    EXECUTE = "execute"
+    RETURN = "return"
+    OTHER = "other"
+
+
+def _default_weights() -> dict[CommandKind, int]:
+    return {
+        CommandKind.SCOREBOARD: 1,
+        CommandKind.DATA: 4,
+        CommandKind.FUNCTION: 2,
+        CommandKind.MACRO: 10,
+        CommandKind.EXECUTE: 1,
+        CommandKind.RETURN: 1,
+        CommandKind.OTHER: 2,
+    }
+
+
+@define(slots=True)
+class CostModel:
+    """
+    开销模型
+
+    Attributes:
+        weights:         命令种类 → 权重；一条命令的开销为其包含的各种类权重之和，
+                         如 `execute if … run function …` 计 EXECUTE 与 FUNCTION，宏命令另计 MACRO
+        loop_iterations: 调用图中的环按多少次迭代估算
+    """
+    weights: dict[CommandKind, int] = field(factory=_default_weights)
+    loop_iterations: int = 1
+
+
+def classify_command(command: str) -> tuple[list[CommandKind], Optional[str]]:
+    """
+    分析一条命令
+
+    Args:
+        command: 命令文本
+
+    Returns:
+        (命令包含的种类, 调用的函数名)；注释与空行返回空列表，不调用函数时函数名为 None
+    """
+    command = command.strip()
+    if not command or command.startswith("#"):
+        return [], None
+
+    kinds = []
+    callee = None
+    if command.startswith("$"):
+        kinds.append(CommandKind.MACRO)
+        command = command[1:]
+    while True:
+        head, _, rest = command.partition(" ")
+        if head == "execute":
+            kinds.append(CommandKind.EXECUTE)
+            conditions, found, command = command.partition(" run ")
+            # execute if/unless function 以函数的返回值为条件，同样调用该函数
+            _, is_call, condition = conditions.partition(" function ")
+            if is_call:
+                kinds.append(CommandKind.FUNCTION)
+                callee = condition.partition(" ")[0]
+            if not found:
+                return kinds, callee
+        elif head == "return" and rest.startswith("run "):
+            kinds.append(CommandKind.RETURN)
+            command = rest[4:]
+        else:
+            break
+
+    if head == "scoreboard":
+        kinds.append(CommandKind.SCOREBOARD)
+    elif head == "data":
+        kinds.append(CommandKind.DATA)
+    elif head == "return":
+        kinds.append(CommandKind.RETURN)
+    elif head == "function":
+        kinds.append(CommandKind.FUNCTION)
+        return kinds, rest.partition(" ")[0]
+    else:
+        kinds.append(CommandKind.OTHER)
+    return kinds, callee
+
+
+@define(slots=True)
+class FunctionCost:
+    """
+    单个函数的开销
+
+    Attributes:
+        name:      函数名（命名空间:路径）
+        commands:  自身的命令数（不含注释）
+        self_cost: 自身命令的加权开销
+        kinds:     各命令种类的出现次数
+        calls:     调用的函数，每次调用一项
+        worst_commands: 一次调用最坏情况下执行的命令数（含被调函数）
+        worst_cost:     一次调用最坏情况下的加权开销（含被调函数）
+        recursive: 是否位于调用图的环中
+    """
+    name: str
+    commands: int = 0
+    self_cost: int = 0
+    kinds: dict[str, int] = field(factory=dict)
+    calls: list[str] = field(factory=list)
+    worst_commands: int = 0
+    worst_cost: int = 0
+    recursive: bool = False
+
+
+@define(slots=True)
+class TickCost:
+    """
+    tick 入口的开销
+
+    Attributes:
+        name:     入口函数名
+        interval: 执行间隔（tick）
+        commands: 每次执行的最坏命令数
+        cost:     每次执行的最坏加权开销
+        phase:    执行相位，在 tick 计数 % interval == phase 时执行
+    """
+    name: str
+    interval: int
+    commands: int
+    cost: int
+    phase: int = 0
+
+    @property
+    def average_cost(self) -> float:
+        """平摊到每 tick 的加权开销"""
+        return self.cost / self.interval
+
+
+class CostReport:
+    """命令开销报告"""
+
+    def __init__(self, functions: dict[str, FunctionCost], ticks: list[TickCost], external: set[str]):
+        self.functions = functions
+        self.ticks = ticks
+        self.external = external
+
+    def peak_tick_cost(self) -> int:
+        """
+        最繁忙 tick 的加权开销
+
+        按各入口的间隔与相位在超周期内逐 tick 累加；超周期过长时按所有入口在同一 tick 执行估算
+        """
+        period = math.lcm(*(tick.interval for tick in self.ticks)) if self.ticks else 1
+        if period > MAX_SIMULATED_PERIOD:
+            return sum(tick.cost for tick in self.ticks)
+        load = [0] * period
+        for tick in self.ticks:
+            for index in range(tick.phase % tick.interval, period, tick.interval):
+                load[index] += tick.cost
+        return max(load)
+
+    def average_tick_cost(self) -> float:
+        """平摊到每 tick 的加权开销"""
+        return sum(tick.average_cost for tick in self.ticks)
+
+    def format_table(self, limit: int = 20) -> str:
+        """格式化为文本表格，按最坏开销降序列出前 limit 个函数与所有 tick 入口"""
+        headers = ("函数", "命令数", "自身开销", "最坏命令数", "最坏开销", "递归")
+        functions = sorted(self.functions.values(), key=lambda f: (-f.worst_cost, f.name))[:limit]
+        rows = [
+            (f.name, str(f.commands), str(f.self_cost), str(f.worst_commands), str(f.worst_cost),
+             "是" if f.recursive else "")
+            for f in functions
+        ]
+        lines = _format_rows(headers, rows)
+        if self.ticks:
+            lines.append("")
+            rows = [
+                (tick.name, str(tick.interval), str(tick.phase), str(tick.commands), str(tick.cost),
+                 f"{tick.average_cost:.1f}")
+                for tick in self.ticks
+            ]
+            rows.append(("合计", "", "", "", str(self.peak_tick_cost()), f"{self.average_tick_cost():.1f}"))
+            lines.extend(_format_rows(("tick 入口", "间隔", "相位", "最坏命令数", "峰值开销", "每 tick 开销"), rows))
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "peak_tick_cost": self.peak_tick_cost(),
+            "average_tick_cost": self.average_tick_cost(),
+            "ticks": [asdict(tick) | {"average_cost": tick.average_cost} for tick in self.ticks],
+            "functions": [asdict(function) for function in self.functions.values()],
+            "external": sorted(self.external),
+        }
+
+    def write_json(self, path: Path) -> None:
+        """写入 JSON 报告"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+
+def _format_rows(headers: tuple[str, ...], rows: list[tuple[str, ...]]) -> list[str]:
+    widths = [max(len(row[i]) for row in (headers, *rows)) for i in range(len(headers))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(headers, widths))]
+    lines.append("  ".join("-" * width for width in widths))
+    lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+    return lines
+
+
+class CostAnalyzer:
+    """命令开销分析器"""
+
+    def __init__(self, model: Optional[CostModel] = None):
+        self.model = model or CostModel()
+
+    @staticmethod
+    def collect_functions(context: GenerationContext) -> dict[str, list[str]]:
+        """收集生成上下文中所有作用域的命令，键为函数名（命名空间:路径）"""
+        return {
+            f"{context.namespace}:{scope.get_file_path().with_suffix('').as_posix()}": scope.commands
+            for scope in context.get_all_scopes()
+            if scope.has_commands()
+        }
+
+    def analyze(
+            self, functions: dict[str, list[str]], ticks: list[tuple[str, int] | tuple[str, int, int]]
+    ) -> CostReport:
+        """
+        分析命令开销
+
+        Args:
+            functions: 函数名（命名空间:路径） → 命令列表
+            ticks:     tick 入口的 (函数名, 执行间隔) 或 (函数名, 执行间隔, 相位)
+
+        Returns:
+            开销报告
+        """
+        costs = {name: self._measure(name, commands) for name, commands in functions.items()}
+        external = {callee for cost in costs.values() for callee in cost.calls if callee not in costs}
+        for component in _strongly_connected_components(costs):
+            self._accumulate(component, costs)
+
+        tick_costs = []
+        for name, interval, *phase in ticks:
+            cost = costs.get(name)
+            tick_costs.append(TickCost(
+                name, interval, cost.worst_commands if cost else 0, cost.worst_cost if cost else 0, *phase
+            ))
+        return CostReport(costs, tick_costs, external)
+
+    def _measure(self, name: str, commands: list[str]) -> FunctionCost:
+        """计算函数自身的开销"""
+        cost = FunctionCost(name)
+        for command in commands:
+            kinds, callee = classify_command(command)
+            if not kinds:
+                continue
+            cost.commands += 1
+            for kind in kinds:
+                cost.self_cost += self.model.weights[kind]
+                cost.kinds[kind.value] = cost.kinds.get(kind.value, 0) + 1
+            if callee is not None:
+                cost.calls.append(callee)
+        return cost
+
+    def _accumulate(self, component: list[str], costs: dict[str, FunctionCost]) -> None:
+        """计算一个强连通分量中函数的最坏开销，分量之外的被调函数已计算完毕"""
+        members = set(component)
+        commands = 0
+        cost = 0
+        for name in component:
+            function = costs[name]
+            commands += function.commands
+            cost += function.self_cost
+            for callee in function.calls:
+                if callee in costs and callee not in members:
+                    commands += costs[callee].worst_commands
+                    cost += costs[callee].worst_cost
+
+        recursive = len(component) > 1 or component[0] in costs[component[0]].calls
+        if recursive:
+            commands *= self.model.loop_iterations
+            cost *= self.model.loop_iterations
+        for name in component:
+            function = costs[name]
+            function.worst_commands = commands
+            function.worst_cost = cost
+            function.recursive = recursive
+
+
+def _strongly_connected_components(costs: dict[str, FunctionCost]) -> list[list[str]]:
+    """Tarjan 算法（迭代实现），按被调函数在前的顺序返回调用图的强连通分量"""
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    components: list[list[str]] = []
+
+    for root in costs:
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            name, position = work.pop()
+            if position == 0:
+                index[name] = low[name] = len(index)
+                stack.append(name)
+                on_stack.add(name)
+            calls = costs[name].calls
+            for position in range(position, len(calls)):
+                callee = calls[position]
+                if callee not in costs:
+                    continue
+                if callee not in index:
+                    work.append((name, position + 1))
+                    work.append((callee, 0))
+                    break
+                if callee in on_stack:
+                    low[name] = min(low[name], index[callee])
+            else:
+                if low[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    components.append(component)
+                if work:
+                    caller = work[-1][0]
+                    low[caller] = min(low[caller], low[name])
+    return components
@@ -0,0 +1,47 @@
+# coding=utf-8
+"""
+确定性命名服务
+
+生成的命令中用到的辅助名称（返回值路径、宏参数路径、常量池标志等）只由 IR 内容决定，
+相同的 IR 总是生成逐字节一致的数据包，输出缓存、增量写入与按差异部署才有意义：
+    - stable_hash：对文本计算稳定哈希，不受 PYTHONHASHSEED 影响
+    - next_name：按函数计数，修改一个函数不会改变其他函数中分配的名称
+"""
+import hashlib
+
+
+class NamingService:
+    """确定性命名服务"""
+
+    HASH_LENGTH = 12
+
+    def __init__(self):
+        self._counters: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def stable_hash(cls, text: str) -> str:
+        """计算文本的稳定哈希"""
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:cls.HASH_LENGTH]
+
+    def function_symbol(self, prefix: str, function_path: str) -> str:
+        """
+        获取函数专属的名称，同一函数总是得到同一名称
+
+        Args:
+            prefix: 名称前缀
+            function_path: 函数作用域的完整路径
+        """
+        return f"{prefix}_{self.stable_hash(function_path)}"
+
+    def next_name(self, prefix: str, function_path: str) -> str:
+        """
+        在函数内分配一个新名称
+
+        Args:
+            prefix: 名称前缀
+            function_path: 所在函数作用域的完整路径，不在函数内时为根作用域路径
+        """
+        key = (prefix, function_path)
+        index = self._counters.get(key, 0)
+        self._counters[key] = index + 1
+        return f"{self.function_symbol(prefix, function_path)}_{index}"
@@ -2,14 +2,14 @@
 """
 输出管理系统
 """
-import shutil
+import tempfile
 import zipfile
 from abc import ABC, abstractmethod
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, Callable, Optional
 
 from dovetail.core.backend.context import GenerationContext, Scope, DependencyFile
+from dovetail.core.backend.output_files import OutputFiles, OutputSink
 from dovetail.core.config import PROJECT_NAME, PROJECT_WEBSITE, PROJECT_VERSION
 from dovetail.utils.datapack_format import get_datapack_format
 from dovetail.utils.download_tool import download_dependencies
@@ -46,27 +46,31 @@ class CommandWriter(OutputWriter):
     """命令文件写入器"""
 
     def write(self, context: GenerationContext):
-        """写入所有mcfunction文件"""
+        """
+        写入所有mcfunction文件
+
+        函数体被优化为空的作用域仍可能被调用，同样写入（空）文件，
+        否则调用方引用了不存在的函数，整个函数在加载时被拒绝；根作用域不会被调用，为空时不写入。
+        """
         command_cnt = 0
         for scope in context.get_all_scopes():
-            if scope.has_commands():
+            if scope.has_commands() or scope.parent is not None:
                 command_cnt += self._write_scope(scope, context)
         logger.info(f"共写入 {command_cnt} 条指令")
 
     def _write_scope(self, scope: Scope, context: GenerationContext) -> int:
         """写入单个作用域的命令文件"""
         file_path = context.target / context.namespace / "data" / context.namespace / "function" / scope.get_file_path()
-        file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(file_path, 'w', encoding='utf-8') as f:
-            if context.config.debug:
-                f.write(f"# Scope: {scope.name} ({scope.scope_type.value})\n")
-                f.write(f"# Commands: {len(scope.commands)}\n")
-                f.write(f"# Time: {datetime.now()}\n")
-                f.write(f"# Maker: {PROJECT_NAME} {PROJECT_VERSION}({PROJECT_WEBSITE})\n")
-                f.write(f"# Minecraft Version: {context.config.version}\n\n")
+        content = ""
+        if context.config.debug:
+            content += f"# Scope: {scope.name} ({scope.scope_type.value})\n"
+            content += f"# Commands: {len(scope.commands)}\n"
+            content += f"# Maker: {PROJECT_NAME} {PROJECT_VERSION}({PROJECT_WEBSITE})\n"
+            content += f"# Minecraft Version: {context.config.version}\n\n"
+        content += '\n'.join(scope.commands)
 
-            f.write('\n'.join(scope.commands))
+        context.output_files.write_text(file_path, content)
         return len(scope.commands)
 
     def get_name(self) -> str:
@@ -95,13 +99,9 @@ class FunctionWriter(OutputWriter):
             self.builtin_functions.update(self.callback())
 
         function_dir: Path = context.target / context.namespace / "data" / context.namespace / "function"
-        function_dir.mkdir(parents=True, exist_ok=True)
 
         for func_name, func_content in self.builtin_functions.items():
-            func_path = function_dir / f"{func_name}.mcfunction"
-            func_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(func_path, 'w', encoding='utf-8') as f:
-                f.write(func_content)
+            context.output_files.write_text(function_dir / f"{func_name}.mcfunction", func_content)
 
     def get_name(self) -> str:
         return "function_writer"
@@ -111,13 +111,11 @@ class MetadataWriter(OutputWriter):
     """元数据写入器"""
 
     def write(self, context: GenerationContext):
-        """写入 pack.mcmeta 基本结构"""
+        """填写 pack.mcmeta 基本结构，文件由 OutputManager 在所有写入器执行后统一写入"""
         pack_format = get_datapack_format(context.config.version)
         context.pack_meta.description = context.config.description or context.namespace
         context.pack_meta.min_format = pack_format
         context.pack_meta.max_format = pack_format
-        # 写入文件
-        context.pack_meta.save_file(context.config.version)
 
     def get_name(self) -> str:
         return "metadata_writer"
@@ -140,7 +138,7 @@ class DependentDatapackWriter(OutputWriter):
             sha256 = dependency_file.sha256
 
             pack_path = download_dependencies(url, sha256)
-            name = sha256[:12] if sha256 else str(hash(url))
+            name = sha256[:12] if sha256 else context.names.stable_hash(url)
             dst = context.target / context.namespace / name
 
             if pack_path is None:
@@ -155,22 +153,29 @@ class DependentDatapackWriter(OutputWriter):
                 )
             )
 
-            if pack_path.is_file():
-                if zipfile.is_zipfile(pack_path):
-                    self._extract_zipfile(pack_path, dst)
-                else:
-                    logger.warning(f"Unknown dependency file: {pack_path}")
-            elif pack_path.is_dir():
-                shutil.copy(pack_path, dst)
-
-            # 执行 hook 事务
-            if dependency_file.hook and callable(dependency_file.hook):
-                dependency_file.hook(dst, context.config.version)
-
-        context.pack_meta.save_file(context.config.version)
+            output_files = context.output_files
+            hook = dependency_file.hook if callable(dependency_file.hook) else None
+            if hook is None:
+                self._copy_dependency(pack_path, dst, output_files)
+            else:
+                # 执行 hook 事务：hook 直接修改目录中的文件，先在临时目录中处理，再写入输出
+                with tempfile.TemporaryDirectory() as temp_dir:
+                    staging = Path(temp_dir) / name
+                    self._copy_dependency(pack_path, staging, OutputFiles(staging))
+                    hook(staging, context.config.version)
+                    output_files.copy_directory(staging, dst)
+
+    def _copy_dependency(self, pack_path: Path, dst: Path, output_files: OutputSink):
+        """将依赖数据包（.zip 或目录）写入到 dst"""
+        if pack_path.is_file():
+            if not zipfile.is_zipfile(pack_path) or not self._copy_zipfile(pack_path, dst, output_files):
+                logger.warning(f"Unknown dependency file: {pack_path}")
+        elif pack_path.is_dir():
+            output_files.copy_directory(pack_path, dst)
 
     @staticmethod
-    def _extract_zipfile(zip_path: Path, extract_to: Path) -> bool:
+    def _copy_zipfile(zip_path: Path, dst: Path, output_files: OutputSink) -> bool:
+        """将 .zip 数据包中的条目逐条写入到 dst，不经过中间解压目录"""
         with zipfile.ZipFile(zip_path) as zip_ref:
             namelist = zip_ref.namelist()
 
@@ -185,11 +190,6 @@ class DependentDatapackWriter(OutputWriter):
                     return False
 
             prefix_len = len(pack_root)
-
-            # 收集文件信息
-            files_to_extract = []
-            dirs_needed = set()
-
             for member in zip_ref.infolist():
                 if member.is_dir() or not member.filename.startswith(pack_root):
                     continue
@@ -198,39 +198,7 @@ class DependentDatapackWriter(OutputWriter):
                 if not relative_path:
                     continue
 
-                target_path = extract_to / relative_path
-                files_to_extract.append((member, target_path, member.file_size))
-                dirs_needed.add(target_path.parent)
-
-            # 批量创建目录
-            extract_to.mkdir(parents=True, exist_ok=True)
-            for d in sorted(dirs_needed, key=lambda p: len(p.parts)):
-                d.mkdir(parents=True, exist_ok=True)
-
-            # 按大小排序：先处理小文件（利用缓存局部性）
-            files_to_extract.sort(key=lambda x: x[2])
-
-            # 批量读取小文件（< 1MB）
-            small_threshold = 1048576
-            small_data = {}
-
-            for member, target, size in files_to_extract:
-                if size < small_threshold:
-                    small_data[target] = zip_ref.read(member)
-                else:
-                    break  # 已排序，后面都是大文件
-
-            # 批量写入小文件
-            for target, data in small_data.items():
-                target.write_bytes(data)
-
-            # 流式处理大文件
-            for member, target, size in files_to_extract:
-                if size >= small_threshold:
-                    buffer_size = min(2097152, max(262144, size // 10))  # 自适应 buffer
-                    with zip_ref.open(member) as src:
-                        with open(target, 'wb', buffering=buffer_size) as dst:
-                            shutil.copyfileobj(src, dst, length=buffer_size)
+                output_files.copy_zip_member(zip_ref, member, dst / relative_path)
 
             return True
 
@@ -253,7 +221,6 @@ class TagWriter(OutputWriter):
     def write(self, context: GenerationContext):
         """写入标签文件"""
         tags_dir = context.target / context.namespace / "data" / "minecraft" / "tags" / "function"
-        tags_dir.mkdir(parents=True, exist_ok=True)
 
         # 写入load标签
         if self.load_functions:
@@ -274,8 +241,7 @@ class TagWriter(OutputWriter):
             "values": values
         }
 
-        with open(path, 'w', encoding='utf-8') as f:
-            json.dump(tag_content, f, indent=2)
+        context.output_files.write_text(path, json.dumps(tag_content, indent=2))
 
     def get_name(self) -> str:
         return "tag_writer"
@@ -298,13 +264,27 @@ class OutputManager:
 
     def write_all(self, context: GenerationContext):
         """执行所有写入器"""
-        for name, writer in self.writers.items():
-            try:
-                writer.write(context)
-            except Exception as e:
-                logger.error(f"Writer {name}: {e}")
-                if context.config.debug:
-                    raise
+        output_files = context.output_files
+        failed = False
+        try:
+            for name, writer in self.writers.items():
+                try:
+                    writer.write(context)
+                except Exception as e:
+                    failed = True
+                    logger.error(f"Writer {name}: {e}")
+                    if context.config.debug:
+                        raise
+
+            # pack.mcmeta 可能被多个写入器修改（如依赖数据包添加 overlay），最后统一写入一次
+            context.pack_meta.save_file(context.config.version, output_files)
+        except BaseException:
+            output_files.abort()
+            raise
+
+        # 写入器出错时输出不完整，保留上一次生成的文件
+        output_files.finish(remove_orphans=not failed)
+        logger.info(output_files.get_summary())
 
     def get_writer(self, name: str) -> OutputWriter | None:
         """获取指定写入器"""
@@ -0,0 +1,406 @@
+# coding=utf-8
+"""
+输出文件写入
+
+写入器不直接操作文件系统，而是通过生成上下文中的输出接收器写入数据包内的文件：
+    - OutputFiles：写入目录树。每次生成时对渲染后的文件内容计算哈希，
+      与上一次生成留在目标目录中的清单（<目标目录>/<命名空间>.manifest.json）比较：
+        - 内容相同且磁盘上的文件大小与修改时间与清单记录一致：跳过写入，保持文件修改时间不变
+        - 内容不同，或文件在上一次生成后被删除、编辑：写入临时文件后原子替换
+        - 上一次生成存在而本次未生成的文件：删除
+    - ZipOutputFiles：直接流式写入单个 .zip 数据包（<目标目录>/<命名空间>.zip），不创建目录树
+"""
+import hashlib
+import json
+import os
+import secrets
+import shutil
+import stat
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from dovetail.core.config import OUTPUT_MANIFEST_FILE_PREFIX
+from dovetail.core.enums.output import OutputFormat
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_VERSION = 2
+COPY_BUFFER_SIZE = 1048576
+
+TEMP_FILE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+TEMP_FILE_ATTEMPTS = 100
+
+
+def _make_temp(path: Path) -> tuple[int, str]:
+    """
+    在目标文件同目录下创建临时文件
+
+    mkstemp 创建的文件权限固定为 0600，这里以 0666 创建，由操作系统按当前 umask 设置权限，
+    替换后与直接创建的文件一致，且不必修改进程全局的 umask 去探测它
+    """
+    for _ in range(TEMP_FILE_ATTEMPTS):
+        temp_path = str(path.parent / f".{path.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            return os.open(temp_path, TEMP_FILE_FLAGS, 0o666), temp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"无法在 '{path.parent}' 中创建临时文件")
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """
+    原子写入文件：先写入同目录下的临时文件，再替换目标文件，父目录需已存在
+
+    Args:
+        path: 文件路径
+        data: 文件内容
+    """
+    fd, temp_path = _make_temp(path)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        _unlink_quietly(temp_path)
+        raise
+
+
+def _unlink_quietly(path: str | Path) -> None:
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class OutputSink(ABC):
+    """
+    输出接收器基类
+
+    Attributes:
+        root: 数据包根目录，写入的路径均应位于此目录内
+        written: 本次实际写入的文件数
+        skipped: 本次因内容未变化而跳过的文件数
+        removed: 本次删除的孤立文件数
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.written = 0
+        self.skipped = 0
+        self.removed = 0
+
+    def _relative(self, path: Path) -> Optional[str]:
+        """获取相对于数据包根目录的路径，不在数据包目录内时返回 None"""
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    @abstractmethod
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        """
+        写入输出文件
+
+        Args:
+            path: 文件路径
+            data: 文件内容
+
+        Returns:
+            bool: 是否实际写入
+        """
+        raise NotImplementedError()
+
+    def write_text(self, path: Path, text: str) -> bool:
+        """以 UTF-8 写入文本输出文件，参见 write_bytes"""
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    @abstractmethod
+    def write_stream(self, path: Path, src: BinaryIO) -> bool:
+        """
+        从流中写入输出文件，用于不适合整体读入内存的大文件
+
+        Args:
+            path: 文件路径
+            src: 源数据流
+
+        Returns:
+            bool: 是否实际写入
+        """
+        raise NotImplementedError()
+
+    def copy_directory(self, src: Path, dst: Path) -> None:
+        """将目录中的所有文件写入到 dst 下"""
+        for file in sorted(src.rglob("*")):
+            if file.is_file():
+                with open(file, "rb") as f:
+                    self.write_stream(dst / file.relative_to(src), f)
+
+    def copy_zip_member(self, src: zipfile.ZipFile, member: zipfile.ZipInfo, path: Path) -> bool:
+        """将另一个 .zip 中的条目逐条写入，不经过中间解压目录"""
+        if member.file_size < COPY_BUFFER_SIZE:
+            return self.write_bytes(path, src.read(member))
+        with src.open(member) as f:
+            return self.write_stream(path, f)
+
+    @abstractmethod
+    def finish(self, remove_orphans: bool = True) -> None:
+        """
+        结束本次生成
+
+        Args:
+            remove_orphans: 是否删除上一次生成存在而本次未生成的文件，
+                            写入器出错时输出不完整，不应删除
+        """
+        raise NotImplementedError()
+
+    def abort(self) -> None:
+        """生成因异常中止时调用，清理未完成的输出"""
+        pass
+
+    def get_summary(self) -> str:
+        """获取本次写入统计"""
+        return f"写入 {self.written} 个文件，跳过 {self.skipped} 个内容未变化的文件，删除 {self.removed} 个孤立文件"
+
+
+class OutputFiles(OutputSink):
+    """
+    写入目录树的输出接收器，按清单跳过内容未变化的文件
+
+    清单为每个文件记录 [内容哈希, 文件大小, 修改时间(ns)]，
+    磁盘上的文件在上一次生成后被编辑或删除时大小或修改时间不再一致，会被重新写入
+
+    Attributes:
+        manifest_path: 清单文件路径
+    """
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.manifest_path = root.parent / f"{root.name}{OUTPUT_MANIFEST_FILE_PREFIX}"
+        self._previous: dict[str, list] = self._load_manifest()
+        self._current: dict[str, list] = {}
+        self._created_dirs: set[Path] = set()
+
+    def _load_manifest(self) -> dict[str, list]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"输出清单 '{self.manifest_path}' 无法读取，将重写全部文件: {e!r}")
+            return {}
+        if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        files = manifest.get("files")
+        if not isinstance(files, dict):
+            return {}
+        return {relative: entry for relative, entry in files.items() if isinstance(entry, list) and len(entry) == 3}
+
+    def _ensure_parent(self, path: Path) -> None:
+        """创建父目录，同一目录只创建一次"""
+        if path.parent not in self._created_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(path.parent)
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[list[int]]:
+        """获取磁盘上文件的 [大小, 修改时间(ns)]，不是普通文件时返回 None"""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def _is_unchanged(self, relative: str, digest: str, path: Path) -> bool:
+        """内容与清单一致且磁盘上的文件未被改动时记录到本次清单并返回 True"""
+        previous = self._previous.get(relative)
+        if previous is None or previous[0] != digest or previous[1:] != self._stat(path):
+            return False
+        self._current[relative] = previous
+        return True
+
+    def _record(self, relative: Optional[str], digest: str, path: Path) -> None:
+        """记录刚写入的文件"""
+        if relative is not None:
+            self._current[relative] = [digest, *(self._stat(path) or [-1, -1])]
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        relative = self._relative(path)
+        digest = hashlib.sha1(data).hexdigest()
+        if relative is not None and self._is_unchanged(relative, digest, path):
+            self.skipped += 1
+            return False
+
+        # 数据包目录以外的文件不纳入清单管理，但同样原子写入
+        self._ensure_parent(path)
+        write_atomic(path, data)
+        self._record(relative, digest, path)
+        self.written += 1
+        return True
+
+    def write_stream(self, path: Path, src: BinaryIO) -> bool:
+        # 边写入临时文件边计算哈希，内容未变化时丢弃临时文件
+        self._ensure_parent(path)
+        fd, temp_path = _make_temp(path)
+        try:
+            sha1 = hashlib.sha1()
+            with os.fdopen(fd, "wb") as f:
+                while chunk := src.read(COPY_BUFFER_SIZE):
+                    sha1.update(chunk)
+                    f.write(chunk)
+            relative = self._relative(path)
+            if relative is not None and self._is_unchanged(relative, sha1.hexdigest(), path):
+                _unlink_quietly(temp_path)
+                self.skipped += 1
+                return False
+            os.replace(temp_path, path)
+        except BaseException:
+            _unlink_quietly(temp_path)
+            raise
+        self._record(relative, sha1.hexdigest(), path)
+        self.written += 1
+        return True
+
+    def finish(self, remove_orphans: bool = True) -> None:
+        if remove_orphans:
+            for relative in self._previous.keys() - self._current.keys():
+                self._remove(relative)
+            manifest_files = self._current
+        else:
+            manifest_files = {**self._previous, **self._current}
+
+        self.root.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(
+            self.manifest_path,
+            json.dumps(
+                {"version": MANIFEST_VERSION, "files": dict(sorted(manifest_files.items()))},
+                indent=1
+            ).encode("utf-8")
+        )
+
+    def _remove(self, relative: str) -> None:
+        path = self.root / relative
+        # 防止被篡改的清单删除数据包目录以外的文件
+        if ".." in Path(relative).parts or Path(relative).is_absolute():
+            return
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"无法删除孤立文件 '{path}': {e!r}")
+            return
+        self.removed += 1
+
+        # 清理因此变空的目录
+        parent = path.parent
+        while parent != self.root and self.root in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                break
+            parent = parent.parent
+
+
+class ZipOutputFiles(OutputSink):
+    """
+    流式写入单个 .zip 数据包的输出接收器
+
+    先写入同目录下的临时文件，结束时原子替换目标 .zip。
+    条目时间戳固定，相同输入生成的 .zip 逐字节一致。
+
+    Attributes:
+        zip_path: 目标 .zip 文件路径
+        compression: 条目压缩方式
+    """
+
+    # zip 格式可表示的最早时间，固定时间戳使输出可复现
+    DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+    def __init__(self, root: Path, store_only: bool = False):
+        super().__init__(root)
+        self.zip_path = root.parent / f"{root.name}.zip"
+        self.compression = zipfile.ZIP_STORED if store_only else zipfile.ZIP_DEFLATED
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._temp_path: Optional[str] = None
+        self._names: set[str] = set()
+
+    def _open_entry(self, path: Path) -> Optional[zipfile.ZipInfo]:
+        """创建 zip 条目信息，路径不在数据包内或重复时返回 None"""
+        name = self._relative(path)
+        if name is None:
+            logger.warning(f"'{path}' 不在数据包目录内，无法写入 .zip")
+            return None
+        if name in self._names:
+            logger.warning(f"重复写入 .zip 条目 '{name}'，保留第一次写入的内容")
+            return None
+        self._names.add(name)
+
+        if self._zip is None:
+            self.zip_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, self._temp_path = _make_temp(self.zip_path)
+            os.close(fd)
+            self._zip = zipfile.ZipFile(self._temp_path, "w", self.compression)
+
+        info = zipfile.ZipInfo(name, date_time=self.DATE_TIME)
+        info.compress_type = self.compression
+        info.external_attr = 0o644 << 16
+        return info
+
+    def write_bytes(self, path: Path, data: bytes) -> bool:
+        info = self._open_entry(path)
+        if info is None:
+            return False
+        self._zip.writestr(info, data)
+        self.written += 1
+        return True
+
+    def write_stream(self, path: Path, src: BinaryIO) -> bool:
+        info = self._open_entry(path)
+        if info is None:
+            return False
+        with self._zip.open(info, "w", force_zip64=True) as dst:
+            shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+        self.written += 1
+        return True
+
+    def finish(self, remove_orphans: bool = True) -> None:
+        if self._zip is None:
+            return
+        self._zip.close()
+        os.replace(self._temp_path, self.zip_path)
+        self._zip = None
+        self._temp_path = None
+
+    def abort(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+            _unlink_quietly(self._temp_path)
+            self._zip = None
+            self._temp_path = None
+
+    def get_summary(self) -> str:
+        return f"写入 {self.written} 个文件到 '{self.zip_path}'"
+
+
+def create_output_files(root: Path, output_format: OutputFormat) -> OutputSink:
+    """
+    按输出格式创建输出接收器
+
+    Args:
+        root: 数据包根目录
+        output_format: 输出格式
+
+    Returns:
+        OutputSink: 输出接收器
+    """
+    if output_format == OutputFormat.ZIP:
+        return ZipOutputFiles(root)
+    if output_format == OutputFormat.ZIP_STORED:
+        return ZipOutputFiles(root, store_only=True)
+    return OutputFiles(root)
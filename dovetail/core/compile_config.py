@@ -5,11 +5,13 @@
 该文件提供编译器配置类，用于记录每次编译任务的配置信息
 """
 from pathlib import Path
+from typing import Optional
 
 from attrs import define
 
 from dovetail.core.enums.minecraft import MinecraftVersion
 from dovetail.core.enums.optimization import OptimizationLevel
+from dovetail.core.enums.output import OutputFormat
 
 
 @define(slots=True, hash=True)
@@ -28,6 +30,10 @@ class CompileConfig:
         experimental (bool): 启用实验性功能开关
         lib_path (Path): 库文件路径
         description (str): 数据包描述
+        output_format (OutputFormat): 数据包输出格式
+        instrument (bool): 为生成的每个函数插入执行计数器
+        profile_path (Optional[Path]): 执行计数导出文件路径，用于基于运行数据的优化
+        unroll_factor (int): 常量循环部分展开的倍数，小于 2 时不部分展开
     """
     namespace: str
     optimization_level: OptimizationLevel
@@ -39,3 +45,7 @@ class CompileConfig:
     experimental: bool = False
     lib_path: Path = Path("lib").resolve()
     description: str = ""
+    output_format: OutputFormat = OutputFormat.DIRECTORY
+    instrument: bool = False
+    profile_path: Optional[Path] = None
+    unroll_factor: int = 4
@@ -19,6 +19,8 @@ PROJECT_LICENSE = "Apache 2.0"
 FILE_PREFIX = ".mcdl"
 CACHE_FILE_PREFIX = ".mcdc"
 IR_CACHE_FILE_PREFIX = ".mcdo"
+MODULE_CACHE_FILE_PREFIX = ".mcdm"
+OUTPUT_MANIFEST_FILE_PREFIX = ".manifest.json"
 
 # 杂项
 MAX_FILE_SIZE = 1024 * 1024 * 1024  # 最大允许单个文件1GB大小
@@ -26,6 +28,9 @@ FAST_MODE = True  # 禁用一些编译器的内部类型检查以加速代码运
 ENABLE_INSTRUCTION_VALIDATION = True  # 启用IR指令类型效验，当 FAST_MODE 开启时无效
 USE_FUTURE_IR_BUILDER = False # 启用基于链表的 IR 指令构建器，实测速度没有提高，不值得开启
 USE_FUTURE_IR_OP_CODE = False # 启用新版 IROpCode 实现
+USE_COMPACT_IR_STORE = False  # IRBuilder 以紧凑数组（IRStore）保存指令，内存占用更小，读取时需要重新构造指令对象
+ENABLE_MODULE_CACHE = True  # 缓存被包含文件的 IR 片段与导出符号（.mcdm），命中时跳过访问
+PARALLEL_CODEGEN_MIN_INSTRUCTIONS = 5000  # IR 指令数达到该值时后端按顶层函数并行生成指令（需要 fork）
 
 # 默认错误建议列表
 DEFAULT_SUGGESTIONS: list[str] = [
@@ -17,6 +17,8 @@ from .operations import (
 )
 # 优化相关枚举
 from .optimization import OptimizationLevel
+# 输出相关枚举
+from .output import OutputFormat
 # 类型系统枚举
 from .types import (
     StructureType,
@@ -45,6 +47,9 @@ __all__ = [
     # 优化
     'OptimizationLevel',
 
+    # 输出
+    'OutputFormat',
+
     # Minecraft
     'MinecraftEdition',
     'MinecraftVersion'
@@ -0,0 +1,23 @@
+# coding=utf-8
+"""
+Dovetail 输出相关枚举模块
+
+此模块包含数据包输出格式的定义。
+"""
+from __future__ import annotations
+
+from dovetail.utils.safe_enum import SafeEnum
+
+
+class OutputFormat(SafeEnum):
+    """
+    数据包输出格式
+
+    Attributes:
+        DIRECTORY: 输出为目录树，配合输出清单增量写入
+        ZIP: 直接流式写入单个 .zip 数据包（Deflate 压缩）
+        ZIP_STORED: 同 ZIP，但仅存储不压缩，写入更快
+    """
+    DIRECTORY = "directory"
+    ZIP = "zip"
+    ZIP_STORED = "zip-stored"
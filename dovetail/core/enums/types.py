@@ -94,9 +94,11 @@ class VariableType(SafeEnum):
     Attributes:
         PARAMETER: 函数参数变量
         COMMON: 普通局部变量
+        TEMPORARY: 编译器生成的临时变量，可由寄存器分配合并存储位置
     """
     PARAMETER = "parameter"
     COMMON = "common"
+    TEMPORARY = "temporary"
 
 
 class ClassType(SafeEnum):
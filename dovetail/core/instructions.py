@@ -245,6 +245,14 @@ class IRInstruction:
             return False
         return all(a == b for a, b in zip(self.operands, other.operands))
 
+    def __getstate__(self):
+        # 哈希缓存依赖进程内的 id/字符串哈希，不能随 pickle 持久化
+        return self.opcode, self.operands
+
+    def __setstate__(self, state):
+        self.opcode, self.operands = state
+        self._hash_cache = None
+
     def _flatten_nested(self, obj) -> tuple | int:
         """递归处理嵌套结构"""
         if isinstance(obj, (list, tuple)):
@@ -1,43 +1,89 @@
 # coding=utf-8
 from typing import SupportsIndex, Optional, Iterator
 
-from dovetail.core.config import USE_FUTURE_IR_BUILDER
+from dovetail.core.config import USE_FUTURE_IR_BUILDER, USE_COMPACT_IR_STORE
 from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.opcode_index import InstructionList, OpcodeIndex
 
 if USE_FUTURE_IR_BUILDER:
     from dovetail.core.__future__.ir_builder import *
 else:
+    if USE_COMPACT_IR_STORE:
+        from dovetail.core.__future__.ir_store import IRStore
+
+
     class IRBuilder:
         def __init__(self):
-            self._instructions: list[IRInstruction] = []
+            self._instructions: list[IRInstruction] = IRStore() if USE_COMPACT_IR_STORE else InstructionList()
+            self._opcode_index = OpcodeIndex(self._instructions)
+            # 存在未提交修改的迭代器，访问指令序列前先统一提交
+            self._editors: list[IREditBufferIterator] = []
+
+        def _commit_edits(self):
+            """提交迭代器中缓冲的删除与插入"""
+            if self._editors:
+                editors, self._editors = self._editors, []
+                for editor in editors:
+                    editor.commit()
 
         def insert(self, instr: IRInstruction, index: Optional[SupportsIndex] = None):
+            self._commit_edits()
             if index is None:
                 # 默认插入到末尾
                 self._instructions.append(instr)
+                self._opcode_index.appended(instr)
             else:
                 # 使用整数索引插入
                 self._instructions.insert(index, instr)
+
         def extend(self, instrs: Iterator[IRInstruction]):
+            self._commit_edits()
             self._instructions.extend(instrs)
 
         def get_instructions(self):
+            self._commit_edits()
             return self._instructions
 
         def peek(self) -> IRInstruction:
+            self._commit_edits()
             return self._instructions[-1]
 
         def __iter__(self):
-            return IRBuilderIterator(self._instructions)
+            self._commit_edits()
+            return IREditBufferIterator(self._instructions, self, self._opcode_index)
+
+        def iter_opcode(self, *opcodes: IROpCode) -> 'IROpcodeIterator':
+            """
+            只迭代指定操作码的指令
+
+            迭代期间可以像普通迭代器一样替换、删除当前指令或在其后插入指令，
+            插入的指令不会被本次迭代访问
+
+            Args:
+                opcodes: 需要访问的操作码
+
+            Returns:
+                按指令顺序访问的迭代器
+            """
+            self._commit_edits()
+            return IROpcodeIterator(self._instructions, self._opcode_index, opcodes)
+
+        def opcode_positions(self, *opcodes: IROpCode) -> list[int]:
+            """获取指定操作码的指令位置（升序）"""
+            self._commit_edits()
+            return self._opcode_index.positions(*opcodes)
 
         def __reversed__(self):
             """返回可反转迭代器"""
+            self._commit_edits()
             return IRBuilderReverseIterator(self._instructions)
 
         def __len__(self):
+            self._commit_edits()
             return len(self._instructions)
 
         def __getitem__(self, index):
+            self._commit_edits()
             return self._instructions[index]
 
         def print(self):
@@ -52,9 +98,15 @@ else:
 
 
     class IRBuilderIterator:
-        def __init__(self, instructions: list[IRInstruction], index: int = 0):
+        def __init__(
+                self,
+                instructions: list[IRInstruction],
+                index: int = 0,
+                opcode_index: Optional[OpcodeIndex] = None
+        ):
             self.instructions = instructions
             self.index = index
+            self.opcode_index = opcode_index
             self._last_index = -1  # 跟踪最后返回的指令索引
             self._pending_removes: set[int] = set()  # 新增
 
@@ -108,7 +160,10 @@ else:
             if self._last_index == -1:
                 raise IndexError(
                     "No current instruction to remove (call next() first)")
+            old = self.instructions[self._last_index]
             self.instructions[self._last_index] = instr
+            if self.opcode_index is not None:
+                self.opcode_index.replaced(self._last_index, old, instr)
 
         def remove_current(self) -> IRInstruction:
             """
@@ -174,6 +229,188 @@ else:
             self.rollback()
 
 
+    class IREditBufferIterator(IRBuilderIterator):
+        """
+        缓冲修改的迭代器，IRBuilder.__iter__ 返回该迭代器
+
+        直接在 list 上 pop/insert 每次都要搬移其后的全部指令，一次遍历中大量删除时整体为 O(n²)。
+        本迭代器不立即修改指令序列：删除记为墓碑，插入暂存在插入位置对应的缓冲中，
+        迭代结束或 IRBuilder 下次被访问时一次性重建序列，单次遍历的修改总开销为 O(n)。
+
+        访问顺序与立即修改时完全相同（insert_here/insert_after_current 插入的指令会在下一次被访问），
+        rollback、remove_at 等按下标操作的方法会先提交缓冲的修改，再按立即修改的方式执行。
+
+        Attributes:
+            index: 下一条要访问的原序列位置，该位置之前的插入缓冲尚未访问完时从缓冲中继续
+        """
+
+        def __init__(
+                self,
+                instructions: list[IRInstruction],
+                builder: IRBuilder,
+                opcode_index: Optional[OpcodeIndex] = None
+        ):
+            super().__init__(instructions, opcode_index=opcode_index)
+            self.builder = builder
+            # 原序列位置 → 插入在该位置之前的指令
+            self._pending: dict[int, list[IRInstruction]] = {}
+            # 被删除的原序列位置
+            self._removed: set[int] = set()
+            # 下一条要访问的指令在 _pending[index] 中的下标，等于其长度时访问原序列中的指令
+            self._offset = 0
+            # 当前指令在 _pending[_last_index] 中的下标，None 表示当前指令在原序列中
+            self._last_offset: Optional[int] = None
+
+        def __next__(self):
+            if self._pending:
+                pending = self._pending.get(self.index)
+                if pending is not None and self._offset < len(pending):
+                    self._last_index = self.index
+                    self._last_offset = self._offset
+                    self._offset += 1
+                    return pending[self._last_offset]
+            if self.index >= len(self.instructions):
+                self.commit()
+                raise StopIteration
+
+            self._last_index = self.index
+            self._last_offset = None
+            self.index += 1
+            self._offset = 0
+            return self.instructions[self._last_index]
+
+        def _track(self):
+            if not self._pending and not self._removed:
+                self.builder._editors.append(self)
+
+        def _require_current(self):
+            if self._last_index == -1:
+                raise IndexError("No current instruction (call next() first)")
+
+        def current(self) -> IRInstruction:
+            self._require_current()
+            if self._last_offset is not None:
+                return self._pending[self._last_index][self._last_offset]
+            return self.instructions[self._last_index]
+
+        def set_current(self, instr: IRInstruction):
+            self._require_current()
+            if self._last_offset is not None:
+                self._pending[self._last_index][self._last_offset] = instr
+            else:
+                super().set_current(instr)
+
+        def remove_current(self) -> IRInstruction:
+            self._require_current()
+            self._track()
+            if self._last_offset is not None:
+                removed = self._pending[self._last_index].pop(self._last_offset)
+                if self.index == self._last_index and self._offset > self._last_offset:
+                    self._offset -= 1
+            else:
+                removed = self.instructions[self._last_index]
+                self._removed.add(self._last_index)
+            self._last_index = -1
+            self._last_offset = None
+            return removed
+
+        def insert_here(self, instruction: IRInstruction) -> None:
+            self._track()
+            self._pending.setdefault(self.index, []).insert(self._offset, instruction)
+
+        def insert_after_current(self, instruction: IRInstruction) -> None:
+            self._require_current()
+            self._track()
+            if self._last_offset is not None:
+                self._pending[self._last_index].insert(self._last_offset + 1, instruction)
+            else:
+                self._pending.setdefault(self._last_index + 1, []).insert(0, instruction)
+
+        def peek(self) -> IRInstruction:
+            pending = self._pending.get(self.index)
+            if pending is not None and self._offset < len(pending):
+                return pending[self._offset]
+            return super().peek()
+
+        def commit(self) -> None:
+            """按缓冲的删除与插入重建指令序列，并把迭代位置换算到重建后的序列上"""
+            if not self._pending and not self._removed:
+                return
+            instructions = self.instructions
+            rebuilt: list[IRInstruction] = []
+            index = last_index = -1
+            for position in range(len(instructions) + 1):
+                pending = self._pending.get(position, ())
+                for offset, instr in enumerate(pending):
+                    if position == self.index and offset == self._offset:
+                        index = len(rebuilt)
+                    if position == self._last_index and offset == self._last_offset:
+                        last_index = len(rebuilt)
+                    rebuilt.append(instr)
+                if position == self.index and index == -1:
+                    index = len(rebuilt)
+                if position < len(instructions) and position not in self._removed:
+                    if position == self._last_index and self._last_offset is None:
+                        last_index = len(rebuilt)
+                    rebuilt.append(instructions[position])
+            instructions[:] = rebuilt
+
+            self.index = len(rebuilt) if index == -1 else index
+            self._last_index = last_index
+            self._last_offset = None
+            self._offset = 0
+            self._pending.clear()
+            self._removed.clear()
+            if self in self.builder._editors:
+                self.builder._editors.remove(self)
+
+        def rollback(self, steps=1):
+            self.commit()
+            super().rollback(steps)
+
+        def remove_at(self, index: int) -> IRInstruction:
+            self.commit()
+            return super().remove_at(index)
+
+        def __reversed__(self):
+            self.commit()
+            return super().__reversed__()
+
+
+    class IROpcodeIterator(IRBuilderIterator):
+        """
+        只访问指定操作码的迭代器
+
+        按迭代开始时索引中的位置访问，通过本迭代器在当前位置的删除与插入会平移其后的位置；
+        迭代期间不能经由其他途径修改指令序列
+        """
+
+        def __init__(
+                self,
+                instructions: list[IRInstruction],
+                opcode_index: OpcodeIndex,
+                opcodes: tuple[IROpCode, ...]
+        ):
+            super().__init__(instructions, opcode_index=opcode_index)
+            self._positions = opcode_index.positions(*opcodes)
+            self._cursor = 0
+            self._shift = 0
+            self._size = len(instructions)
+
+        def __next__(self):
+            # 上一条指令处的删除与插入都发生在尚未访问的位置之前
+            self._shift += len(self.instructions) - self._size
+            self._size = len(self.instructions)
+            if self._cursor >= len(self._positions):
+                raise StopIteration
+
+            index = self._positions[self._cursor] + self._shift
+            self._cursor += 1
+            self._last_index = index
+            self.index = index + 1
+            return self.instructions[index]
+
+
     class IRBuilderReverseIterator:
         """反向迭代器类"""
 
@@ -206,4 +443,4 @@ else:
                 forward_start_index = len(self.instructions)
             return IRBuilderIterator(self.instructions, forward_start_index)
 
-__all__ = ["IRBuilder", "IRBuilderIterator", "IRBuilderReverseIterator"]
+__all__ = ["IRBuilder", "IRBuilderIterator", "IREditBufferIterator", "IROpcodeIterator", "IRBuilderReverseIterator"]
@@ -61,6 +61,7 @@ def builtin_func(
         *,
         name: Optional[str] = None,
         defaults: Optional[dict[str, Any]] = None,
+        pure: bool = False,
 ) -> Callable:
     """
     声明一个 BUILTIN 类型的库函数。
@@ -71,12 +72,14 @@ def builtin_func(
         returns:  返回类型，默认 VOID
         name:     覆盖函数名（默认用方法名，传入原始函数名即可，无需修饰名称）
         defaults: 可选参数的默认字面量值 {param_name: value}
+        pure:     是否为纯函数：结果只取决于参数，且没有副作用，优化时可以移动或合并调用
     """
     return _make_decorator(
         returns=_resolve_type(returns),
         is_builtin=True,
         name=name,
         defaults=defaults or {},
+        pure=pure,
     )
 
 
@@ -101,6 +104,7 @@ def library_func(
         is_builtin=False,
         name=name,
         defaults=defaults or {},
+        pure=False,
     )
 
 
@@ -127,6 +131,7 @@ def _make_decorator(
         is_builtin: bool,
         name: Optional[str],
         defaults: dict[str, Any],
+        pure: bool,
 ) -> Callable:
     def decorator(method: Callable) -> Callable:
         setattr(method, _META_KEY, {
@@ -134,6 +139,7 @@ def _make_decorator(
             "is_builtin": is_builtin,
             "name": name,  # None 表示用方法名
             "defaults": defaults,
+            "pure": pure,
         })
         return method
 
@@ -238,7 +244,7 @@ class LibraryBase(Library):
             func_type = FunctionType.BUILTIN if is_builtin else FunctionType.LIBRARY
             handler = None if is_builtin else method
 
-            self._functions[Function(func_name, params, returns, func_type)] = handler
+            self._functions[Function(func_name, params, returns, func_type, pure=meta["pure"])] = handler
 
     def _extract_params(
             self,
@@ -11,11 +11,11 @@ class Math(LibraryBase):
     def __str__(self) -> str:
         return "math"
 
-    @builtin_func(returns=int)
+    @builtin_func(returns=int, pure=True)
     def abs(self, value: int): ...
 
-    @builtin_func(returns=int)
+    @builtin_func(returns=int, pure=True)
     def min(self, a: int, b: int): ...
 
-    @builtin_func(returns=int)
+    @builtin_func(returns=int, pure=True)
     def max(self, a: int, b: int): ...
\ No newline at end of file
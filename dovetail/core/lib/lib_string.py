@@ -19,11 +19,11 @@ class Strlib(LibraryBase):
         b: Reference[Variable | Literal]
         return self.emitter.emit_binary_calc(a, BinaryOps.ADD, b, "strcat")
 
-    @builtin_func(name="strcat_fast")
+    @builtin_func(name="strcat_fast", pure=True)
     def _strcat_fast(self, a: str, b: str) -> str: ...
 
-    @builtin_func(name="strlen")
+    @builtin_func(name="strlen", pure=True)
     def _strlen(self, s: str) -> int: ...
 
-    @builtin_func(name="substring")
+    @builtin_func(name="substring", pure=True)
     def _substring(self, s: str, start: int, end: int) -> str: ...
@@ -0,0 +1,132 @@
+# coding=utf-8
+"""
+IRBuilder 的操作码索引
+
+只关心少数操作码的 Pass（如内建函数常量折叠只处理 CALL）原本需要遍历全部指令，
+OpcodeIndex 维护 操作码 → 指令位置（升序）的二级索引，使这类 Pass 的开销只与相关指令数成正比。
+
+索引与指令序列的同步方式：
+  - 指令序列（InstructionList / IRStore）在每次修改时递增 version
+  - 末尾追加与原位替换由 IRBuilder / 迭代器直接更新索引
+  - 中间插入、删除以及通过 get_instructions() 的任意修改只使索引过期，下次查询时整体重建一次；
+    逐次平移其后所有位置的开销与 list 的搬移相同却慢得多，不如在一个 Pass 结束后统一重建
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Iterable, SupportsIndex
+
+from dovetail.core.instructions import IRInstruction, IROpCode
+
+
+class InstructionList(list):
+    """记录修改次数的指令列表，version 变化说明操作码索引可能过期"""
+
+    # 类属性作为默认值，反序列化时在恢复实例属性之前就会追加元素
+    version = 0
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self.version += 1
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self.version += 1
+
+    def __iadd__(self, other):
+        self.version += 1
+        return super().__iadd__(other)
+
+    def __imul__(self, n):
+        self.version += 1
+        return super().__imul__(n)
+
+    def append(self, value: IRInstruction):
+        super().append(value)
+        self.version += 1
+
+    def extend(self, iterable: Iterable[IRInstruction]):
+        super().extend(iterable)
+        self.version += 1
+
+    def insert(self, index: SupportsIndex, value: IRInstruction):
+        super().insert(index, value)
+        self.version += 1
+
+    def pop(self, index: SupportsIndex = -1) -> IRInstruction:
+        self.version += 1
+        return super().pop(index)
+
+    def remove(self, value: IRInstruction):
+        super().remove(value)
+        self.version += 1
+
+    def clear(self):
+        super().clear()
+        self.version += 1
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self.version += 1
+
+    def reverse(self):
+        super().reverse()
+        self.version += 1
+
+
+class OpcodeIndex:
+    """
+    操作码 → 指令位置的二级索引
+
+    Attributes:
+        instructions: 被索引的指令序列，需要提供 version 属性
+    """
+
+    def __init__(self, instructions: InstructionList):
+        self.instructions = instructions
+        # 以操作码对象的 id 为键：IROpCode 按元组值计算哈希，逐条查表开销与扫描本身相当
+        self._positions: dict[int, list[int]] = {}
+        self._version = -1
+
+    def _sync(self):
+        if self._version == self.instructions.version:
+            return
+        positions: dict[int, list[int]] = {}
+        for index, instr in enumerate(self.instructions):
+            key = id(instr.opcode)
+            if key in positions:
+                positions[key].append(index)
+            else:
+                positions[key] = [index]
+        self._positions = positions
+        self._version = self.instructions.version
+
+    def positions(self, *opcodes: IROpCode) -> list[int]:
+        """获取指定操作码的全部指令位置（升序），返回值是快照，可以自由修改"""
+        self._sync()
+        if len(opcodes) == 1:
+            return list(self._positions.get(id(opcodes[0]), ()))
+        return list(heapq.merge(*(self._positions.get(id(opcode), ()) for opcode in opcodes)))
+
+    def count(self, opcode: IROpCode) -> int:
+        """指定操作码的指令数"""
+        self._sync()
+        return len(self._positions.get(id(opcode), ()))
+
+    def appended(self, instr: IRInstruction):
+        """指令已追加到序列末尾"""
+        if self._version != self.instructions.version - 1:
+            return
+        self._positions.setdefault(id(instr.opcode), []).append(len(self.instructions) - 1)
+        self._version = self.instructions.version
+
+    def replaced(self, index: int, old: IRInstruction, new: IRInstruction):
+        """位置 index 上的指令已被替换"""
+        if self._version != self.instructions.version - 1:
+            return
+        if old.opcode is not new.opcode:
+            old_positions = self._positions[id(old.opcode)]
+            del old_positions[bisect.bisect_left(old_positions, index)]
+            bisect.insort(self._positions.setdefault(id(new.opcode), []), index)
+        self._version = self.instructions.version
@@ -0,0 +1,88 @@
+# coding=utf-8
+"""
+执行计数数据
+
+插桩编译（--instrument）生成的数据包在每个函数开头为该函数的计数器加一，
+计数器以函数文件路径（不含命名空间与后缀，如 `namespace/main/while_check_0`）为记分项持有者，
+记录在 PROFILE_OBJECTIVE 记分板中。运行导出函数后每个计数器输出为一行：
+
+    [profile] namespace/main 1200
+
+从聊天栏或服务器日志中复制这些行保存为文件，通过 --profile-data 传回编译器，
+优化 Pass 即可按真实调用频率决策：热函数放宽内联阈值，从未执行的冷函数不再内联。
+"""
+from __future__ import annotations
+
+import functools
+import re
+from pathlib import Path
+from typing import Optional
+
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 计数器所在的记分板
+PROFILE_OBJECTIVE = "dovetail.profile"
+# 导出行的前缀
+DUMP_PREFIX = "[profile]"
+
+_DUMP_LINE = re.compile(rf"{re.escape(DUMP_PREFIX)} (\S+) ?(\d*)")
+
+
+class ExecutionProfile:
+    """
+    函数执行计数
+
+    Attributes:
+        counts: 函数文件路径 → 执行次数
+    """
+
+    # 执行次数达到最热函数的该比例时视为热函数
+    HOT_FRACTION = 0.01
+
+    def __init__(self, counts: dict[str, int]):
+        self.counts = counts
+        self._hot_count = max(1, int(max(counts.values(), default=0) * self.HOT_FRACTION))
+
+    @classmethod
+    def parse(cls, text: str) -> ExecutionProfile:
+        """解析导出文本，忽略不含导出前缀的行，同一函数出现多次时累加"""
+        counts: dict[str, int] = {}
+        for line in text.splitlines():
+            match = _DUMP_LINE.search(line)
+            if match:
+                path, count = match.groups()
+                counts[path] = counts.get(path, 0) + int(count or 0)
+        return cls(counts)
+
+    @classmethod
+    def load(cls, path: Path) -> ExecutionProfile:
+        with open(path, "r", encoding="utf-8") as f:
+            profile = cls.parse(f.read())
+        logger.info(f"已读取 {len(profile.counts)} 个函数的执行计数")
+        return profile
+
+    def get(self, function_path: str) -> Optional[int]:
+        """获取函数的执行次数，没有记录时返回 None"""
+        return self.counts.get(function_path)
+
+    def is_hot(self, function_path: str) -> bool:
+        count = self.get(function_path)
+        return count is not None and count >= self._hot_count
+
+    def is_cold(self, function_path: str) -> bool:
+        """有记录且从未执行"""
+        return self.get(function_path) == 0
+
+
+def get_execution_profile(path: Optional[Path]) -> Optional[ExecutionProfile]:
+    """读取执行计数文件，文件未修改时复用上次读取的结果；未指定路径时返回 None"""
+    if path is None:
+        return None
+    return _load_profile(path, path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_profile(path: Path, mtime: int) -> ExecutionProfile:
+    return ExecutionProfile.load(path)
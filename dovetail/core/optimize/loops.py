@@ -0,0 +1,154 @@
+# coding=utf-8
+"""
+循环结构识别
+
+ASTVisitor 将 while/for 循环生成为一个循环检查作用域，其中嵌套循环体，
+作用域定义本身不执行，由紧随其后的 goto 进入循环：
+
+    scope check (LOOP_CHECK) {
+        ...                         计算循环条件
+        scope body (LOOP_BODY) {
+            ...
+        }
+        if cond goto body
+        if cond goto check          每次迭代后递归检查条件
+    }
+    goto check                      进入循环
+
+尾递归优化生成的 LOOP_CHECK 作用域没有循环体，不视为循环。
+循环检查作用域定义之前的指令在每次进入循环前执行一次，可以放置循环前置的指令。
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from attrs import define
+
+from dovetail.core.enums.types import FunctionType, StructureType
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.symbols import Variable
+
+
+@define(slots=True)
+class LoopScopes:
+    """
+    循环的作用域结构
+
+    Attributes:
+        check:       循环检查作用域名
+        body:        循环体作用域名
+        begin:       循环检查作用域 SCOPE_BEGIN 的索引
+        end:         循环检查作用域 SCOPE_END 的索引，之后紧跟进入循环的 goto
+        body_begin:  循环体 SCOPE_BEGIN 的索引
+        body_end:    循环体 SCOPE_END 的索引
+        local_names: 循环所在函数中循环之前声明的局部变量名，不会被函数调用修改
+    """
+    check: str
+    body: str
+    begin: int
+    end: int
+    body_begin: int
+    body_end: int
+    local_names: frozenset[str]
+
+
+def match_scopes(instructions: Sequence[IRInstruction]) -> dict[int, int]:
+    """
+    配对作用域
+
+    Returns:
+        SCOPE_BEGIN 索引 → 对应 SCOPE_END 索引
+    """
+    ends: dict[int, int] = {}
+    stack: list[int] = []
+    for index, instr in enumerate(instructions):
+        if instr.opcode is IROpCode.SCOPE_BEGIN:
+            stack.append(index)
+        elif instr.opcode is IROpCode.SCOPE_END and stack:
+            ends[stack.pop()] = index
+    return ends
+
+
+def find_loops(instructions: Sequence[IRInstruction], ends: Optional[dict[int, int]] = None) -> list[LoopScopes]:
+    """
+    按出现顺序找出所有循环，外层循环在内层循环之前
+
+    Args:
+        instructions: 指令序列
+        ends:         match_scopes 的结果，不填时重新配对
+    """
+    if ends is None:
+        ends = match_scopes(instructions)
+    loops: list[LoopScopes] = []
+    # 每层作用域声明的变量名，函数作用域及其内层声明的变量是局部变量
+    frames: list[tuple[StructureType, set[str]]] = []
+    for index, instr in enumerate(instructions):
+        if instr.opcode is IROpCode.SCOPE_BEGIN:
+            scope_type = instr.operands[1]
+            if scope_type is StructureType.LOOP_CHECK:
+                loop = _match_loop(instructions, index, ends, frames)
+                if loop is not None:
+                    loops.append(loop)
+            frames.append((scope_type, set()))
+        elif instr.opcode is IROpCode.SCOPE_END:
+            if frames:
+                frames.pop()
+        elif instr.opcode is IROpCode.DECLARE and frames:
+            frames[-1][1].add(instr.operands[0].name)
+    return loops
+
+
+def _match_loop(
+        instructions: Sequence[IRInstruction],
+        begin: int,
+        ends: dict[int, int],
+        frames: list[tuple[StructureType, set[str]]],
+) -> Optional[LoopScopes]:
+    end = ends.get(begin)
+    check = instructions[begin].operands[0]
+    if end is None or end + 1 >= len(instructions):
+        return None
+    entry = instructions[end + 1]
+    if entry.opcode is not IROpCode.JUMP or entry.operands[0] != check:
+        return None
+
+    body_begin = None
+    index = begin + 1
+    while index < end:
+        instr = instructions[index]
+        if instr.opcode is IROpCode.SCOPE_BEGIN:
+            if body_begin is not None or instr.operands[1] is not StructureType.LOOP_BODY:
+                return None
+            body_begin = index
+            index = ends[index]
+        index += 1
+    if body_begin is None:
+        return None
+
+    local_names: set[str] = set()
+    for frame_type, names in reversed(frames):
+        local_names |= names
+        if frame_type is StructureType.FUNCTION:
+            break
+    else:
+        local_names = set()
+    return LoopScopes(
+        check, instructions[body_begin].operands[0], begin, end, body_begin, ends[body_begin],
+        frozenset(local_names),
+    )
+
+
+def written_variable(instr: IRInstruction) -> Optional[str]:
+    """指令写入的变量名，不写入变量时返回 None"""
+    if instr.opcode is IROpCode.DECLARE or not instr.operands:
+        return None
+    target = instr.operands[0]
+    return target.name if isinstance(target, Variable) else None
+
+
+def is_pure_call(instr: IRInstruction) -> bool:
+    """是否为纯内置函数的调用，结果只取决于参数且没有副作用"""
+    if instr.opcode is not IROpCode.CALL:
+        return False
+    function = instr.operands[1]
+    return function.func_type is FunctionType.BUILTIN and function.pure
@@ -11,10 +11,15 @@ Pass 注册机制：
 """
 from __future__ import annotations
 
+from typing import Optional
+
 from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums.optimization import OptimizationLevel
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizer
 from dovetail.core.optimize.pipeline import OptimizationPipeline
+from dovetail.core.optimize.profiler import PassProfiler
+from dovetail.core.optimize.register_allocation import allocate_registers
 
 _passes_registered: bool = False
 
@@ -44,24 +49,29 @@ class Optimizer(IROptimizer):
       1. 触发内置 Pass 注册
       2. 构建 OptimizationPipeline（含依赖排序）
       3. 调用 pipeline.run() 执行优化
+      4. 为记分板临时变量分配寄存器（O1 及以上）
     """
 
-    def __init__(self, builder: IRBuilder, config: CompileConfig):
+    def __init__(self, builder: IRBuilder, config: CompileConfig, profiler: Optional[PassProfiler] = None):
         """
         初始化优化器
 
         Args:
-            builder: 待优化的 IR 构建器
-            config:  编译配置（决定优化级别、调试模式等）
+            builder:  待优化的 IR 构建器
+            config:   编译配置（决定优化级别、调试模式等）
+            profiler: 性能分析器（可选），记录每个 Pass 的用时
         """
         ensure_passes_registered()
         self.builder = builder
         self.config = config
-        self.pipeline = OptimizationPipeline(config)
+        self.pipeline = OptimizationPipeline(config, profiler)
 
     def optimize(self) -> IRBuilder:
         """
         执行优化，返回优化后的 IRBuilder（原地修改，同一对象）。
         """
         # 使用管道执行优化
-        return self.pipeline.run(self.builder)
+        builder = self.pipeline.run(self.builder)
+        if self.config.optimization_level != OptimizationLevel.O0:
+            allocate_registers(builder)
+        return builder
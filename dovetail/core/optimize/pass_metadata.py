@@ -7,6 +7,8 @@
 """
 from __future__ import annotations
 
+from typing import Optional
+
 from attrs import define, field
 
 from dovetail.core.enums.optimization import OptimizationLevel
@@ -34,6 +36,29 @@ class PassPhase(SafeEnum):
         return cls.PRUNE, cls.ANALYZE, cls.TRANSFORM, cls.CLEANUP
 
 
+class IRFact(SafeEnum):
+    """
+    IR 事实类别
+
+    Pass 通过 consumes / invalidates 声明读取与修改的 IR 事实，
+    管道据此只重新执行输入发生变化的 Pass。
+    """
+
+    CALL_GRAPH = "call_graph"
+    """调用图：函数定义以及函数间的调用关系"""
+
+    CONTROL_FLOW = "control_flow"
+    """控制流：作用域结构、跳转、返回以及作用域内是否还有指令"""
+
+    DATA_FLOW = "data_flow"
+    """数据流：声明、赋值、运算以及调用的实参与结果"""
+
+    @classmethod
+    def all(cls) -> frozenset[IRFact]:
+        """获取全部 IR 事实"""
+        return frozenset(cls)
+
+
 @define(frozen=True, slots=True)
 class PassMetadata:
     """
@@ -50,6 +75,10 @@ class PassMetadata:
         repeatable:         是否可在多轮迭代中重复执行（保留字段）
         required_features:  运行前 IR 必须具备的特性集合
         provided_features:  执行后向 IR 提供的特性集合
+        consumes:           分析时读取的 IR 事实，None 表示全部（保守默认值）
+        invalidates:        产生修改时可能改变的 IR 事实，None 表示全部（保守默认值）
+        function_local:     分析与修改只依赖单个顶层函数内的指令，
+                            管道可只在上次运行后发生变化的函数上重新运行
     """
     name: str
     display_name: str
@@ -61,3 +90,14 @@ class PassMetadata:
     repeatable: bool = False
     required_features: tuple[str, ...] = field(factory=tuple)
     provided_features: tuple[str, ...] = field(factory=tuple)
+    consumes: Optional[tuple[IRFact, ...]] = None
+    invalidates: Optional[tuple[IRFact, ...]] = None
+    function_local: bool = False
+
+    def get_consumed_facts(self) -> frozenset[IRFact]:
+        """获取读取的 IR 事实集合"""
+        return IRFact.all() if self.consumes is None else frozenset(self.consumes)
+
+    def get_invalidated_facts(self) -> frozenset[IRFact]:
+        """获取修改时可能改变的 IR 事实集合"""
+        return IRFact.all() if self.invalidates is None else frozenset(self.invalidates)
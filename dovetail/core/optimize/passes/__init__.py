@@ -11,6 +11,8 @@ from .constant_folding import ConstantFoldingPass
 from .dead_code_elimination import DeadCodeEliminationPass
 from .empty_scope import EmptyScopeRemovalPass
 from .function_inlining import FunctionInliningPass
+from .loop_invariant_code_motion import LoopInvariantCodeMotionPass
+from .loop_unrolling import LoopUnrollingPass
 from .tail_call_optimization import TailCallOptimizationPass
 from .unconditional_scope_inlining import UnconditionalScopeInliningPass
 from .unreachable_code import UnreachableCodeRemovalPass
@@ -19,7 +19,7 @@ from dovetail.core.instructions import (
 )
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.symbols import Variable, Reference
 
@@ -37,7 +37,10 @@ _UNKNOWN_DTYPE = PrimitiveDataType.INT
     description="消除中间变量的无意义链式赋值",
     level=OptimizationLevel.O2,
     phase=PassPhase.TRANSFORM,
-    provided_features=("eliminated_chain_assigns",)
+    provided_features=("eliminated_chain_assigns",),
+    consumes=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
+    invalidates=(IRFact.DATA_FLOW,),
+    function_local=True,
 ))
 class ChainAssignEliminationPass(IROptimizationPass):
     """
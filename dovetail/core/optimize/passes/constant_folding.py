@@ -18,7 +18,7 @@ from dovetail.core.enums.types import ValueType
 from dovetail.core.instructions import IROpCode, IRCall, IRAssign, IRJump, IRInstruction, IRReturn
 from dovetail.core.ir_builder import IRBuilder, IRBuilderIterator
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.symbols import Variable, Literal, Reference, Function, Class
 from dovetail.utils.constant_operator_handlers import COMPARE_OP_HANDLERS, BINARY_OP_HANDLERS, UNARY_OP_HANDLERS, \
@@ -31,7 +31,10 @@ from dovetail.utils.constant_operator_handlers import COMPARE_OP_HANDLERS, BINAR
     description="在编译时计算常量表达式，支持控制流敏感分析",
     level=OptimizationLevel.O1,
     phase=PassPhase.TRANSFORM,
-    provided_features=("simplified_arithmetic",)
+    provided_features=("simplified_arithmetic",),
+    consumes=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
+    invalidates=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
+    function_local=True,
 ))
 class ConstantFoldingPass(IROptimizationPass):
     """
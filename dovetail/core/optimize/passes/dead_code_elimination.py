@@ -34,7 +34,7 @@ from dovetail.core.enums.types import ValueType, VariableType
 from dovetail.core.instructions import IROpCode
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.symbols import Reference
 from dovetail.utils.logger import get_logger
@@ -60,6 +60,8 @@ def _make_key(scope: str, var_name: str) -> _VarKey:
     level=OptimizationLevel.O1,
     phase=PassPhase.CLEANUP,
     provided_features=("cleaned_dead_code", "cleaned_declarations"),
+    consumes=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
+    invalidates=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
 ))
 class DeadCodeEliminationPass(IROptimizationPass):
     """
@@ -11,7 +11,7 @@ from dovetail.core.enums import OptimizationLevel
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 
 
@@ -21,7 +21,10 @@ from dovetail.core.optimize.pass_registry import register_pass
     description="移除没有任何指令的空作用域",
     level=OptimizationLevel.O1,
     phase=PassPhase.CLEANUP,
-    provided_features=("removed_empty_scopes",)
+    provided_features=("removed_empty_scopes",),
+    consumes=(IRFact.CONTROL_FLOW,),
+    invalidates=(IRFact.CONTROL_FLOW,),
+    function_local=True,
 ))
 class EmptyScopeRemovalPass(IROptimizationPass):
     """空作用域移除优化 Pass"""
@@ -3,6 +3,17 @@
 函数内联 Pass
 
 将短小的函数调用展开到调用点，减少函数调用开销。
+
+提供执行计数（--profile-data）时按真实调用频率决策：
+    - 热函数的内联阈值放宽为 INLINE_THRESHOLD × HOT_INLINE_FACTOR
+    - 从未执行的函数不内联，调用方从未执行时也不在其中内联，避免无谓地增大数据包
+    - 没有计数记录的函数仍按静态阈值处理
+
+未提供执行计数时保持原有行为：超过阈值的函数体同样登记为候选（内联时使用副本），
+常量参数因此可以在内联后继续折叠，默认编译的输出不受执行计数功能影响。
+
+插桩编译（--instrument）时不内联：内联后的调用不再经过被调函数，其计数器不会增加，
+在每个调用点都被内联的函数会记为从未执行，随后的基于计数的编译反而不内联它。
 """
 from __future__ import annotations
 
@@ -14,12 +25,15 @@ from dovetail.core.enums.types import ValueType, VariableType
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder, IRBuilderIterator
 from dovetail.core.optimize.base import IROptimizationPass
+from dovetail.core.optimize.execution_profile import get_execution_profile
 from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.symbols import Reference, Variable, Function
 
 # 内联阈值：函数体指令数超过此值不内联
 INLINE_THRESHOLD = 15
+# 热函数的内联阈值倍数
+HOT_INLINE_FACTOR = 4
 
 
 @register_pass(PassMetadata(
@@ -36,6 +50,7 @@ class FunctionInliningPass(IROptimizationPass):
     Attributes:
         _inline_candidates (dict[str, list[IRInstruction]]): 可内联的函数体指令列表，key 为函数名
         _recursive_funcs (set[str]): 递归函数名集合，不可内联
+        _function_paths (dict[str, str]): 函数名 → 函数文件路径，用于查询执行计数
         _inline_counter (int): 全局内联计数器，用于生成不冲突的变量名
         _changed (bool): 是否发生了变化
     """
@@ -44,11 +59,16 @@ class FunctionInliningPass(IROptimizationPass):
         super().__init__(builder, config)
         self._inline_candidates: dict[str, list[IRInstruction]] = {}
         self._recursive_funcs: set[str] = set()
+        self._function_paths: dict[str, str] = {}
+        self._profile = get_execution_profile(config.profile_path)
         self._inline_counter: int = 0
         self._changed: bool = False
 
     def execute(self) -> bool:
         self._changed = False
+        if self.config.instrument:
+            # 保留所有调用，使每次调用都计入被调函数的计数器
+            return False
         self._collect_candidates()
         self._perform_inlining()
         return self._changed
@@ -66,11 +86,20 @@ class FunctionInliningPass(IROptimizationPass):
 
         # 先收集所有函数体
         # 结构：FUNCTION -> SCOPE_BEGIN(FUNCTION) -> ... -> SCOPE_END
+        # 函数体整体跳过，scope_stack 只记录类等外层作用域，用于拼出函数文件路径
+        scope_stack: list[str] = [self.config.namespace]
         i = 0
         while i < len(instructions):
             instr = instructions[i]
 
-            if instr.opcode == IROpCode.FUNCTION:
+            if instr.opcode == IROpCode.SCOPE_BEGIN:
+                scope_stack.append(instr.get_operands()[0])
+                i += 1
+            elif instr.opcode == IROpCode.SCOPE_END:
+                if len(scope_stack) > 1:
+                    scope_stack.pop()
+                i += 1
+            elif instr.opcode == IROpCode.FUNCTION:
                 func: Function = instr.get_operands()[0]
                 func_name = func.name
 
@@ -80,11 +109,19 @@ class FunctionInliningPass(IROptimizationPass):
                     i += 1
                     continue
 
+                self._function_paths[func_name] = "/".join((*scope_stack, instructions[j].get_operands()[0]))
+
                 # 收集 SCOPE 内的所有指令（不含 SCOPE_BEGIN/SCOPE_END 本身）
                 body, end_idx = self._extract_scope_body(instructions, j)
-                self._inline_candidates[func_name] = deepcopy(body)
-                # 指令数超过阈值，不内联
-                if len(body) > INLINE_THRESHOLD:
+                # 从未执行，不内联
+                limit = self._inline_limit(func_name)
+                if limit is None:
+                    i = end_idx + 1
+                    continue
+                # 指令数超过阈值，仅在提供执行计数时不内联
+                if len(body) > limit:
+                    if self._profile is None:
+                        self._inline_candidates[func_name] = deepcopy(body)
                     i = end_idx + 1
                     continue
 
@@ -105,6 +142,22 @@ class FunctionInliningPass(IROptimizationPass):
         for name in self._recursive_funcs:
             self._inline_candidates.pop(name, None)
 
+    def _inline_limit(self, func_name: str) -> Optional[int]:
+        """
+        获取函数可内联的函数体指令数上限
+
+        Returns:
+            指令数上限；有执行计数且从未执行时返回 None，表示不内联
+        """
+        if self._profile is None:
+            return INLINE_THRESHOLD
+        path = self._function_paths.get(func_name)
+        if self._profile.is_cold(path):
+            return None
+        if self._profile.is_hot(path):
+            return INLINE_THRESHOLD * HOT_INLINE_FACTOR
+        return INLINE_THRESHOLD
+
     def _extract_scope_body(
             self,
             instructions: list[IRInstruction],
@@ -153,6 +206,7 @@ class FunctionInliningPass(IROptimizationPass):
     def _perform_inlining(self) -> None:
         """遍历 IR，遇到可内联的 CALL 指令就展开"""
         iterator = self.builder.__iter__()
+        caller_path: Optional[str] = None
 
         while True:
             try:
@@ -160,8 +214,14 @@ class FunctionInliningPass(IROptimizationPass):
             except StopIteration:
                 break
 
+            if instr.opcode == IROpCode.FUNCTION:
+                caller_path = self._function_paths.get(instr.get_operands()[0].name)
+                continue
             if instr.opcode != IROpCode.CALL:
                 continue
+            # 调用方从未执行，内联只会增大数据包
+            if self._profile is not None and self._profile.is_cold(caller_path):
+                continue
 
             result_var: Optional[Variable] = instr.get_operands()[0]
             callee: Function = instr.get_operands()[1]
@@ -282,10 +342,11 @@ class FunctionInliningPass(IROptimizationPass):
         def _ensure(var: Variable) -> None:
             if var.name in locally_declared and var.name not in rename_map:
                 new_name = f"{var.name}{suffix}"
+                # 参数内联后成为普通局部变量，临时变量保持临时变量类别
                 rename_map[var.name] = Variable(
                     name=new_name,
                     dtype=var.dtype,
-                    var_type=VariableType.COMMON
+                    var_type=VariableType.TEMPORARY if var.var_type == VariableType.TEMPORARY else VariableType.COMMON
                 )
 
         # 参数也要重命名
@@ -0,0 +1,249 @@
+# coding=utf-8
+"""
+循环不变量外提 Pass
+
+循环检查作用域与循环体在每次迭代时都会重新执行，
+其中只依赖循环外定义的值的计算（如 f-string 中的类型转换、字符串拼接、纯内置函数调用）每次的结果都相同，
+可以移到循环之前，每次进入循环只执行一次：
+
+    scope check (LOOP_CHECK) {                  declare t
+        ...                                     t = (string) n
+        scope body (LOOP_BODY) {                scope check (LOOP_CHECK) {
+            declare t                  →            ...
+            t = (string) n                          scope body (LOOP_BODY) {
+            ...                                         ...
+        }                                           }
+        ...                                         ...
+    }                                           }
+    goto check                                  goto check
+
+外提条件：
+    - 指令位于循环检查作用域或循环体的顶层，是运算、比较、类型转换或纯内置函数调用
+    - 结果是在循环内声明、且在循环内只被写入一次的临时变量
+    - 操作数是字面量、已外提指令的结果，或循环内没有写入、也不在循环内声明的变量；
+      循环内有非纯函数调用时，被调函数可能修改全局变量，操作数还必须是函数局部变量
+
+外提的指令在进入循环前无条件执行一次，即使循环一次也不迭代，因此只外提没有副作用的指令。
+"""
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterator
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel
+from dovetail.core.enums.types import ValueType, VariableType
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.base import IROptimizationPass
+from dovetail.core.optimize.loops import LoopScopes, find_loops, is_pure_call
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
+from dovetail.core.optimize.pass_registry import register_pass
+from dovetail.core.symbols import Reference, Variable
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ─── 常量 ────────────────────────────────────────────────────────────────────
+
+# 可以外提的指令，操作数[0] 为结果变量
+# 复制（ASSIGN）不外提：常量折叠与链式赋值消除会把复制的值直接传播到引用处，外提反而阻止传播
+_HOISTABLE_OPCODES = (
+    IROpCode.UNARY_OP, IROpCode.BINARY_OP, IROpCode.COMPARE, IROpCode.CAST, IROpCode.CALL,
+)
+# 不写入变量的控制流指令
+_CONTROL_OPCODES = (
+    IROpCode.JUMP, IROpCode.COND_JUMP, IROpCode.RETURN, IROpCode.BREAK, IROpCode.CONTINUE,
+    IROpCode.SCOPE_BEGIN, IROpCode.SCOPE_END, IROpCode.DECLARE,
+)
+# 被调函数可能修改全局变量与传入的对象
+_CALL_OPCODES = (IROpCode.CALL, IROpCode.CALL_METHOD, IROpCode.STRUCT_CALL)
+
+
+def _variable_names(operand) -> Iterator[str]:
+    """操作数中引用的变量名"""
+    if isinstance(operand, Variable):
+        yield operand.name
+    elif isinstance(operand, Reference):
+        if operand.value_type == ValueType.VARIABLE:
+            yield operand.get_name()
+    elif isinstance(operand, dict):
+        for value in operand.values():
+            yield from _variable_names(value)
+    elif isinstance(operand, (list, tuple)):
+        for item in operand:
+            yield from _variable_names(item)
+
+
+def _top_level(instructions, begin: int, end: int) -> list[int]:
+    """直接位于作用域中、不在嵌套作用域内的指令索引"""
+    indices: list[int] = []
+    depth = 0
+    for index in range(begin + 1, end):
+        opcode = instructions[index].opcode
+        if opcode is IROpCode.SCOPE_BEGIN:
+            depth += 1
+        elif opcode is IROpCode.SCOPE_END:
+            depth -= 1
+        elif not depth:
+            indices.append(index)
+    return indices
+
+
+def _sources(instr: IRInstruction) -> list:
+    """可外提指令读取的操作数"""
+    if instr.opcode is IROpCode.UNARY_OP:
+        return [instr.operands[2]]
+    if instr.opcode in (IROpCode.BINARY_OP, IROpCode.COMPARE):
+        return [instr.operands[2], instr.operands[3]]
+    if instr.opcode is IROpCode.CAST:
+        return [instr.operands[2]]
+    return list(instr.operands[2].values())
+
+
+# ─── Pass 注册 ────────────────────────────────────────────────────────────────
+
+@register_pass(PassMetadata(
+    name="loop_invariant_code_motion",
+    display_name="循环不变量外提",
+    description="将循环中只依赖循环外的值的运算、比较、类型转换与纯内置函数调用移到循环之前，每次进入循环只执行一次",
+    level=OptimizationLevel.O2,
+    phase=PassPhase.TRANSFORM,
+    depends_on=("constant_folding", "builtin_constant_folding"),
+    provided_features=("hoisted_loop_invariants",),
+    consumes=(IRFact.CONTROL_FLOW, IRFact.DATA_FLOW),
+    invalidates=(IRFact.CONTROL_FLOW, IRFact.DATA_FLOW),
+    function_local=True,
+))
+class LoopInvariantCodeMotionPass(IROptimizationPass):
+    """
+    循环不变量外提 Pass
+
+    每次只变换一个循环，变换后重新扫描，避免索引漂移。
+    优先变换最靠后的循环：内层循环的不变量先外提到外层循环中，外层循环变换时可以继续外提。
+    """
+
+    def __init__(self, builder: IRBuilder, config: CompileConfig):
+        super().__init__(builder, config)
+        self._changed = False
+
+    # ── 分析阶段 ──────────────────────────────────────────────────────────────
+
+    def analyze(self) -> dict:
+        """
+        扫描 IR，找出各循环中可以外提的指令。
+
+        Returns:
+            {"invariants": {循环检查作用域名: 可外提的指令数}}
+        """
+        instructions = self.builder.get_instructions()
+        return {"invariants": {
+            loop.check: len(self._find_invariants(instructions, loop))
+            for loop in find_loops(instructions)
+        }}
+
+    def _find_invariants(self, instructions, loop: LoopScopes) -> list[tuple[int, int]]:
+        """
+        找出循环中可以外提的指令
+
+        Returns:
+            按执行顺序排列的 (结果变量的 DECLARE 索引, 指令索引)
+        """
+        written: Counter[str] = Counter()
+        declared: Counter[str] = Counter()
+        has_calls = False
+        for instr in instructions[loop.begin:loop.end + 1]:
+            if instr.opcode is IROpCode.DECLARE:
+                declared[instr.operands[0].name] += 1
+                continue
+            if instr.opcode in _CONTROL_OPCODES or not instr.operands:
+                continue
+            # 容器、对象与结构体的修改也视为写入其变量
+            written.update(_variable_names(instr.operands[0]))
+            if instr.opcode in _CALL_OPCODES and not is_pure_call(instr):
+                has_calls = True
+                written.update(name for operand in instr.operands[1:] for name in _variable_names(operand))
+
+        # 执行顺序：检查作用域的顶层指令先于循环体执行
+        top_level = _top_level(instructions, loop.begin, loop.end) + _top_level(
+            instructions, loop.body_begin, loop.body_end
+        )
+
+        declarations = {
+            instructions[index].operands[0].name: index
+            for index in top_level if instructions[index].opcode is IROpCode.DECLARE
+        }
+        hoisted: list[tuple[int, int]] = []
+        invariant: set[str] = set()
+        for index in top_level:
+            instr = instructions[index]
+            if instr.opcode not in _HOISTABLE_OPCODES:
+                continue
+            if instr.opcode is IROpCode.CALL and not is_pure_call(instr):
+                continue
+            result = instr.operands[0]
+            if (
+                    not isinstance(result, Variable) or result.var_type is not VariableType.TEMPORARY
+                    or written[result.name] != 1 or declared[result.name] != 1
+                    or result.name not in declarations or result.name in loop.local_names
+            ):
+                continue
+            if all(
+                    self._is_invariant(operand, invariant, written, declared, loop.local_names, has_calls)
+                    for operand in _sources(instr)
+            ):
+                hoisted.append((declarations[result.name], index))
+                invariant.add(result.name)
+        return hoisted
+
+    @staticmethod
+    def _is_invariant(
+            operand,
+            invariant: set[str],
+            written: Counter[str],
+            declared: Counter[str],
+            local_names: frozenset[str],
+            has_calls: bool,
+    ) -> bool:
+        if not isinstance(operand, Reference):
+            return False
+        if operand.is_literal():
+            return True
+        if operand.value_type != ValueType.VARIABLE:
+            return False
+        name = operand.get_name()
+        if name in invariant:
+            return True
+        if written[name] or declared[name]:
+            return False
+        return name in local_names or not has_calls
+
+    # ── 执行阶段 ──────────────────────────────────────────────────────────────
+
+    def execute(self) -> bool:
+        self._changed = False
+        done: set[str] = set()
+        while True:
+            instructions = self.builder.get_instructions()
+            loops = [loop for loop in find_loops(instructions) if loop.check not in done]
+            if not loops:
+                break
+            loop = loops[-1]
+            done.add(loop.check)
+            self._hoist(instructions, loop)
+        return self._changed
+
+    def _hoist(self, instructions, loop: LoopScopes) -> None:
+        """将循环的不变量连同其声明移到循环检查作用域之前"""
+        invariants = self._find_invariants(instructions, loop)
+        if not invariants:
+            return
+        moved = {index for pair in invariants for index in pair}
+        preheader = [instructions[index] for pair in invariants for index in pair]
+        # 作用域定义本身不执行，放在循环检查作用域之前使声明与定义先于循环中的引用
+        instructions[loop.begin:loop.end + 1] = preheader + [
+            instr for index, instr in enumerate(instructions[loop.begin:loop.end + 1], loop.begin)
+            if index not in moved
+        ]
+        logger.debug(f"从循环 {loop.check} 中外提 {len(invariants)} 条不变指令")
+        self._changed = True
@@ -0,0 +1,469 @@
+# coding=utf-8
+"""
+循环展开 Pass
+
+每次循环迭代在运行时都是一次对循环检查作用域的递归调用加一次对循环体的调用，
+迭代次数在编译期可知的循环可以展开，省去这些函数调用及其条件判断：
+
+    let i = 0;                      i = 0
+    for (i < 3; i = i + 1) {   →    <循环体>  (i = 1)
+        <循环体>                     <循环体>  (i = 2)
+    }                               <循环体>  (i = 3)
+
+识别模式（常量折叠之后）：
+    i = <整数字面量>                 循环前最近一次对 i 的赋值
+    scope check (LOOP_CHECK) {
+        cond = i <比较> <整数字面量>
+        scope body (LOOP_BODY) {    循环体顶层恰有一次 i = i ± <整数字面量>，
+            ...                     嵌套作用域中不写 i，不含针对本循环的 break/continue
+        }
+        if cond goto body
+        if cond goto check
+    }
+    goto check
+
+展开策略：
+    完全展开：迭代次数不超过 FULL_UNROLL_MAX_TRIPS 且展开后指令数不超过 MAX_UNROLLED_INSTRUCTIONS，
+              循环体的各份副本直接替换整个循环
+    部分展开：循环体内放置 unroll_factor 份副本，每次检查条件执行多次迭代；
+              迭代次数除以展开倍数的余数部分作为前导副本放在循环检查作用域之前，
+              保证此后每次条件成立时剩余迭代次数都是展开倍数的整数倍
+
+副本中的嵌套作用域与循环体内声明的变量按副本编号重命名，避免与外层及其他副本中的同名变量冲突。
+"""
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+from attrs import define
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel
+from dovetail.core.enums.operations import BinaryOps, CompareOps
+from dovetail.core.enums.types import ValueType
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.base import IROptimizationPass
+from dovetail.core.optimize.loops import LoopScopes, find_loops, is_pure_call, match_scopes, written_variable
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
+from dovetail.core.optimize.pass_registry import register_pass
+from dovetail.core.symbols import Reference, Variable
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# ─── 常量 ────────────────────────────────────────────────────────────────────
+
+# 迭代次数不超过该值的循环完全展开
+FULL_UNROLL_MAX_TRIPS = 16
+# 展开后的循环体（含嵌套作用域）指令数上限
+MAX_UNROLLED_INSTRUCTIONS = 64
+
+_UNROLL_SUFFIX = "_unroll_"
+
+# 计分板分数范围，循环变量越界时不展开
+_INT_MIN = -(1 << 31)
+_INT_MAX = (1 << 31) - 1
+
+# 操作数中含有作用域名的指令
+_SCOPE_OPCODES = (
+    IROpCode.JUMP, IROpCode.COND_JUMP, IROpCode.BREAK, IROpCode.CONTINUE,
+    IROpCode.SCOPE_BEGIN, IROpCode.SCOPE_END,
+)
+# 向前查找循环变量初值时可以越过的指令（以及纯内置函数调用），其余指令可能间接修改循环变量
+_STRAIGHT_LINE_OPCODES = (
+    IROpCode.DECLARE, IROpCode.ASSIGN, IROpCode.UNARY_OP,
+    IROpCode.BINARY_OP, IROpCode.COMPARE, IROpCode.CAST,
+)
+# 循环变量在比较右侧时，交换两侧后的比较运算符
+_MIRRORED = {
+    CompareOps.LT: CompareOps.GT,
+    CompareOps.LE: CompareOps.GE,
+    CompareOps.GT: CompareOps.LT,
+    CompareOps.GE: CompareOps.LE,
+    CompareOps.EQ: CompareOps.EQ,
+    CompareOps.NE: CompareOps.NE,
+}
+
+
+@define(slots=True)
+class ConstantLoop:
+    """
+    迭代次数已知的循环
+
+    Attributes:
+        check:      循环检查作用域名
+        body:       循环体作用域名
+        begin:      循环检查作用域 SCOPE_BEGIN 的索引，SCOPE_END 之后紧跟进入循环的 goto
+        end:        循环检查作用域 SCOPE_END 的索引
+        body_begin: 循环体 SCOPE_BEGIN 的索引
+        body_end:   循环体 SCOPE_END 的索引
+        trips:      迭代次数
+    """
+    check: str
+    body: str
+    begin: int
+    end: int
+    body_begin: int
+    body_end: int
+    trips: int
+
+    @property
+    def size(self) -> int:
+        """循环体（含嵌套作用域）指令数"""
+        return self.body_end - self.body_begin - 1
+
+
+def trip_count(op: CompareOps, start: int, bound: int, step: int) -> Optional[int]:
+    """
+    计算 `for (i = start; i <op> bound; i += step)` 的迭代次数
+
+    Returns:
+        迭代次数；不会终止或循环变量超出计分板范围时返回 None
+    """
+    if op is CompareOps.LE:
+        op, bound = CompareOps.LT, bound + 1
+    elif op is CompareOps.GE:
+        op, bound = CompareOps.GT, bound - 1
+
+    if op is CompareOps.LT:
+        if start >= bound:
+            return 0
+        trips = math.ceil((bound - start) / step) if step > 0 else None
+    elif op is CompareOps.GT:
+        if start <= bound:
+            return 0
+        trips = math.ceil((start - bound) / -step) if step < 0 else None
+    elif op is CompareOps.NE:
+        if start == bound:
+            return 0
+        distance = bound - start
+        trips = distance // step if step and distance % step == 0 and distance // step > 0 else None
+    elif op is CompareOps.EQ:
+        if start != bound:
+            return 0
+        trips = 1 if step else None
+    else:
+        return None
+
+    if trips is None or not _INT_MIN <= start + trips * step <= _INT_MAX:
+        return None
+    return trips
+
+
+def _is_int_literal(ref) -> bool:
+    return (
+            isinstance(ref, Reference) and ref.is_literal()
+            and isinstance(ref.value.value, int) and not isinstance(ref.value.value, bool)
+    )
+
+
+def _is_variable(ref, name: str) -> bool:
+    return isinstance(ref, Reference) and ref.value_type == ValueType.VARIABLE and ref.get_name() == name
+
+
+def _writes(instr: IRInstruction, name: str) -> bool:
+    """指令是否写入指定名称的变量"""
+    return written_variable(instr) == name
+
+
+def _step_of(instr: IRInstruction, name: str) -> Optional[int]:
+    """`x = name ± 字面量` 的步长，不是该形式时返回 None"""
+    if instr.opcode is not IROpCode.BINARY_OP:
+        return None
+    _, op, left, right = instr.operands
+    if op is BinaryOps.ADD:
+        if _is_variable(left, name) and _is_int_literal(right):
+            return right.value.value
+        if _is_int_literal(left) and _is_variable(right, name):
+            return left.value.value
+    elif op is BinaryOps.SUB and _is_variable(left, name) and _is_int_literal(right):
+        return -right.value.value
+    return None
+
+
+# ─── Pass 注册 ────────────────────────────────────────────────────────────────
+
+@register_pass(PassMetadata(
+    name="loop_unrolling",
+    display_name="循环展开",
+    description="完全展开迭代次数较少的常量循环，较大的常量循环按 unroll_factor 部分展开，减少每次迭代的函数调用与条件判断",
+    level=OptimizationLevel.O3,
+    phase=PassPhase.TRANSFORM,
+    depends_on=("constant_folding", "loop_invariant_code_motion"),  # 不变量外提后循环体更小，也不会被复制
+    provided_features=("unrolled_loops",),
+    consumes=(IRFact.CONTROL_FLOW, IRFact.DATA_FLOW),
+    invalidates=(IRFact.CONTROL_FLOW, IRFact.DATA_FLOW),
+    function_local=True,
+))
+class LoopUnrollingPass(IROptimizationPass):
+    """
+    循环展开 Pass
+
+    每次只变换一个循环，变换后重新扫描，避免索引漂移。
+    优先变换最靠后的循环：嵌套循环中内层循环先展开，外层循环按展开后的大小判断是否继续展开。
+    部分展开后循环体内有多次对循环变量的写入，不会再次被识别。
+    """
+
+    def __init__(self, builder: IRBuilder, config: CompileConfig):
+        super().__init__(builder, config)
+        self._changed = False
+
+    # ── 分析阶段 ──────────────────────────────────────────────────────────────
+
+    def analyze(self) -> dict:
+        """
+        扫描 IR，找出所有迭代次数已知的循环。
+
+        Returns:
+            {"loops": {循环检查作用域名: 迭代次数}}
+        """
+        return {"loops": {loop.check: loop.trips for loop in self._find_loops()}}
+
+    def _find_loops(self) -> list[ConstantLoop]:
+        """按出现顺序返回所有迭代次数已知的循环"""
+        instructions = self.builder.get_instructions()
+        ends = match_scopes(instructions)
+        begins = {end: begin for begin, end in ends.items()}
+        loops: list[ConstantLoop] = []
+        for scopes in find_loops(instructions, ends):
+            loop = self._match_loop(instructions, scopes, begins)
+            if loop is not None:
+                loops.append(loop)
+        return loops
+
+    @staticmethod
+    def _match_loop(
+            instructions,
+            scopes: LoopScopes,
+            begins: dict[int, int],
+    ) -> Optional[ConstantLoop]:
+        """
+        判断循环是否为迭代次数已知的循环
+
+        Args:
+            instructions: 指令序列
+            scopes:       循环的作用域结构
+            begins:       SCOPE_END 索引 → 对应 SCOPE_BEGIN 索引
+        """
+        check, body, begin, end = scopes.check, scopes.body, scopes.begin, scopes.end
+        body_begin, body_end, local_names = scopes.body_begin, scopes.body_end, scopes.local_names
+
+        # ── 检查作用域：一次比较、依次跳入循环体与递归检查 ──
+        compare = None
+        jumps: list[IRInstruction] = []
+        declared: list[str] = []
+        index = begin + 1
+        while index < end:
+            instr = instructions[index]
+            if index == body_begin:
+                index = body_end + 1
+                continue
+            if instr.opcode is IROpCode.COMPARE and compare is None and not jumps:
+                compare = instr
+            elif instr.opcode is IROpCode.COND_JUMP:
+                jumps.append(instr)
+            elif instr.opcode is IROpCode.DECLARE:
+                declared.append(instr.operands[0].name)
+            else:
+                return None
+            index += 1
+        if compare is None or len(jumps) != 2:
+            return None
+
+        cond_name = compare.operands[0].name
+        if any(name != cond_name for name in declared):
+            return None
+        for jump, target in zip(jumps, (body, check)):
+            cond, true_scope, false_scope = jump.operands
+            if not _is_variable(cond, cond_name) or true_scope != target or false_scope is not None:
+                return None
+
+        # ── 循环条件：局部变量与整数字面量比较 ──
+        _, op, left, right = compare.operands
+        if _is_int_literal(right) and isinstance(left, Reference) and left.value_type == ValueType.VARIABLE:
+            name, bound = left.get_name(), right.value.value
+        elif _is_int_literal(left) and isinstance(right, Reference) and right.value_type == ValueType.VARIABLE:
+            name, bound, op = right.get_name(), left.value.value, _MIRRORED[op]
+        else:
+            return None
+        if name not in local_names:
+            return None
+
+        # ── 循环体：顶层恰有一次常量步长的更新，不跳出本循环 ──
+        step = None
+        depth = 0
+        body_names: set[str] = set()
+        for index in range(body_begin + 1, body_end):
+            instr = instructions[index]
+            opcode = instr.opcode
+            if opcode is IROpCode.DECLARE:
+                # 副本按变量名重命名，遮蔽外层变量的声明会使同名的外层引用也被重命名
+                declared_name = instr.operands[0].name
+                if declared_name in local_names or declared_name in body_names:
+                    return None
+                body_names.add(declared_name)
+            if opcode is IROpCode.SCOPE_BEGIN:
+                depth += 1
+            elif opcode is IROpCode.SCOPE_END:
+                depth -= 1
+            if opcode in _SCOPE_OPCODES and opcode not in (IROpCode.SCOPE_BEGIN, IROpCode.SCOPE_END):
+                if any(operand in (body, check) for operand in instr.operands if isinstance(operand, str)):
+                    return None
+            if not _writes(instr, name):
+                continue
+            if depth or step is not None:
+                return None
+            step = _step_of(instr, name)
+            if step is None and instr.opcode is IROpCode.ASSIGN and index - 1 > body_begin:
+                # calc = i + 1; i = calc
+                source = instr.operands[1]
+                previous = instructions[index - 1]
+                if (
+                        isinstance(source, Reference) and source.value_type == ValueType.VARIABLE
+                        and _writes(previous, source.get_name()) and source.get_name() != name
+                ):
+                    step = _step_of(previous, name)
+            if step is None:
+                return None
+        if step is None:
+            return None
+
+        # ── 初值：循环之前最近一次对循环变量的赋值 ──
+        start = None
+        index = begin - 1
+        while index >= 0:
+            instr = instructions[index]
+            if instr.opcode is IROpCode.SCOPE_END:
+                # 作用域定义本身不执行
+                index = begins[index] - 1
+                continue
+            if instr.opcode not in _STRAIGHT_LINE_OPCODES and not is_pure_call(instr):
+                return None
+            if _writes(instr, name):
+                if instr.opcode is not IROpCode.ASSIGN or not _is_int_literal(instr.operands[1]):
+                    return None
+                start = instr.operands[1].value.value
+                break
+            index -= 1
+        if start is None:
+            return None
+
+        trips = trip_count(op, start, bound, step)
+        if trips is None:
+            return None
+        return ConstantLoop(check, body, begin, end, body_begin, body_end, trips)
+
+    # ── 执行阶段 ──────────────────────────────────────────────────────────────
+
+    def execute(self) -> bool:
+        self._changed = False
+        skipped: set[str] = set()
+        while True:
+            loops = [loop for loop in self._find_loops() if loop.check not in skipped]
+            if not loops:
+                break
+            loop = loops[-1]
+            if not self._unroll(loop):
+                skipped.add(loop.check)
+        return self._changed
+
+    def _unroll(self, loop: ConstantLoop) -> bool:
+        """
+        展开单个循环
+
+        Returns:
+            是否进行了展开
+        """
+        instructions = self.builder.get_instructions()
+        content = list(instructions[loop.body_begin + 1:loop.body_end])
+
+        if loop.trips <= FULL_UNROLL_MAX_TRIPS and loop.trips * loop.size <= MAX_UNROLLED_INSTRUCTIONS:
+            # 完全展开：副本替换整个循环（含进入循环的 goto）
+            instructions[loop.begin:loop.end + 2] = self._expand(content, loop.body, range(loop.trips), True)
+            logger.debug(f"完全展开循环 {loop.check}，迭代 {loop.trips} 次")
+            self._changed = True
+            return True
+
+        factor = min(self.config.unroll_factor, MAX_UNROLLED_INSTRUCTIONS // loop.size, loop.trips)
+        if factor < 2:
+            return False
+        instructions[loop.body_begin + 1:loop.body_end] = self._expand(content, loop.body, range(factor), False)
+        # 余数部分的前导副本放在循环检查作用域之前，编号接在循环体副本之后；
+        # 放在作用域之后、进入循环的 goto 之前时，其他 Pass 会把它们当作循环之后的指令处理
+        remainder = loop.trips % factor
+        if remainder:
+            instructions[loop.begin:loop.begin] = self._expand(
+                content, loop.body, range(factor, factor + remainder), True
+            )
+        logger.debug(f"按 {factor} 倍部分展开循环 {loop.check}，迭代 {loop.trips} 次")
+        self._changed = True
+        return True
+
+    # ── 辅助方法 ──────────────────────────────────────────────────────────────
+
+    @classmethod
+    def _expand(
+            cls,
+            content: list[IRInstruction],
+            body: str,
+            copies: range,
+            rename_first: bool,
+    ) -> list[IRInstruction]:
+        """
+        生成循环体的多份副本
+
+        每份副本中的嵌套作用域与循环体内声明的变量按副本编号重命名：
+        作用域名在函数内必须唯一；临时变量各自独立，活跃区间不跨越副本，仍可分配到寄存器。
+
+        Args:
+            content:      循环体指令（不含循环体的 SCOPE_BEGIN/SCOPE_END）
+            body:         循环体作用域名，用于区分不同循环中同名的变量
+            copies:       副本编号
+            rename_first: 编号为 0 的副本是否重命名；副本留在原循环体内时保留原名
+
+        Returns:
+            依次排列的副本指令
+        """
+        scope_names = [instr.operands[0] for instr in content if instr.opcode is IROpCode.SCOPE_BEGIN]
+        declared = [instr.operands[0] for instr in content if instr.opcode is IROpCode.DECLARE]
+        expanded: list[IRInstruction] = []
+        for number in copies:
+            if number == 0 and not rename_first:
+                expanded.extend(content)
+                continue
+            suffix = f"{_UNROLL_SUFFIX}{number}"
+            scopes = {name: f"{name}{suffix}" for name in scope_names}
+            variables = {
+                var.name: Variable(f"{var.name}_{body}{suffix}", var.dtype, var.var_type, var.mutable)
+                for var in declared
+            }
+            expanded.extend(cls._remap(instr, variables, scopes) for instr in content)
+        return expanded
+
+    @classmethod
+    def _remap(cls, instr: IRInstruction, variables: dict[str, Variable], scopes: dict[str, str]) -> IRInstruction:
+        """重建指令，替换其中的变量与作用域名"""
+        rename_scopes = instr.opcode in _SCOPE_OPCODES
+        operands = [
+            scopes.get(operand, operand) if rename_scopes and isinstance(operand, str)
+            else cls._remap_operand(operand, variables)
+            for operand in instr.operands
+        ]
+        return IRInstruction(instr.opcode, *operands)
+
+    @classmethod
+    def _remap_operand(cls, operand, variables: dict[str, Variable]):
+        if not variables:
+            return operand
+        if isinstance(operand, Variable):
+            return variables.get(operand.name, operand)
+        if isinstance(operand, Reference) and operand.value_type == ValueType.VARIABLE:
+            renamed = variables.get(operand.get_name())
+            return operand if renamed is None else Reference(renamed)
+        if isinstance(operand, dict):
+            return {key: cls._remap_operand(value, variables) for key, value in operand.items()}
+        if isinstance(operand, (list, tuple)):
+            return type(operand)(cls._remap_operand(item, variables) for item in operand)
+        return operand
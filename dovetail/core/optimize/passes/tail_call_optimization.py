@@ -7,6 +7,8 @@
 """
 from __future__ import annotations
 
+import bisect
+
 from dovetail.core.compile_config import CompileConfig
 from dovetail.core.enums import OptimizationLevel
 from dovetail.core.enums.types import StructureType
@@ -36,6 +38,7 @@ _TCO_SCOPE_SUFFIX = "_1_tco_loop"  # _1是为了保证不会与其他函数命
     phase=PassPhase.TRANSFORM,
     depends_on=("constant_folding",),
     provided_features=("tail_call_optimized",),
+    function_local=True,
 ))
 class TailCallOptimizationPass(IROptimizationPass):
     """
@@ -76,77 +79,53 @@ class TailCallOptimizationPass(IROptimizationPass):
         instructions = self.builder.get_instructions()
         candidates: dict[str, list[dict]] = {}
 
-        current_func: Function | None = None
-        func_scope_depth = 0  # 追踪当前函数体的作用域嵌套深度
-
-        i = 0
-        while i < len(instructions):
-            instr = instructions[i]
+        # 只访问函数定义与调用：调用所属的函数是它之前最近的函数定义，
+        # 紧随其后的 IRReturn 保证调用位于函数体内
+        function_positions = self.builder.opcode_positions(IROpCode.FUNCTION)
 
-            # 进入新函数定义
-            if instr.opcode is IROpCode.FUNCTION:
-                current_func = instr.operands[0]
-                func_scope_depth = 0
-                i += 1
-                continue
-
-            # 离开函数（depth 回到 0 之后的 SCOPE_END 意味着函数体结束）
-            if instr.opcode is IROpCode.SCOPE_BEGIN:
-                func_scope_depth += 1
-                i += 1
+        for i in self.builder.opcode_positions(IROpCode.CALL):
+            k = bisect.bisect_right(function_positions, i) - 1
+            if k < 0:
                 continue
+            current_func: Function = instructions[function_positions[k]].operands[0]
+            instr = instructions[i]
+            called_func: Function = instr.operands[1]
 
-            if instr.opcode is IROpCode.SCOPE_END:
-                func_scope_depth -= 1
-                if func_scope_depth < 0:
-                    # 函数体已结束
-                    current_func = None
-                    func_scope_depth = 0
-                i += 1
+            # 仅处理直接尾递归
+            if called_func.get_name() != current_func.get_name():
                 continue
 
-            # 查找 IRCall
-            if instr.opcode is IROpCode.CALL and current_func is not None:
-                called_func: Function = instr.operands[1]
-
-                # 仅处理直接尾递归
-                if called_func.get_name() != current_func.get_name():
-                    i += 1
-                    continue
-
-                # 向后扫描，跳过 SCOPE_END，寻找紧随其后的 IRReturn
-                j = i + 1
-                while j < len(instructions) and instructions[j].opcode is IROpCode.SCOPE_END:
-                    j += 1
-
-                if j < len(instructions) and instructions[j].opcode is IROpCode.RETURN:
-                    return_instr = instructions[j]
-                    call_result = instr.operands[0]  # Variable | None
-
-                    # 验证 return 的值就是 call 的返回值（或均为 void）
-                    return_value = return_instr.operands[0]
-                    is_tail = (
-                                      call_result is None and return_value is None
-                              ) or (
-                                      call_result is not None
-                                      and return_value is not None
-                                      and hasattr(return_value, 'get_name')
-                                      and hasattr(call_result, 'get_name')
-                                      and return_value.get_name() == call_result.get_name()
-                              )
-
-                    if is_tail:
-                        func_name = current_func.get_name()
-                        if func_name not in candidates:
-                            candidates[func_name] = []
-                        candidates[func_name].append({
-                            "call_index": i,
-                            "return_index": j,
-                            "function": current_func,
-                            "call_instr": instr,
-                        })
-
-            i += 1
+            # 向后扫描，跳过 SCOPE_END，寻找紧随其后的 IRReturn
+            j = i + 1
+            while j < len(instructions) and instructions[j].opcode is IROpCode.SCOPE_END:
+                j += 1
+
+            if j < len(instructions) and instructions[j].opcode is IROpCode.RETURN:
+                return_instr = instructions[j]
+                call_result = instr.operands[0]  # Variable | None
+
+                # 验证 return 的值就是 call 的返回值（或均为 void）
+                return_value = return_instr.operands[0]
+                is_tail = (
+                                  call_result is None and return_value is None
+                          ) or (
+                                  call_result is not None
+                                  and return_value is not None
+                                  and hasattr(return_value, 'get_name')
+                                  and hasattr(call_result, 'get_name')
+                                  and return_value.get_name() == call_result.get_name()
+                          )
+
+                if is_tail:
+                    func_name = current_func.get_name()
+                    if func_name not in candidates:
+                        candidates[func_name] = []
+                    candidates[func_name].append({
+                        "call_index": i,
+                        "return_index": j,
+                        "function": current_func,
+                        "call_instr": instr,
+                    })
 
         return {"candidates": candidates}
 
@@ -291,16 +270,16 @@ class TailCallOptimizationPass(IROptimizationPass):
             SCOPE_BEGIN 指令的索引，找不到则返回 None
         """
         instructions = self.builder.get_instructions()
-        in_target_func = False
 
-        for i, instr in enumerate(instructions):
-            if instr.opcode is IROpCode.FUNCTION:
-                func: Function = instr.operands[0]
-                in_target_func = (func.get_name() == func_name)
+        for position in self.builder.opcode_positions(IROpCode.FUNCTION):
+            func: Function = instructions[position].operands[0]
+            if func.get_name() != func_name:
                 continue
-
-            if in_target_func and instr.opcode is IROpCode.SCOPE_BEGIN:
-                return i
+            for i in range(position + 1, len(instructions)):
+                if instructions[i].opcode is IROpCode.FUNCTION:
+                    break
+                if instructions[i].opcode is IROpCode.SCOPE_BEGIN:
+                    return i
 
         return None
 
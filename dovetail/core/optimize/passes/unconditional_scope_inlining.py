@@ -20,7 +20,7 @@ from dovetail.core.enums import OptimizationLevel
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 
 
@@ -30,7 +30,10 @@ from dovetail.core.optimize.pass_registry import register_pass
     description="将紧随无条件 goto 的条件作用域内容提升到外层，消除冗余作用域包装",
     level=OptimizationLevel.O1,
     phase=PassPhase.CLEANUP,
-    provided_features=("inlined_unconditional_scopes",)
+    provided_features=("inlined_unconditional_scopes",),
+    consumes=(IRFact.CONTROL_FLOW,),
+    invalidates=(IRFact.CONTROL_FLOW,),
+    function_local=True,
 ))
 class UnconditionalScopeInliningPass(IROptimizationPass):
     """
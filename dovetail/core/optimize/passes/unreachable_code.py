@@ -11,7 +11,7 @@ from dovetail.core.enums import OptimizationLevel
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 
 
@@ -21,7 +21,9 @@ from dovetail.core.optimize.pass_registry import register_pass
     description="移除 return/break/continue 之后的不可达代码",
     level=OptimizationLevel.O1,
     phase=PassPhase.CLEANUP,
-    provided_features=("removed_unreachable",)
+    provided_features=("removed_unreachable",),
+    consumes=(IRFact.CONTROL_FLOW,),
+    function_local=True,
 ))
 class UnreachableCodeRemovalPass(IROptimizationPass):
     """不可达代码移除优化 Pass"""
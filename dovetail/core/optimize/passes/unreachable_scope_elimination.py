@@ -11,7 +11,7 @@ from dovetail.core.enums import OptimizationLevel
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 
 
@@ -21,7 +21,9 @@ from dovetail.core.optimize.pass_registry import register_pass
     description="移除不可达的作用域及其内容",
     level=OptimizationLevel.O2,
     phase=PassPhase.CLEANUP,
-    provided_features=("removed_useless_scopes",)
+    provided_features=("removed_useless_scopes",),
+    consumes=(IRFact.CONTROL_FLOW,),
+    function_local=True,
 ))
 class UselessScopeEliminationPass(IROptimizationPass):
     """无用作用域移除优化 Pass"""
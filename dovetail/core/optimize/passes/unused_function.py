@@ -15,7 +15,7 @@ from dovetail.core.enums import OptimizationLevel, FunctionType
 from dovetail.core.instructions import *
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.symbols import Function
 
@@ -26,7 +26,8 @@ from dovetail.core.symbols import Function
     description="基于调用图可达性分析，移除所有不可达函数",
     level=OptimizationLevel.O1,
     phase=PassPhase.PRUNE,
-    provided_features=("removed_unused_functions",)
+    provided_features=("removed_unused_functions",),
+    consumes=(IRFact.CALL_GRAPH,),
 ))
 class UnusedFunctionEliminationPass(IROptimizationPass):
     """基于调用图可达性分析的死函数消除 Pass"""
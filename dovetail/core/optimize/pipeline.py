@@ -6,19 +6,31 @@
   依赖绝对优先——拓扑排序决定执行顺序。
   阶段作 tie-breaker——同入度为 0 的节点间按 PRUNE < ANALYZE < TRANSFORM < CLEANUP 排列。
   禁止跨阶段逆序依赖——TRANSFORM Pass 不能依赖 CLEANUP Pass，违者在构建时抛出 ValueError。
+
+变化驱动：
+  每个 IR 事实（IRFact）维护一个版本号，Pass 产生修改时提升其 invalidates 中事实的版本；
+  Pass 只在 consumes 中某个事实的版本比它上次运行时新时才会重新执行。
+  Pass 自身的修改同样会使其在下一轮重新执行，以便到达自身的不动点。
+
+函数粒度：
+  每个顶层函数是一个区域（见 regions 模块），管道记录每次修改涉及的区域。
+  声明为 function_local 的 Pass 在整个程序上运行过一次之后，只在其后被修改过的函数上重新运行，
+  函数连同全局区域的指令一起运行，可以引用全局声明；
+  全局区域被修改，或在函数上运行时修改了全局区域的指令时，仍在整个程序上运行。
 """
 from __future__ import annotations
 
-import time
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from dovetail.core.compile_config import CompileConfig
 from dovetail.core.config import FAST_MODE
 from dovetail.core.enums.optimization import OptimizationLevel
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.context import OptimizationContext
-from dovetail.core.optimize.pass_metadata import PassPhase
+from dovetail.core.optimize.pass_metadata import PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import get_registry
+from dovetail.core.optimize.profiler import PassProfiler
+from dovetail.core.optimize.regions import RegionTracker, IRRegion, flatten, global_context, partition_regions, same
 from dovetail.utils.logger import get_logger
 
 if TYPE_CHECKING:
@@ -46,11 +58,15 @@ class OptimizationPipeline:
     优化管道
 
     构建阶段：筛选 → 校验跨阶段依赖 → 拓扑排序（含阶段 tie-breaker）
-    执行阶段：不动点迭代，每轮通过 next_iteration() 重置单轮状态
+    执行阶段：不动点迭代，每轮通过 next_iteration() 重置单轮状态，跳过输入未变化的 Pass
+
+    Attributes:
+        profiler: 性能分析器，提供时记录每个 Pass 每轮的用时与指令数变化
     """
 
-    def __init__(self, config: CompileConfig):
+    def __init__(self, config: CompileConfig, profiler: Optional[PassProfiler] = None):
         self.config = config
+        self.profiler = profiler
         self.registry = get_registry()
         self._pipeline: list[type[IROptimizationPass]] = []
         self._build_pipeline()
@@ -187,6 +203,7 @@ class OptimizationPipeline:
         O0 时直接返回原始 builder，不做任何优化。
         O1/O2 最多迭代 5 轮，O3 最多 15 轮。
         每轮结束若无 Pass 产生变化，提前退出（不动点收敛）。
+        上次运行后所读取的 IR 事实均未被改变的 Pass 不再重复执行。
 
         每轮开始时调用 context.next_iteration()：
           - 保留 executed_passes（跨迭代互斥判断）
@@ -208,6 +225,13 @@ class OptimizationPipeline:
             debug=self.config.debug,
         )
 
+        # 事实版本号从 1 开始，尚未运行过的 Pass 记为 0，保证第 0 轮全部执行
+        version = 1
+        fact_versions: dict[IRFact, int] = {fact: version for fact in IRFact}
+        last_run: dict[str, int] = {}
+        tracker = RegionTracker()
+        track_regions = any(pass_class.get_metadata().function_local for pass_class in self._pipeline)
+
         for iteration in range(max_iter):
             # 第 0 轮不调用 next_iteration，避免 iteration 从 1 开始
             if iteration > 0:
@@ -217,36 +241,85 @@ class OptimizationPipeline:
             logger.debug(f"优化迭代 {iteration}/{max_iter}")
 
             for pass_class in self._pipeline:
+                metadata = pass_class.get_metadata()
+                if not any(
+                        fact_versions[fact] > last_run.get(metadata.name, 0)
+                        for fact in metadata.get_consumed_facts()
+                ):
+                    if self.config.debug:
+                        logger.debug(f"  跳过：{metadata.display_name}（输入未变化）")
+                    continue
+
                 pass_instance = pass_class(builder, self.config)
-                pass_changed = False
 
                 if not pass_instance.should_run(context):
                     if self.config.debug:
-                        logger.debug(f"  跳过：{pass_class.get_metadata().display_name}")
+                        logger.debug(f"  跳过：{metadata.display_name}")
                     continue
 
-                s_t = time.time()
+                started = version
+                last_run[metadata.name] = started
+
+                s_t = PassProfiler.clock()
+                instructions_before = len(builder) if self.profiler else 0
+
+                regions = tracker.get_dirty_regions(metadata.name, builder) if metadata.function_local else None
+                region_results = ({}, set())
+                if regions:
+                    region_results = self._run_on_regions(pass_class, builder, regions)
+                    if region_results is None:
+                        # 在函数上运行时修改了全局区域的指令，丢弃区域的结果，改为在整个程序上运行；
+                        # 区域与原 IR 共享指令对象，无法确定是否已有原地修改，所有区域视为被修改
+                        version += 1
+                        tracker.mark_all(version)
+                        regions = None
+                if regions is None:
+                    snapshot = tracker.snapshot(builder) if track_regions else None
+
+                    # 执行分析（不修改 IR）
+                    analysis = pass_instance.analyze()
+
+                    # 执行优化（修改 IR）
+                    pass_changed = pass_instance.execute()
+                    tracker.record_full_run(metadata.name, started)
+                    if pass_changed:
+                        version += 1
+                        if track_regions:
+                            tracker.record_changes(snapshot, builder, version)
+                else:
+                    analysis, changed_regions = region_results
+                    tracker.record_region_run(metadata.name, regions, started)
+                    pass_changed = bool(changed_regions)
+                    if pass_changed:
+                        version += 1
+                        tracker.mark_regions(changed_regions, version)
+                    if self.config.debug:
+                        logger.debug(f"  {metadata.display_name}：在 {len(regions)} 个发生变化的函数上运行")
 
-                # 执行分析（不修改 IR）
-                analysis = pass_instance.analyze()
                 if analysis:
                     context = context.with_updates(
-                        analysis_results={pass_class.get_metadata().name: analysis}
+                        analysis_results={metadata.name: analysis}
                     )
 
-                # 执行优化（修改 IR）
-                if pass_instance.execute():
-                    pass_changed = True
+                if pass_changed:
+                    for fact in metadata.get_invalidated_facts():
+                        fact_versions[fact] = version
                     context = context.with_updates(
                         executed_passes={pass_class.get_metadata().name},
                         ir_features=set(pass_class.get_metadata().provided_features),
                     )
 
+                if self.profiler:
+                    self.profiler.record(
+                        pass_class, iteration, s_t, PassProfiler.clock(),
+                        instructions_before, len(builder), pass_changed
+                    )
+
                 # 调试输出
                 if self.config.debug:
                     logger.debug(
                         f"  执行：{pass_class.get_metadata().display_name}，"
-                        f"用时{time.time() - s_t:1f}，"
+                        f"用时{PassProfiler.clock() - s_t:1f}，"
                         f"期间{'' if pass_changed else '不'}存在修改。")
                     if not FAST_MODE:
                         from dovetail.utils.ir_validator import assert_ir
@@ -259,3 +332,44 @@ class OptimizationPipeline:
                 break
 
         return builder
+
+    def _run_on_regions(
+            self,
+            pass_class: type[IROptimizationPass],
+            builder: IRBuilder,
+            regions: list[IRRegion],
+    ) -> Optional[tuple[dict, set[str]]]:
+        """
+        只在指定函数区域上运行 Pass
+
+        每个区域连同前后的全局区域指令复制到独立的 IRBuilder 中运行，
+        所有区域运行完毕后，产生修改的区域整体替换回原位置。从后往前替换，不会影响尚未替换区域的索引。
+
+        Returns:
+            (合并后的分析结果, 产生修改的区域名)；Pass 修改了全局区域的指令时返回 None，
+            此时不替换任何区域，应在整个程序上运行
+        """
+        instructions = builder.get_instructions()
+        all_regions = partition_regions(instructions)
+        analysis: dict = {}
+        results: list[tuple[IRRegion, list]] = []
+        for region in regions:
+            before, after = global_context(instructions, all_regions, region)
+            context_items = flatten(before + after)
+            region_builder = IRBuilder()
+            region_builder.extend(before)
+            region_builder.extend(instructions[region.start:region.end])
+            region_builder.extend(after)
+            pass_instance = pass_class(region_builder, self.config)
+            analysis.update(pass_instance.analyze())
+            if not pass_instance.execute():
+                continue
+            result = region_builder.get_instructions()
+            end = len(result) - len(after)
+            if not same(flatten([*result[:len(before)], *result[end:]]), context_items):
+                return None
+            results.append((region, list(result[len(before):end])))
+
+        for region, result in sorted(results, key=lambda item: item[0].start, reverse=True):
+            instructions[region.start:region.end] = result
+        return analysis, {region.name for region, _ in results}
@@ -0,0 +1,180 @@
+# coding=utf-8
+"""
+优化 Pass 性能分析模块
+
+记录每个 Pass 在每轮迭代中的墙钟用时、执行前后的指令数以及是否修改了 IR，
+可输出为文本表格、JSON 或 Chrome 跟踪文件（chrome://tracing / Perfetto）。
+
+与调试模式不同，性能分析不会开启 IR 校验，测得的用时不受校验开销影响。
+"""
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from attrs import define, asdict
+
+if TYPE_CHECKING:
+    from dovetail.core.optimize.base import IROptimizationPass
+
+
+@define(slots=True)
+class PassRecord:
+    """
+    单次 Pass 执行记录
+
+    Attributes:
+        name:                Pass 名称
+        display_name:        Pass 显示名称
+        phase:               所属阶段
+        iteration:           所在迭代轮次（从 0 开始）
+        start:               相对于分析开始的起始时间（秒）
+        duration:            用时（秒），包含 analyze 与 execute
+        instructions_before: 执行前指令数
+        instructions_after:  执行后指令数
+        changed:             是否修改了 IR
+    """
+    name: str
+    display_name: str
+    phase: str
+    iteration: int
+    start: float
+    duration: float
+    instructions_before: int
+    instructions_after: int
+    changed: bool
+
+
+class PassProfiler:
+    """优化 Pass 性能分析器"""
+
+    def __init__(self):
+        self.records: list[PassRecord] = []
+        self._origin = self.clock()
+
+    @staticmethod
+    def clock() -> float:
+        """获取当前时间，流水线以此计时，与 record 的 start/end 参数配合使用"""
+        return time.perf_counter()
+
+    def record(
+            self,
+            pass_class: type[IROptimizationPass],
+            iteration: int,
+            start: float,
+            end: float,
+            instructions_before: int,
+            instructions_after: int,
+            changed: bool
+    ) -> None:
+        """记录一次 Pass 执行"""
+        meta = pass_class.get_metadata()
+        self.records.append(PassRecord(
+            meta.name,
+            meta.display_name,
+            meta.phase.value,
+            iteration,
+            start - self._origin,
+            end - start,
+            instructions_before,
+            instructions_after,
+            changed
+        ))
+
+    # ── 汇总 ──────────────────────────────────────────────────
+
+    def summarize(self) -> list[dict[str, Any]]:
+        """
+        按 Pass 汇总，顺序与首次执行顺序一致
+
+        Returns:
+            每个 Pass 的运行次数、产生修改的次数、总用时与指令数净变化
+        """
+        summary: dict[str, dict[str, Any]] = {}
+        for record in self.records:
+            item = summary.setdefault(record.name, {
+                "name": record.name,
+                "display_name": record.display_name,
+                "phase": record.phase,
+                "runs": 0,
+                "changed_runs": 0,
+                "total_time": 0.0,
+                "instruction_delta": 0,
+            })
+            item["runs"] += 1
+            item["changed_runs"] += record.changed
+            item["total_time"] += record.duration
+            item["instruction_delta"] += record.instructions_after - record.instructions_before
+        return list(summary.values())
+
+    def total_time(self) -> float:
+        return sum(record.duration for record in self.records)
+
+    # ── 输出 ──────────────────────────────────────────────────
+
+    def format_table(self) -> str:
+        """格式化为文本表格，按总用时降序排列"""
+        total = self.total_time() or 1.0
+        headers = ("Pass", "阶段", "运行", "修改", "总用时(ms)", "占比", "指令变化")
+        rows = [
+            (
+                item["name"],
+                item["phase"],
+                str(item["runs"]),
+                str(item["changed_runs"]),
+                f"{item['total_time'] * 1000:.2f}",
+                f"{item['total_time'] / total:.1%}",
+                f"{item['instruction_delta']:+d}",
+            )
+            for item in sorted(self.summarize(), key=lambda i: i["total_time"], reverse=True)
+        ]
+        iterations = max((record.iteration for record in self.records), default=-1) + 1
+        rows.append(("合计", "", str(len(self.records)), str(sum(r.changed for r in self.records)),
+                     f"{self.total_time() * 1000:.2f}", "100.0%", f"{iterations} 轮"))
+
+        widths = [max(len(row[i]) for row in (headers, *rows)) for i in range(len(headers))]
+        lines = ["  ".join(cell.ljust(width) for cell, width in zip(headers, widths))]
+        lines.append("  ".join("-" * width for width in widths))
+        lines.extend("  ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total_time": self.total_time(),
+            "passes": self.summarize(),
+            "records": [asdict(record) for record in self.records],
+        }
+
+    def write_json(self, path: Path) -> None:
+        """写入 JSON 报告"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """写入 Chrome 跟踪文件（Trace Event Format），每轮迭代占一行"""
+        events = [
+            {
+                "name": record.display_name,
+                "cat": record.phase,
+                "ph": "X",
+                "ts": record.start * 1e6,
+                "dur": record.duration * 1e6,
+                "pid": 1,
+                "tid": record.iteration,
+                "args": {
+                    "pass": record.name,
+                    "instructions_before": record.instructions_before,
+                    "instructions_after": record.instructions_after,
+                    "changed": record.changed,
+                },
+            }
+            for record in self.records
+        ]
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": iteration, "args": {"name": f"迭代 {iteration}"}}
+            for iteration in sorted({record.iteration for record in self.records})
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
@@ -0,0 +1,241 @@
+# coding=utf-8
+"""
+函数粒度的 IR 区域划分与脏区域跟踪
+
+扁平指令列表中每个顶层函数（紧邻的 FUNCTION 声明与 SCOPE_BEGIN(FUNCTION) … SCOPE_END）
+构成一个区域，其余顶层指令（全局语句、类等）统一归入全局区域。
+
+管道在 Pass 执行前后比较各区域的指令快照，得出本次修改了哪些区域；
+声明为 function_local 的 Pass 之后只在上次运行后被修改过的函数区域上重新运行，
+区域连同全局区域的指令一起运行，全局声明等上下文与在整个程序上运行时一致。
+快照复制容器操作数（参数字典、列表）的内容，其余操作数按对象身份比较；
+Pass 报告了修改而快照中找不到差异时（如原地修改了操作数对象），所有区域都视为被修改。
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+from attrs import define
+
+from dovetail.core.enums.types import StructureType
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.ir_builder import IRBuilder
+
+GLOBAL_REGION = "global"
+
+RegionSnapshot = dict[str, list]
+
+
+@define(slots=True)
+class IRRegion:
+    """
+    函数区域
+
+    Attributes:
+        name:  函数作用域名
+        start: 起始指令索引（FUNCTION 声明，没有时为 SCOPE_BEGIN）
+        end:   结束指令索引（SCOPE_END 之后，不含）
+    """
+    name: str
+    start: int
+    end: int
+
+
+def partition_regions(instructions: Sequence[IRInstruction]) -> list[IRRegion]:
+    """
+    划分顶层函数区域
+
+    Args:
+        instructions: 扁平指令列表
+
+    Returns:
+        按出现顺序排列的函数区域
+    """
+    regions: list[IRRegion] = []
+    depth = 0
+    current: Optional[IRRegion] = None
+    for index, instr in enumerate(instructions):
+        if instr.opcode is IROpCode.SCOPE_BEGIN:
+            if depth == 0 and instr.operands[1] is StructureType.FUNCTION:
+                start = index - 1 if index and instructions[index - 1].opcode is IROpCode.FUNCTION else index
+                current = IRRegion(instr.operands[0], start, index)
+            depth += 1
+        elif instr.opcode is IROpCode.SCOPE_END:
+            depth -= 1
+            if depth == 0 and current is not None:
+                current.end = index + 1
+                regions.append(current)
+                current = None
+    return regions
+
+
+def global_context(
+        instructions: Sequence[IRInstruction],
+        regions: list[IRRegion],
+        region: IRRegion,
+) -> tuple[list[IRInstruction], list[IRInstruction]]:
+    """
+    获取区域前后的全局区域指令
+
+    Args:
+        instructions: 扁平指令列表
+        regions:      partition_regions 的结果
+        region:       其中的一个区域
+
+    Returns:
+        (区域之前的全局指令, 区域之后的全局指令)，保持原有顺序
+    """
+    before: list[IRInstruction] = []
+    after: list[IRInstruction] = []
+    position = 0
+    for other in regions:
+        target = before if other.start <= region.start else after
+        target.extend(instructions[position:other.start])
+        position = other.end
+    after.extend(instructions[position:])
+    return before, after
+
+
+class _Frozen(tuple):
+    """容器操作数在快照时的内容"""
+    __slots__ = ()
+
+
+def _freeze(operand):
+    if isinstance(operand, dict):
+        return _Frozen(item for key, value in operand.items() for item in (key, _freeze(value)))
+    if isinstance(operand, (list, tuple)):
+        return _Frozen(_freeze(item) for item in operand)
+    return operand
+
+
+def flatten(instructions: Sequence[IRInstruction]) -> list:
+    """
+    展开为操作码与操作数的列表，用于比较指令是否被修改
+
+    紧凑存储下指令对象在读取时重新构造，不能比较指令本身；
+    容器操作数复制为快照时的内容，原地修改容器也能被发现
+    """
+    items = []
+    for instr in instructions:
+        items.append(instr.opcode)
+        items.extend(map(_freeze, instr.operands))
+    return items
+
+
+def _same_item(a, b) -> bool:
+    if isinstance(a, _Frozen):
+        return isinstance(b, _Frozen) and len(a) == len(b) and all(map(_same_item, a, b))
+    return a is b
+
+
+def same(a: list, b: list) -> bool:
+    """比较 flatten 的结果"""
+    return len(a) == len(b) and all(map(_same_item, a, b))
+
+
+class RegionTracker:
+    """
+    脏区域跟踪器
+
+    与管道的修改版本号配合使用：区域被修改时记录当时的版本号，
+    Pass 在区域上运行时记录运行开始时的版本号，前者更新则区域对该 Pass 是脏的。
+
+    Attributes:
+        region_versions: 区域名 → 最近一次被修改时的版本号
+        last_run:        Pass 名 → {区域名 → 上次在该区域上运行时的版本号}
+        last_full_run:   Pass 名 → 上次在整个程序上运行时的版本号
+    """
+
+    def __init__(self):
+        self.region_versions: dict[str, int] = {}
+        self.last_run: dict[str, dict[str, int]] = {}
+        self.last_full_run: dict[str, int] = {}
+
+    @staticmethod
+    def snapshot(builder: IRBuilder) -> Optional[RegionSnapshot]:
+        """
+        记录各区域的指令快照
+
+        Returns:
+            区域名 → 对象列表；函数作用域名重复时无法区分区域，返回 None
+        """
+        instructions = builder.get_instructions()
+        regions = partition_regions(instructions)
+        snapshot: RegionSnapshot = {}
+        global_instructions = []
+        position = 0
+        for region in regions:
+            if region.name in snapshot or region.name == GLOBAL_REGION:
+                return None
+            global_instructions.extend(instructions[position:region.start])
+            snapshot[region.name] = flatten(instructions[region.start:region.end])
+            position = region.end
+        global_instructions.extend(instructions[position:])
+        snapshot[GLOBAL_REGION] = flatten(global_instructions)
+        return snapshot
+
+    def record_changes(self, before: Optional[RegionSnapshot], builder: IRBuilder, version: int) -> None:
+        """
+        比较 Pass 执行前后的快照，将被修改或新出现的区域标记为脏
+
+        只在 Pass 报告了修改时调用；找不到差异时说明 Pass 原地修改了快照无法区分的对象，标记所有区域
+
+        Args:
+            before:  执行前的快照
+            builder: 执行后的 IR
+            version: 本次修改的版本号
+        """
+        after = self.snapshot(builder)
+        if before is None or after is None:
+            self.mark_all(version)
+            return
+        changed = False
+        for name, items in after.items():
+            if name not in before or not same(before[name], items):
+                self.region_versions[name] = version
+                changed = True
+        if not changed and before.keys() == after.keys():
+            self.mark_all(version)
+
+    def mark_regions(self, names: set[str], version: int) -> None:
+        """将指定区域标记为脏"""
+        for name in names:
+            self.region_versions[name] = version
+
+    def mark_all(self, version: int) -> None:
+        """无法确定修改范围时，使所有 Pass 下次都在整个程序上运行"""
+        self.region_versions = {GLOBAL_REGION: version}
+
+    def record_full_run(self, pass_name: str, version: int) -> None:
+        """记录 Pass 在整个程序上运行"""
+        self.last_full_run[pass_name] = version
+        self.last_run[pass_name] = {}
+
+    def record_region_run(self, pass_name: str, regions: list[IRRegion], version: int) -> None:
+        """记录 Pass 在指定区域上运行"""
+        last_run = self.last_run.setdefault(pass_name, {})
+        for region in regions:
+            last_run[region.name] = version
+
+    def get_dirty_regions(self, pass_name: str, builder: IRBuilder) -> Optional[list[IRRegion]]:
+        """
+        获取 Pass 需要重新运行的函数区域
+
+        Returns:
+            脏区域列表（可能为空）；Pass 从未在整个程序上运行过、全局区域被修改过
+            或区域无法区分时返回 None，此时应在整个程序上运行
+        """
+        full_run = self.last_full_run.get(pass_name)
+        if full_run is None or self.region_versions.get(GLOBAL_REGION, 0) > full_run:
+            return None
+
+        regions = partition_regions(builder.get_instructions())
+        if len({region.name for region in regions}) != len(regions):
+            return None
+
+        last_run = self.last_run.get(pass_name, {})
+        return [
+            region for region in regions
+            if self.region_versions.get(region.name, 0) > last_run.get(region.name, full_run)
+        ]
@@ -0,0 +1,385 @@
+# coding=utf-8
+"""
+临时变量寄存器分配
+
+优化结束后、后端生成前运行。后端为每个 IR 临时变量生成独立的、带完整作用域路径的记分板持有者或存储路径，
+大函数会因此用到数百个不同的假玩家，存储中的临时数据也从不删除。本阶段对每个顶层函数做活跃区间分析，
+把活跃区间互不重叠的临时变量合并到共享的寄存器池上：
+    - 记分板临时变量（int / boolean）：持有者 #r0..#rN
+    - 存储临时变量（string）：存储路径 temp.s0..temp.sN
+函数退出（函数作用域结束与每条 RETURN 之前）时插入 FREE，删除函数用到的存储寄存器
+以及其他先写后读的 string 临时变量，避免存储随运行不断膨胀。
+
+执行时间线：
+  作用域体在跳转到它的位置执行。从函数作用域开始按执行顺序展开直接指令，
+  遇到跳转时展开目标作用域，得到线性的事件序列；跳转到已展开的作用域（循环回边）
+  形成循环区间，与循环区间部分重叠的活跃区间扩展为覆盖整个循环。
+  双目标条件跳转在执行真分支之后会再次读取条件，条件变量的活跃区间因此覆盖真分支。
+
+保守规则：
+  - 寄存器在整个数据包中共享，活跃区间跨越调用（函数调用、内置函数、跳转到函数外）的临时变量保留原名
+  - 在时间线上先读后写的临时变量（可能读取上一次执行留下的值）保留原名
+  - 同一事件中读取与写入的变量视为同时活跃，不会分配到同一寄存器
+  - 包含未识别指令的函数整体跳过
+
+被分配寄存器的临时变量不再声明，后端解析其路径时找不到声明作用域，直接使用寄存器名作为持有者或路径。
+"""
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Any, Optional, Sequence
+
+from dovetail.core.enums import FunctionType, PrimitiveDataType
+from dovetail.core.enums.types import ValueType, VariableType
+from dovetail.core.instructions import IRInstruction, IROpCode, IRFree
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.regions import partition_regions
+from dovetail.core.symbols import Reference, Variable
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+REGISTER_PREFIX = "#r"
+STORAGE_SLOT_PREFIX = "temp.s"
+
+# 寄存器池：(寄存器名前缀, 可合并的数据类型)
+_POOLS: tuple[tuple[str, tuple[PrimitiveDataType, ...]], ...] = (
+    (REGISTER_PREFIX, (PrimitiveDataType.INT, PrimitiveDataType.BOOLEAN)),
+    (STORAGE_SLOT_PREFIX, (PrimitiveDataType.STRING,)),
+)
+
+# 函数退出时需要删除的数据类型（存储在 storage 中）
+_FREED_DTYPES = (PrimitiveDataType.STRING,)
+
+# 第一个操作数为写入目标的指令
+_DEFINING_OPCODES = frozenset({
+    IROpCode.ASSIGN,
+    IROpCode.UNARY_OP,
+    IROpCode.BINARY_OP,
+    IROpCode.COMPARE,
+    IROpCode.CAST,
+    IROpCode.CALL,
+})
+
+# 能够确定读写与控制流的指令
+_KNOWN_OPCODES = _DEFINING_OPCODES | {
+    IROpCode.FUNCTION,
+    IROpCode.SCOPE_BEGIN,
+    IROpCode.SCOPE_END,
+    IROpCode.DECLARE,
+    IROpCode.JUMP,
+    IROpCode.COND_JUMP,
+    IROpCode.RETURN,
+    IROpCode.BREAK,
+    IROpCode.CONTINUE,
+    IROpCode.FREE,
+}
+
+_Event = tuple[frozenset[str], frozenset[str]]  # (读取的变量名, 写入的变量名)
+_EMPTY: frozenset[str] = frozenset()
+
+
+def _collect_names(operand: Any, names: set[str]) -> None:
+    """收集操作数中引用的变量名"""
+    if isinstance(operand, Variable):
+        names.add(operand.name)
+    elif isinstance(operand, Reference):
+        if operand.value_type == ValueType.VARIABLE:
+            names.add(operand.get_name())
+    elif isinstance(operand, dict):
+        for item in operand.values():
+            _collect_names(item, names)
+    elif isinstance(operand, (list, tuple)):
+        for item in operand:
+            _collect_names(item, names)
+
+
+def _names(*operands: Any) -> frozenset[str]:
+    names: set[str] = set()
+    for operand in operands:
+        _collect_names(operand, names)
+    return frozenset(names)
+
+
+def _rename(operand: Any, mapping: dict[str, Variable]) -> Any:
+    """替换操作数中的变量，没有需要替换的变量时返回原对象"""
+    if isinstance(operand, Variable):
+        return mapping.get(operand.name, operand)
+    if isinstance(operand, Reference):
+        if operand.value_type == ValueType.VARIABLE and operand.get_name() in mapping:
+            return Reference(mapping[operand.get_name()])
+        return operand
+    if isinstance(operand, dict):
+        renamed = {key: _rename(value, mapping) for key, value in operand.items()}
+        return operand if all(renamed[key] is value for key, value in operand.items()) else renamed
+    if isinstance(operand, (list, tuple)):
+        renamed = [_rename(item, mapping) for item in operand]
+        if all(a is b for a, b in zip(renamed, operand)):
+            return operand
+        return type(operand)(renamed)
+    return operand
+
+
+class _Timeline:
+    """
+    函数的线性执行时间线
+
+    Attributes:
+        events:   事件序列
+        barriers: 调用所在的事件索引（升序）
+        loops:    循环区间 (起始事件索引, 回边事件索引)
+        entered:  已展开的作用域名 → 展开时的事件索引
+    """
+
+    def __init__(self, root: str, bodies: dict[str, list[IRInstruction]]):
+        self.events: list[_Event] = []
+        self.barriers: list[int] = []
+        self.loops: list[tuple[int, int]] = []
+        self.entered: dict[str, int] = {}
+        self._root = root
+        self._bodies = bodies
+        self._enter(root)
+
+    def _enter(self, scope: str) -> None:
+        self.entered[scope] = len(self.events)
+        for instr in self._bodies[scope]:
+            self._visit(instr)
+
+    def _marker(self) -> int:
+        self.events.append((_EMPTY, _EMPTY))
+        return len(self.events) - 1
+
+    def _execute(self, target: Optional[str]) -> None:
+        """在当前位置执行目标作用域"""
+        if target is None:
+            return
+        if target == self._root or target not in self._bodies:
+            self.barriers.append(self._marker())
+        elif target in self.entered:
+            self.loops.append((self.entered[target], self._marker()))
+        else:
+            self._enter(target)
+
+    def _visit(self, instr: IRInstruction) -> None:
+        opcode = instr.opcode
+        operands = instr.operands
+        if opcode == IROpCode.COND_JUMP:
+            cond, true_scope, false_scope = operands
+            reads = _names(cond)
+            self.events.append((reads, _EMPTY))
+            self._execute(true_scope)
+            if false_scope is not None:
+                self.events.append((reads, _EMPTY))
+                self._execute(false_scope)
+        elif opcode == IROpCode.JUMP:
+            self._execute(operands[0])
+        elif opcode == IROpCode.CALL:
+            result, func, args = operands
+            reads = _names(args)
+            writes = _names(result)
+            self.events.append((reads, _EMPTY))
+            self.barriers.append(self._marker())
+            # 内置函数生成的命令可能先写结果再读取实参，二者视为同时活跃
+            self.events.append((reads if func.func_type == FunctionType.BUILTIN else _EMPTY, writes))
+        elif opcode in _DEFINING_OPCODES:
+            self.events.append((_names(*operands[1:]), _names(operands[0])))
+        elif opcode != IROpCode.DECLARE:
+            self.events.append((_names(*operands), _EMPTY))
+
+
+def _build_bodies(instructions: Sequence[IRInstruction]) -> Optional[tuple[str, dict[str, list[IRInstruction]]]]:
+    """
+    拆分各作用域的直接指令
+
+    Returns:
+        (函数作用域名, 作用域名 → 直接指令)；作用域名重复或包含未识别指令时返回 None
+    """
+    bodies: dict[str, list[IRInstruction]] = {}
+    stack: list[str] = []
+    root: Optional[str] = None
+    for instr in instructions:
+        if instr.opcode not in _KNOWN_OPCODES:
+            return None
+        if instr.opcode == IROpCode.SCOPE_BEGIN:
+            name = instr.operands[0]
+            if name in bodies:
+                return None
+            bodies[name] = []
+            if root is None:
+                root = name
+            stack.append(name)
+        elif instr.opcode == IROpCode.SCOPE_END:
+            stack.pop()
+        elif stack:
+            bodies[stack[-1]].append(instr)
+    return (root, bodies) if root is not None else None
+
+
+def _live_intervals(
+        timeline: _Timeline,
+        candidates: set[str],
+        unreached: frozenset[str]
+) -> tuple[dict[str, tuple[int, int]], set[str]]:
+    """
+    计算可分配临时变量的活跃区间（闭区间，事件索引）
+
+    Returns:
+        (可分配的临时变量 → 活跃区间, 先写后读但跨越调用的临时变量)
+    """
+    first: dict[str, int] = {}
+    last: dict[str, int] = {}
+    pinned = set(unreached)
+    for index, (reads, writes) in enumerate(timeline.events):
+        for name in reads:
+            if name not in first:
+                pinned.add(name)
+                first[name] = index
+            last[name] = index
+        for name in writes:
+            first.setdefault(name, index)
+            last[name] = index
+
+    intervals: dict[str, tuple[int, int]] = {}
+    spanning: set[str] = set()
+    for name in candidates - pinned:
+        if name not in first:
+            continue
+        start, end = first[name], last[name]
+        extended = True
+        while extended:
+            extended = False
+            for loop_start, loop_end in timeline.loops:
+                overlaps = start <= loop_end and end >= loop_start
+                if overlaps and not (loop_start <= start and end <= loop_end):
+                    if loop_start < start or loop_end > end:
+                        start, end = min(start, loop_start), max(end, loop_end)
+                        extended = True
+
+        # 跨越调用仍然活跃
+        position = bisect.bisect_right(timeline.barriers, start)
+        if position < len(timeline.barriers) and timeline.barriers[position] < end:
+            spanning.add(name)
+            continue
+        intervals[name] = (start, end)
+    return intervals, spanning
+
+
+def _assign_registers(intervals: dict[str, tuple[int, int]]) -> dict[str, int]:
+    """线性扫描分配寄存器，总是复用编号最小的空闲寄存器"""
+    assignment: dict[str, int] = {}
+    active: list[tuple[int, int]] = []  # (结束位置, 寄存器)
+    free: list[int] = []
+    count = 0
+    for name, (start, end) in sorted(intervals.items(), key=lambda item: (item[1], item[0])):
+        while active and active[0][0] < start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        if free:
+            register = heapq.heappop(free)
+        else:
+            register = count
+            count += 1
+        assignment[name] = register
+        heapq.heappush(active, (end, register))
+    return assignment
+
+
+def _insert_frees(instructions: list[IRInstruction], freed: list[Variable]) -> list[IRInstruction]:
+    """在每条 RETURN 之前（跳过被返回的变量）与函数作用域结束之前插入 FREE"""
+    if not freed:
+        return instructions
+    result: list[IRInstruction] = []
+    for index, instr in enumerate(instructions):
+        if instr.opcode == IROpCode.RETURN:
+            returned = _names(*instr.operands)
+            result.extend(IRFree(var) for var in freed if var.name not in returned)
+        elif index == len(instructions) - 1 and result[-1].opcode != IROpCode.RETURN:
+            # 以 RETURN 结尾的函数作用域结束处的命令不会执行
+            result.extend(IRFree(var) for var in freed)
+        result.append(instr)
+    return result
+
+
+def allocate_function_registers(instructions: Sequence[IRInstruction]) -> Optional[list[IRInstruction]]:
+    """
+    为单个函数区域分配寄存器
+
+    Args:
+        instructions: 函数区域的指令（FUNCTION 声明与 SCOPE_BEGIN … SCOPE_END）
+
+    Returns:
+        改写后的指令；没有可分配或需要释放的临时变量时返回 None
+    """
+    parsed = _build_bodies(instructions)
+    if parsed is None:
+        return None
+    root, bodies = parsed
+
+    pooled_dtypes = tuple(dtype for _, dtypes in _POOLS for dtype in dtypes)
+    temporaries: dict[str, Variable] = {}
+    for instr in instructions:
+        if instr.opcode == IROpCode.DECLARE:
+            var: Variable = instr.operands[0]
+            if var.var_type == VariableType.TEMPORARY and var.dtype in pooled_dtypes:
+                temporaries[var.name] = var
+    if not temporaries:
+        return None
+
+    timeline = _Timeline(root, bodies)
+    unreached = frozenset().union(*(
+        _names(*instr.operands)
+        for scope, body in bodies.items() if scope not in timeline.entered
+        for instr in body
+    ))
+    intervals, spanning = _live_intervals(timeline, set(temporaries), unreached)
+
+    mapping: dict[str, Variable] = {}
+    for prefix, dtypes in _POOLS:
+        pool = {name: interval for name, interval in intervals.items() if temporaries[name].dtype in dtypes}
+        for name, register in _assign_registers(pool).items():
+            mapping[name] = Variable(f"{prefix}{register}", temporaries[name].dtype, VariableType.TEMPORARY)
+
+    # 存储寄存器与未合并的存储临时变量在函数退出时都已不再活跃
+    freed = {var.name: var for var in mapping.values() if var.dtype in _FREED_DTYPES}
+    freed.update(
+        (name, temporaries[name]) for name in spanning
+        if temporaries[name].dtype in _FREED_DTYPES
+    )
+    if not mapping and not freed:
+        return None
+
+    result: list[IRInstruction] = []
+    for instr in instructions:
+        if instr.opcode == IROpCode.DECLARE and instr.operands[0].name in mapping:
+            continue
+        operands = [_rename(operand, mapping) for operand in instr.operands]
+        if all(a is b for a, b in zip(operands, instr.operands)):
+            result.append(instr)
+        else:
+            result.append(IRInstruction(instr.opcode, *operands))
+    return _insert_frees(result, [freed[name] for name in sorted(freed)])
+
+
+def allocate_registers(builder: IRBuilder) -> int:
+    """
+    为所有顶层函数分配寄存器（原地修改）
+
+    Args:
+        builder: 优化后的 IR
+
+    Returns:
+        被合并到寄存器上的临时变量数
+    """
+    instructions = builder.get_instructions()
+    allocated = 0
+    # 从后往前替换，不影响尚未处理区域的索引
+    for region in reversed(partition_regions(instructions)):
+        original = instructions[region.start:region.end]
+        rewritten = allocate_function_registers(original)
+        if rewritten is None:
+            continue
+        allocated += sum(instr.opcode == IROpCode.DECLARE for instr in original)
+        allocated -= sum(instr.opcode == IROpCode.DECLARE for instr in rewritten)
+        instructions[region.start:region.end] = rewritten
+    logger.debug(f"寄存器分配：{allocated} 个临时变量合并到寄存器")
+    return allocated
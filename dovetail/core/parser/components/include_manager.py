@@ -168,13 +168,14 @@ class IncludeManager:
             return False
         return str(include_path.resolve()) in self._included_paths
 
-    def search_include_path(self, filepath: Path, meta: Meta) -> Path | None:
+    def search_include_path(self, filepath: Path, meta: Optional[Meta], silent: bool = False) -> Path | None:
         """
         搜索导入文件的实际路径
 
         Args:
             filepath: 待搜索的文件路径
             meta: 代码元信息（用于错误报告）
+            silent: 未找到时不报告错误
 
         Returns:
             找到的完整路径，未找到则返回 None
@@ -190,6 +191,8 @@ class IncludeManager:
 
         if include_path:
             return include_path
+        elif silent:
+            return None
         else:
             self.error_reporter.report(
                 Errors.IncludePathError,
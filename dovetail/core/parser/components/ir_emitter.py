@@ -4,13 +4,12 @@ IR 发射器模块
 
 提供高级 IR 生成接口，封装常用模式，但保持底层灵活性。
 """
-import itertools
 from contextlib import contextmanager
 from typing import Optional, Iterator
 
 from lark.tree import Meta
 
-from dovetail.core.enums import StructureType, BinaryOps, CompareOps, PrimitiveDataType
+from dovetail.core.enums import StructureType, BinaryOps, CompareOps, PrimitiveDataType, VariableType
 from dovetail.core.enums.datatypes import DataTypeBase
 from dovetail.core.errors import Errors
 from dovetail.core.instructions import (
@@ -23,6 +22,7 @@ from dovetail.core.parser.components.symbol_resolver import SymbolResolver
 from dovetail.core.parser.components.type_checker import TypeChecker
 from dovetail.core.symbols import Variable, Reference
 from dovetail.utils.naming import NameDecorator
+from dovetail.utils.peekable_counter import PeekableCounter
 
 
 class IREmitter:
@@ -46,8 +46,8 @@ class IREmitter:
         self.builder = builder
         self.error_reporter = error_reporter
         self.type_checker = type_checker
-        self.temp_counter = itertools.count()
-        self.label_counter = itertools.count()
+        self.temp_counter = PeekableCounter()
+        self.label_counter = PeekableCounter()
 
     # ==================== 核心方法 ====================
 
@@ -144,7 +144,7 @@ class IREmitter:
         Returns:
             新创建的临时变量
         """
-        return Variable(f"{prefix}_{next(self.temp_counter)}_", dtype)
+        return Variable(f"{prefix}_{next(self.temp_counter)}_", dtype, VariableType.TEMPORARY)
 
     def create_temp_var_declared(
             self,
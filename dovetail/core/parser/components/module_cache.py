@@ -0,0 +1,303 @@
+# coding=utf-8
+"""
+模块级 IR 缓存
+
+.mcdc 只缓存语法树，被包含的文件每次编译仍要重新走一遍 ASTVisitor。
+本模块在 .mcdc 之上再缓存一层：每个被包含文件访问后产生的 IR 片段
+以及它导出到顶层作用域的符号，命中时由 ASTVisitor.include 直接拼接。
+
+缓存格式（pickle，与源文件同目录，后缀 .mcdm）：
+    {
+        "key":          str,              # 源文件 + 语法 + 编译配置 + 访问环境的指纹
+        "dependencies": dict[str, str],   # 自身及间接包含的文件路径 -> 源文件 MD5
+        "included":     list[str],        # 自身及间接包含的、需要登记到 IncludeManager 的路径
+        "libraries":    list[str],        # 访问期间加载的内置库，命中时重放
+        "counters":     tuple[int, ...],  # 访问结束后各命名计数器的值
+        "payload":      bytes,            # IR 片段与导出符号（外部符号按名引用）
+    }
+
+外部符号（访问前已存在于顶层作用域的符号、内置库符号及其方法）不随缓存序列化，
+而是记录名称，加载时（拼接导出符号之前）到当前顶层作用域重新解析，保证与本次编译中的对象同一。
+被模块同名覆盖的外部符号同样按名引用，因为解析发生在覆盖之前。
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import pickle
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import define, field
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.config import MODULE_CACHE_FILE_PREFIX
+from dovetail.core.instructions import IRInstruction
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.parser.scope import Scope
+from dovetail.core.symbols import Symbol
+from dovetail.core.symbols.base import MethodHost
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class _UnresolvedSymbol(Exception):
+    """外部符号在当前顶层作用域中不存在"""
+    pass
+
+
+def _file_hash(filepath: Path) -> Optional[str]:
+    """计算源文件 MD5，与 parser 中 .mcdc 的计算方式保持一致"""
+    try:
+        return hashlib.md5(filepath.read_text(encoding='utf-8').encode()).hexdigest()
+    except OSError:
+        return None
+
+
+def _external_refs(symbols: dict[str, Symbol]) -> dict[int, tuple]:
+    """收集可按名引用的外部符号：id(对象) -> 引用标识"""
+    refs: dict[int, tuple] = {}
+    for name, symbol in symbols.items():
+        refs[id(symbol)] = ("symbol", name)
+        if isinstance(symbol, MethodHost):
+            for method_name, method in symbol.methods.items():
+                refs.setdefault(id(method), ("method", name, method_name))
+    return refs
+
+
+class _PayloadPickler(pickle.Pickler):
+    def __init__(self, file, refs: dict[int, tuple]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._refs = refs
+
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        return self._refs.get(id(obj))
+
+
+class _PayloadUnpickler(pickle.Unpickler):
+    def __init__(self, file, top_scope: Scope):
+        super().__init__(file)
+        self._top_scope = top_scope
+
+    def persistent_load(self, pid: tuple) -> Any:
+        symbol = self._top_scope.find_symbol(pid[1])
+        if symbol is not None and pid[0] == "method":
+            symbol = symbol.get_method(pid[2]) if isinstance(symbol, MethodHost) else None
+        if symbol is None:
+            raise _UnresolvedSymbol(pid)
+        return symbol
+
+
+@define(slots=True)
+class ModuleRecord:
+    """
+    单个被包含文件的访问记录
+
+    Attributes:
+        filepath: 被包含文件路径
+        key: 缓存键
+        start: 访问开始时 IR 构建器中的指令数
+        symbols_before: 访问开始时顶层作用域的符号表快照
+        error_count: 访问开始时的报错数
+        dependencies: 间接包含的文件及其 MD5
+        included: 访问期间新登记的包含路径
+        libraries: 访问期间首次加载的内置库
+        library_ranges: 内置库加载时发射的指令区间，保存时剔除
+        library_symbols: 内置库注册到顶层作用域的符号，保存时剔除
+    """
+    filepath: Path
+    key: str
+    start: int
+    symbols_before: dict[str, Symbol]
+    error_count: int
+    dependencies: dict[str, str] = field(factory=dict)
+    included: list[str] = field(factory=list)
+    libraries: list[str] = field(factory=list)
+    library_ranges: list[tuple[int, int]] = field(factory=list)
+    library_symbols: dict[str, Symbol] = field(factory=dict)
+
+
+@define(slots=True)
+class CachedModule:
+    """
+    命中的模块缓存
+
+    Attributes:
+        instructions: 需要拼接的 IR 片段
+        symbols: 导出到顶层作用域的符号，保持定义顺序
+        included: 需要登记到 IncludeManager 的路径
+        counters: 访问结束后各命名计数器的值
+    """
+    instructions: list[IRInstruction]
+    symbols: list[Symbol]
+    included: list[str]
+    counters: tuple[int, ...]
+
+
+class ModuleCache:
+    """
+    模块级 IR 缓存管理器
+
+    由 ASTVisitor 持有。包含文件时先 load 尝试命中，未命中则在 begin/end 之间
+    正常访问并记录，访问期间的内置库加载与嵌套包含通过 note_* 通知所有正在记录的模块。
+    """
+
+    def __init__(self, config: CompileConfig, grammar_hash: str, enabled: bool = True):
+        self.config = config
+        self.grammar_hash = grammar_hash
+        self.enabled = enabled
+        self._records: list[ModuleRecord] = []
+
+    @staticmethod
+    def _get_cache_path(filepath: Path) -> Path:
+        return filepath.with_suffix(MODULE_CACHE_FILE_PREFIX)
+
+    def make_key(
+            self,
+            filepath: Path,
+            top_scope: Scope,
+            included_paths: list[str],
+            counters: tuple[int, ...]
+    ) -> Optional[str]:
+        """
+        计算缓存键
+
+        除源文件与语法外，访问结果还取决于编译配置、此前已定义的符号、
+        已包含的文件（决定嵌套 include 是否被跳过）以及命名计数器的起点，全部计入指纹。
+
+        Returns:
+            缓存键，源文件不可读时返回 None
+        """
+        file_hash = _file_hash(filepath)
+        if file_hash is None:
+            return None
+        digest = hashlib.md5()
+        for part in (
+                file_hash,
+                self.grammar_hash,
+                repr(self.config),
+                "\0".join(sorted(top_scope.get_symbols())),
+                "\0".join(sorted(included_paths)),
+                repr(counters),
+        ):
+            digest.update(part.encode())
+            digest.update(b"\1")
+        return digest.hexdigest()
+
+    # ==================== 读取 ====================
+
+    def load(self, filepath: Path, key: str, top_scope: Scope, load_library) -> Optional[CachedModule]:
+        """
+        尝试读取模块缓存
+
+        Args:
+            filepath: 被包含文件路径
+            key: make_key 计算出的缓存键
+            top_scope: 顶层作用域，用于解析外部符号
+            load_library: 内置库加载回调，解析外部符号前重放
+
+        Returns:
+            命中时返回 CachedModule，否则返回 None
+        """
+        cache_path = self._get_cache_path(filepath)
+        if not self.enabled or not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get("key") != key:
+                return None
+            for dep_path, dep_hash in cached["dependencies"].items():
+                if _file_hash(Path(dep_path)) != dep_hash:
+                    return None
+
+            for library_name in cached["libraries"]:
+                load_library(library_name)
+
+            instructions, symbols = _PayloadUnpickler(io.BytesIO(cached["payload"]), top_scope).load()
+        except Exception as e:
+            # 缓存损坏、格式不兼容或外部符号缺失，回退为正常访问
+            logger.debug(f"模块缓存 '{cache_path.name}' 失效: {e!r}")
+            return None
+
+        self.note_included(cached["included"], cached["dependencies"])
+        logger.info(f"包含文件 '{filepath.name}' 命中模块缓存，跳过访问.")
+        return CachedModule(instructions, symbols, cached["included"], cached["counters"])
+
+    # ==================== 记录 ====================
+
+    def begin(self, filepath: Path, key: str, builder: IRBuilder, top_scope: Scope, error_count: int) -> ModuleRecord:
+        """开始记录一个被包含文件的访问"""
+        record = ModuleRecord(filepath, key, len(builder), top_scope.get_symbols(), error_count)
+        self._records.append(record)
+        return record
+
+    def note_library(self, library_name: str, start: int, end: int, symbols: dict[str, Symbol]) -> None:
+        """通知所有正在记录的模块：加载了一个内置库"""
+        for record in self._records:
+            record.libraries.append(library_name)
+            record.library_ranges.append((start, end))
+            record.library_symbols.update(symbols)
+
+    def note_included(self, included: list[str], dependencies: dict[str, str]) -> None:
+        """通知所有正在记录的模块：包含了一个文件（无论是否命中缓存）"""
+        for record in self._records:
+            record.included.extend(included)
+            record.dependencies.update(dependencies)
+
+    def abort(self, record: ModuleRecord) -> None:
+        """访问异常中断，放弃记录"""
+        self._records.remove(record)
+
+    def end(
+            self,
+            record: ModuleRecord,
+            builder: IRBuilder,
+            top_scope: Scope,
+            error_count: int,
+            counters: tuple[int, ...]
+    ) -> None:
+        """
+        结束记录，访问无报错时写入缓存
+
+        写入失败不影响主流程，静默忽略。
+        """
+        self._records.remove(record)
+        file_hash = _file_hash(record.filepath)
+        if file_hash is None:
+            return
+        dependencies = {str(record.filepath): file_hash, **record.dependencies}
+        included = [str(record.filepath), *record.included]
+        self.note_included(included, dependencies)
+
+        if not self.enabled or error_count != record.error_count:
+            return
+
+        # 剔除内置库发射的指令，命中时由重放负责
+        instructions = builder.get_instructions()[record.start:]
+        for start, end in reversed(record.library_ranges):
+            del instructions[start - record.start:end - record.start]
+
+        external = {**record.symbols_before, **record.library_symbols}
+        exported = {
+            name: symbol for name, symbol in top_scope.get_symbols().items()
+            if external.get(name) is not symbol
+        }
+
+        try:
+            payload = io.BytesIO()
+            _PayloadPickler(payload, _external_refs(external)).dump(
+                (instructions, list(exported.values()))
+            )
+            with open(self._get_cache_path(record.filepath), 'wb') as f:
+                pickle.dump({
+                    "key": record.key,
+                    "dependencies": dependencies,
+                    "included": included,
+                    "libraries": record.libraries,
+                    "counters": counters,
+                    "payload": payload.getvalue(),
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.debug(f"写入模块缓存 '{record.filepath.name}' 失败: {e!r}")
@@ -1,19 +1,24 @@
 # coding=utf-8
 import ast
 import hashlib
+import os
 import pickle
+import re
 import time
 from collections.abc import Generator
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, BinaryIO
 
 from lark import Lark, Tree
 
 from dovetail.core.config import MAX_FILE_SIZE, CACHE_FILE_PREFIX
 from dovetail.core.errors import report, Errors
+from dovetail.core.lib.library_mapping import LibraryMapping
 from dovetail.core.parser.components import ErrorReporter
+from dovetail.core.parser.components.include_manager import IncludeManager
 from dovetail.utils.logger import get_logger
-from dovetail.utils.resource import resolve_project_path
+from dovetail.utils.resource import resolve_project_path, IS_COMPILED
 
 # 初始化 Lark 解析器
 _LARK_GRAMMAR_PATH = Path(resolve_project_path("lark/dovetail.lark"))
@@ -32,6 +37,15 @@ lark_parser = Lark(
 # 语法变了 → 所有 .mcdc 缓存自动失效
 _GRAMMAR_HASH: str = hashlib.md5(_lark_grammar_text.encode()).hexdigest()
 
+# 预解析时扫描 include 语句，只需找出依赖，不必完整解析
+_INCLUDE_PATTERN = re.compile(r'^[ \t]*include[ \t]+"((?:[^"\\]|\\.)*)"', re.MULTILINE)
+_COMMENT_PATTERN = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+# 常驻进程（dovetail serve）中保留已解析 AST 的序列化结果：路径 -> (源文件 MD5, 解析起点, AST)
+# 访问器会就地修改语法树，因此保存序列化结果，每次取用时反序列化出新的副本
+_ast_memory_cache: dict[Path, tuple[str, str, bytes]] = {}
+_keep_ast_in_memory = False
+
 logger = get_logger(__name__)
 
 
@@ -49,31 +63,52 @@ def _compute_file_hash(content: str) -> str:
     return hashlib.md5(content.encode()).hexdigest()
 
 
+def _check_ast_cache_header(f: BinaryIO, file_hash: str, start: str) -> bool:
+    """
+    读取并校验 .mcdc 缓存文件头，文件指针停在 AST 之前。
+
+    缓存格式（两段连续的 pickle）：
+        1. 文件头 {
+               "grammar_hash": str,   # 语法文件 MD5
+               "file_hash":    str,   # 源文件 MD5
+               "start":        str,   # 解析起点，如 "program"
+           }
+        2. 序列化的 Lark AST
+
+    文件头单独成段，校验时无需反序列化整棵 AST。
+    """
+    header = pickle.load(f)
+    return (
+            isinstance(header, dict)
+            and header.get("grammar_hash") == _GRAMMAR_HASH
+            and header.get("file_hash") == file_hash
+            and header.get("start") == start
+    )
+
+
+def _is_ast_cache_valid(cache_path: Path, file_hash: str, start: str) -> bool:
+    """判断 .mcdc 缓存是否有效，只读取文件头"""
+    if not cache_path.exists():
+        return False
+    try:
+        with open(cache_path, 'rb') as f:
+            return _check_ast_cache_header(f, file_hash, start)
+    except Exception:
+        return False
+
+
 def _load_ast_cache(cache_path: Path, file_hash: str, start: str) -> Optional[Tree]:
     """
     尝试从 .mcdc 缓存文件中读取 AST。
 
-    缓存格式（pickle）：
-        {
-            "grammar_hash": str,   # 语法文件 MD5
-            "file_hash":    str,   # 源文件 MD5
-            "start":        str,   # 解析起点，如 "program"
-            "tree":         Tree,  # 序列化的 Lark AST
-        }
-
-    任意字段不匹配则视为缓存失效，返回 None。
+    文件头任意字段不匹配则视为缓存失效，返回 None。
     """
     if not cache_path.exists():
         return None
     try:
         with open(cache_path, 'rb') as f:
-            cached = pickle.load(f)
-        if (
-                cached.get("grammar_hash") == _GRAMMAR_HASH
-                and cached.get("file_hash") == file_hash
-                and cached.get("start") == start
-        ):
-            return cached["tree"]
+            if _check_ast_cache_header(f, file_hash, start):
+                return pickle.load(f)
     except Exception:
         # 缓存损坏或格式不兼容，静默忽略，重新解析即可
         pass
@@ -91,12 +126,20 @@ def _save_ast_cache(cache_path: Path, file_hash: str, start: str, tree: Tree) ->
                 "grammar_hash": _GRAMMAR_HASH,
                 "file_hash": file_hash,
                 "start": start,
-                "tree": tree,
             }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(tree, f, protocol=pickle.HIGHEST_PROTOCOL)
     except Exception:
         pass
 
 
+def keep_ast_in_memory(enabled: bool = True) -> None:
+    """开启或关闭进程内 AST 缓存，供常驻编译服务使用"""
+    global _keep_ast_in_memory
+    _keep_ast_in_memory = enabled
+    if not enabled:
+        _ast_memory_cache.clear()
+
+
 def parser_code(code: str, start: Optional[str] = None) -> Tree:
     """
     解析代码生成 AST
@@ -151,20 +194,123 @@ def parser_file(filepath: Path, start: Optional[str] = None, error_reporter: Opt
     file_hash = _compute_file_hash(code)
     cache_path = _get_ast_cache_path(filepath)
 
+    # 尝试命中进程内缓存
+    if _keep_ast_in_memory:
+        cached = _ast_memory_cache.get(filepath)
+        if cached is not None and cached[:2] == (file_hash, parse_start):
+            return pickle.loads(cached[2])
+
     # 尝试命中缓存
     tree = _load_ast_cache(cache_path, file_hash, parse_start)
     if tree is not None:
         elapsed = time.perf_counter() - start_time
         logger.info(f"解析文件 '{filepath.name}' 命中缓存，用时 {elapsed:.3f}s.")
-        return tree
+    else:
+        # 缓存未命中，正常解析并写回缓存
+        tree = parser_code(code, start=start)
+        _save_ast_cache(cache_path, file_hash, parse_start, tree)
+        elapsed = time.perf_counter() - start_time
+        logger.info(f"解析文件 '{filepath.name}' 用时 {elapsed:.3f}s.")
 
-    # 缓存未命中，正常解析并写回缓存
-    tree = parser_code(code, start=start)
-    _save_ast_cache(cache_path, file_hash, parse_start, tree)
+    if _keep_ast_in_memory:
+        _ast_memory_cache[filepath] = (file_hash, parse_start, pickle.dumps(tree, protocol=pickle.HIGHEST_PROTOCOL))
+    return tree
+
+
+def _warm_ast_cache(filepath: Path, start: str) -> bool:
+    """
+    解析文件并写入 .mcdc 缓存，供预解析进程池调用。
+
+    子进程中不报告错误，解析失败交由主进程访问时按正常流程报告。
+    """
+    try:
+        code = filepath.read_text(encoding='utf-8')
+        tree = parser_code(code, start=start)
+    except Exception:
+        return False
+    _save_ast_cache(_get_ast_cache_path(filepath), _compute_file_hash(code), start, tree)
+    return True
+
+
+def _scan_includes(code: str) -> list[str]:
+    """粗略扫描源码中的 include 路径（忽略注释），多扫出的路径只会多预解析一个文件"""
+    return _INCLUDE_PATTERN.findall(_COMMENT_PATTERN.sub('', code))
+
+
+def _find_stale_files(entry_file: Path, include_manager: IncludeManager) -> list[Path]:
+    """
+    从入口文件出发扫描所有可达的被包含文件，返回 .mcdc 缓存失效的文件
+
+    Args:
+        entry_file: 编译入口文件
+        include_manager: 包含管理器，用于按编译器的规则解析 include 路径
+    """
+    pending: list[Path] = [entry_file.resolve()]
+    visited: set[Path] = set()
+    stale: list[Path] = []
+
+    while pending:
+        filepath = pending.pop()
+        if filepath in visited:
+            continue
+        visited.add(filepath)
+
+        try:
+            if filepath.stat().st_size >= MAX_FILE_SIZE:
+                continue
+            code = filepath.read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            continue
+
+        if not _is_ast_cache_valid(_get_ast_cache_path(filepath), _compute_file_hash(code), "program"):
+            stale.append(filepath)
+
+        for include_path in _scan_includes(code):
+            if LibraryMapping.has(include_path):
+                continue
+            found = include_manager.search_include_path(Path(include_path), None, silent=True)
+            if found is not None:
+                pending.append(found.resolve())
+    return stale
+
+
+def preparse_include_graph(
+        entry_file: Path,
+        include_manager: IncludeManager,
+        max_workers: Optional[int] = None
+) -> int:
+    """
+    预解析入口文件的整个包含图，并行预热 .mcdc 缓存。
+
+    先从入口文件出发扫描所有可达的被包含文件，筛出缓存失效的文件，
+    再交给进程池并发解析。访问阶段的 parser_file 随后即可直接命中缓存。
+    失效文件少于两个或只有一个可用核心时并行没有收益，直接跳过。
+    打包后的可执行文件在不支持 fork 的平台（Windows）上以 spawn 方式重新启动自身作为工作进程，
+    无法可靠运行进程池，同样跳过，由访问阶段顺序解析。
+
+    Args:
+        entry_file: 编译入口文件
+        include_manager: 包含管理器，用于按编译器的规则解析 include 路径
+        max_workers: 最大进程数，默认取 CPU 核心数
+
+    Returns:
+        预解析的文件数
+    """
+    if IS_COMPILED and not hasattr(os, "fork"):
+        return 0
+
+    stale = _find_stale_files(entry_file, include_manager)
+    workers = min(len(stale), max_workers or os.cpu_count() or 1)
+    if workers < 2:
+        return 0
+
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        parsed = sum(executor.map(_warm_ast_cache, stale, ["program"] * len(stale)))
 
     elapsed = time.perf_counter() - start_time
-    logger.info(f"解析文件 '{filepath.name}' 用时 {elapsed:.3f}s.")
-    return tree
+    logger.info(f"并行预解析 {parsed} 个文件（{workers} 进程）用时 {elapsed:.3f}s.")
+    return parsed
 
 
 def parse_fstring_iter(fstring: str) -> Generator[tuple[str, str], None, None]:
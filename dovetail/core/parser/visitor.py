@@ -36,6 +36,7 @@ from lark.visitors import Interpreter
 from dovetail.core.annotations.base import AnnotationTarget
 from dovetail.core.annotations.spec import Annotation
 from dovetail.core.compile_config import CompileConfig
+from dovetail.core.config import ENABLE_MODULE_CACHE
 from dovetail.core.enums import (
     StructureType, PrimitiveDataType, FunctionType,
     ValueType, BinaryOps, UnaryOps, CompareOps
@@ -52,15 +53,17 @@ from dovetail.core.parser.components.annotation_processor import AnnotationProce
 from dovetail.core.parser.components.error_reporter import ErrorReporter
 from dovetail.core.parser.components.include_manager import IncludeManager, CircularIncludeException
 from dovetail.core.parser.components.ir_emitter import IREmitter
+from dovetail.core.parser.components.module_cache import ModuleCache
 from dovetail.core.parser.components.symbol_resolver import SymbolResolver
 from dovetail.core.parser.components.type_checker import TypeChecker
-from dovetail.core.parser.parser import parser_file, parse_fstring_iter, parser_code
+from dovetail.core.parser.parser import parser_file, parse_fstring_iter, parser_code, _GRAMMAR_HASH
 from dovetail.core.parser.scope import Scope
 from dovetail.core.symbols import Variable, Reference, Literal, Function, Class, Parameter
 from dovetail.core.symbols.base import MethodHost
 from dovetail.core.symbols.structure import Structure
 from dovetail.core.symbols.typedef import Typedef
 from dovetail.utils.naming import NameDecorator
+from dovetail.utils.peekable_counter import PeekableCounter
 
 _n = NameDecorator.normalize
 _dn = NameDecorator.denormalize
@@ -128,7 +131,9 @@ class ASTVisitor(Interpreter):
 
         self.include_manager = IncludeManager(self.error_reporter, entry_file, self.config.lib_path)
 
-        self.counter = itertools.count()
+        self.counter = PeekableCounter()
+
+        self.module_cache = ModuleCache(config, _GRAMMAR_HASH, ENABLE_MODULE_CACHE)
 
         # 加载内置库
         self._load_library("builtins")
@@ -152,6 +157,8 @@ class ASTVisitor(Interpreter):
         if library is None:
             return
         try:
+            start = len(self.builder)
+            symbols_before = self.symbol_resolver.current_scope.get_symbols()
             library.load()
 
             # 注册函数符号和处理器
@@ -171,9 +178,71 @@ class ASTVisitor(Interpreter):
                 for method_name, handler in method_handlers.items():
                     self.builtin_function[f"{class_.name}::{method_name}"] = handler
 
+            # 通知模块缓存：库的符号与指令由命中时重放产生，不进入缓存
+            self.module_cache.note_library(
+                library_name, start, len(self.builder),
+                {
+                    name: symbol for name, symbol in self.symbol_resolver.current_scope.get_symbols().items()
+                    if symbols_before.get(name) is not symbol
+                }
+            )
+
         except Exception as e:
             self.error_reporter.report(Errors.LibraryLoad, library.get_name(), e.__repr__())
 
+    def _get_counters(self) -> tuple[int, ...]:
+        """获取所有命名计数器的当前值，模块缓存据此保证生成的名称不冲突"""
+        return self.counter.peek(), self.ir_emitter.temp_counter.peek(), self.ir_emitter.label_counter.peek()
+
+    def _set_counters(self, counters: tuple[int, ...]) -> None:
+        self.counter.current, self.ir_emitter.temp_counter.current, self.ir_emitter.label_counter.current = counters
+
+    def _get_module_cache_key(self, filepath: Path) -> Optional[str]:
+        """计算被包含文件的模块缓存键，不在顶层作用域时不缓存"""
+        if len(self.symbol_resolver.scope_stack) != 1:
+            return None
+        return self.module_cache.make_key(
+            filepath,
+            self.symbol_resolver.current_scope,
+            self.include_manager.get_included_paths(),
+            self._get_counters()
+        )
+
+    def _splice_cached_module(self, filepath: Path, key: str) -> bool:
+        """
+        尝试拼接模块缓存
+
+        Returns:
+            命中并拼接完成时返回 True
+        """
+        cached = self.module_cache.load(filepath, key, self.symbol_resolver.current_scope, self._load_library)
+        if cached is None:
+            return False
+
+        for symbol in cached.symbols:
+            self.symbol_resolver.add_symbol(symbol, force=True)
+        self.ir_emitter.emits(iter(cached.instructions))
+        for path in cached.included:
+            self.include_manager.add_include_path(Path(path))
+        self._set_counters(cached.counters)
+        return True
+
+    @contextmanager
+    def _recording_module(self, filepath: Path, key: Optional[str]):
+        """记录被包含文件的访问结果，访问无报错时写入模块缓存"""
+        if key is None:
+            yield
+            return
+
+        top_scope = self.symbol_resolver.current_scope
+        record = self.module_cache.begin(filepath, key, self.builder, top_scope, self.error_reporter.error_count)
+        try:
+            yield
+        except BaseException:
+            self.module_cache.abort(record)
+            raise
+        self.module_cache.end(record, self.builder, top_scope, self.error_reporter.error_count, self._get_counters())
+
     def _process_annotations(self, children: list[Tree | Token]) -> dict[Annotation, dict[str, Any]]:
         """
         提取并处理注解列表
@@ -641,6 +710,11 @@ class ASTVisitor(Interpreter):
 
         self.include_manager.add_include_path(filepath)
 
+        # 命中模块缓存则直接拼接 IR 与导出符号
+        module_key = self._get_module_cache_key(filepath)
+        if module_key is not None and self._splice_cached_module(filepath, module_key):
+            return
+
         # 解析导入的文件
         try:
             old_filepath = self.filepath
@@ -652,7 +726,8 @@ class ASTVisitor(Interpreter):
                 if ast_tree is None:
                     #  parser_file 内部已经进行过错误报告，因此无需重复报告
                     return
-                self.visit(ast_tree)
+                with self._recording_module(filepath, module_key):
+                    self.visit(ast_tree)
 
             # 恢复原文件路径
             self.filepath = old_filepath
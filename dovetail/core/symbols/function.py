@@ -22,6 +22,8 @@ class Function(Symbol, Annotatable):
     return_type: DataTypeBase
     func_type: FunctionType = FunctionType.FUNCTION
     annotations: dict[str, AnnotationAttachment] = field(factory=dict)
+    # 纯函数的结果只取决于参数且没有副作用，目前仅用于内置函数
+    pure: bool = False
 
     def get_name(self) -> str:
         return self.name
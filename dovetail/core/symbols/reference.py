@@ -67,6 +67,10 @@ class Reference(Symbol, Generic[T]):
         # 因为它是不可变的，且在内存中是唯一的
         return self
 
+    def __reduce__(self):
+        # 反序列化时经由 __new__ 重新走驻留缓存，保持同一符号只有一个引用
+        return Reference, (self.value,)
+
     @property
     def value_type(self) -> ValueType:
         return self._value_type
@@ -1,44 +1,113 @@
 # coding=utf-8
 import functools
 from pathlib import Path
+from typing import Any
 
 from dovetail.core.backend import Backend, TagWriter, CommandWriter, MetadataWriter, FunctionWriter
 from dovetail.core.backend.context import DependencyFile, GenerationContext
 from dovetail.core.backend.output import DependentDatapackWriter
 from dovetail.core.compile_config import CompileConfig
 from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.execution_profile import PROFILE_OBJECTIVE
+from .commands import ScoreboardBuilder, ReturnBuilder
 from .commands.builtins import TemplateRegistry
 from .initializer_function_writer import InitializerFunctionWriter
 from .literal_pool_writer import LiteralPoolWriter
+from .profile_counter_writer import ProfileCounterWriter
+from .tick_scheduler_writer import TickSchedulerWriter, schedule_ticks
 
 
 class JE1215Backend(Backend):
     def __init__(self, ir_builder: IRBuilder, target: Path, config: CompileConfig):
         super().__init__(ir_builder, target, config)
-        self.output_manager.register_writer(TagWriter(["initializer"], []))
+        self.tag_writer = TagWriter(["initializer"], [])
+        self.output_manager.register_writer(self.tag_writer)
         self.output_manager.register_writer(CommandWriter())
         self.output_manager.register_writer(MetadataWriter())
         self.output_manager.register_writer(FunctionWriter(callback=self._get_builtin_functions))
         self.output_manager.register_writer(LiteralPoolWriter())
         self.output_manager.register_writer(DependentDatapackWriter(self.get_dependency_files()))
         self.output_manager.register_writer(InitializerFunctionWriter())
+        self.output_manager.register_writer(ProfileCounterWriter())
+        self.output_manager.register_writer(TickSchedulerWriter(InitializerFunctionWriter.tick_functions))
 
     def generate(self):
         """生成代码（主流程）"""
         # 创建生成上下文
         context = GenerationContext(self.config, self.target, self.ir_builder)
 
+        # 清空上一次生成登记的初始化函数（常驻编译服务中同一进程会多次生成）
+        InitializerFunctionWriter.init_functions.clear()
+        InitializerFunctionWriter.tick_functions.clear()
+
         # 处理IR指令
         self._process_instructions(context)
 
-        # 优化生成指令末尾的return
+        # 优化生成指令末尾的return，非零返回值需要保留给调用方判断控制流（见 scope_call）
         for scope in context.get_all_scopes():
-            if len(scope.commands) > 0 and scope.commands[-1].startswith("return "):
+            if len(scope.commands) > 0 and scope.commands[-1] == ReturnBuilder.return_value(0):
                 scope.commands.pop()
 
+        # 函数体被优化为空的 tick 函数不必调度（列表与调度器写入器共享，原地修改）
+        scopes = {scope.get_absolute_path('/'): scope for scope in context.get_all_scopes()}
+        InitializerFunctionWriter.tick_functions[:] = [
+            (function_path, interval) for function_path, interval in InitializerFunctionWriter.tick_functions
+            if function_path not in scopes or scopes[function_path].has_commands()
+        ]
+
+        # 所有 tick 函数经由调度函数分发，minecraft:tick 只登记调度函数
+        self.tag_writer.tick_functions = \
+            [TickSchedulerWriter.FUNCTION_PATH] if InitializerFunctionWriter.tick_functions else []
+
+        # 插桩：每个函数开头为自身的执行计数器加一
+        if self.config.instrument:
+            for scope, name in zip(
+                    [scope for scope in context.get_all_scopes() if scope.has_commands()],
+                    ProfileCounterWriter.get_counter_names(context)
+            ):
+                scope.commands[0:0] = ScoreboardBuilder.add_score(name, PROFILE_OBJECTIVE, 1)
+
         # 写入输出
         self._write_outputs(context)
 
+    def _collect_functions(self, context: GenerationContext) -> dict[str, list[str]]:
+        functions = super()._collect_functions(context)
+        for function_path, content in self._get_builtin_functions().items():
+            functions[f"{context.namespace}:{function_path}"] = content.split("\n")
+        return functions
+
+    def _get_tick_entries(self, context: GenerationContext) -> list[tuple[str, int, int]]:
+        return [
+            (f"{context.namespace}:{function_path}", interval, phase)
+            for function_path, interval, phase in schedule_ticks(InitializerFunctionWriter.tick_functions)
+        ]
+
+    def _snapshot_shared_state(self) -> Any:
+        return (
+            len(InitializerFunctionWriter.init_functions),
+            len(InitializerFunctionWriter.tick_functions),
+            set(TemplateRegistry.all())
+        )
+
+    def _collect_shared_state(self, snapshot: Any) -> Any:
+        init_count, tick_count, template_names = snapshot
+        return (
+            InitializerFunctionWriter.init_functions[init_count:],
+            InitializerFunctionWriter.tick_functions[tick_count:],
+            [template for name, template in TemplateRegistry.all().items() if name not in template_names]
+        )
+
+    def _merge_shared_state(self, state: Any):
+        # 初始化/tick 函数登记与烘焙的宏命令模板
+        init_functions, tick_functions, templates = state
+        InitializerFunctionWriter.init_functions.extend(init_functions)
+        InitializerFunctionWriter.tick_functions.extend(tick_functions)
+        for template in templates:
+            if not TemplateRegistry.has(template.name):
+                TemplateRegistry.register(template)
+        if templates:
+            TemplateRegistry.get.cache_clear()
+
     @staticmethod
     def supports(config: CompileConfig) -> bool:
         version = config.version
@@ -15,4 +15,4 @@ class ReturnBuilder:
 
     @staticmethod
     def return_run(command):
-        return f"return {command}"
+        return f"return run {command}"
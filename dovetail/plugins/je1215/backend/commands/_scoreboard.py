@@ -1,9 +1,11 @@
 # coding=utf-8
-import uuid
 import warnings
 
 
 class ScoreboardBuilder:
+    # 与常数运算用的临时分数在同一组命令内设置、使用并重置，固定名称即可，不会随构建变化
+    TEMP_HOLDER = "#dovetail.temp"
+
     @staticmethod
     def add_objective(objective: str, criteria: str, display_name: str = ""):
         """
@@ -99,7 +101,7 @@ class ScoreboardBuilder:
             return []
         elif 1 < score <= 3:
             return [ScoreboardBuilder.add_op(targets, objective, targets, objective)] * int(score - 1)
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.mul_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -114,7 +116,7 @@ class ScoreboardBuilder:
         :param score: 指定值
         :return: 生成的指令
         """
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.div_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -129,7 +131,7 @@ class ScoreboardBuilder:
         :param score: 指定值
         :return: 生成的指令
         """
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.mod_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -144,7 +146,7 @@ class ScoreboardBuilder:
         :param score: 指定值
         :return: 生成的指令
         """
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.min_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -159,7 +161,7 @@ class ScoreboardBuilder:
         :param score: 指定值
         :return: 生成的指令
         """
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.max_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -174,7 +176,7 @@ class ScoreboardBuilder:
             DeprecationWarning,
             stacklevel=2
         )
-        temp = '#' + uuid.uuid4().hex
+        temp = ScoreboardBuilder.TEMP_HOLDER
         return [ScoreboardBuilder.set_score(temp, objective, score),
                 ScoreboardBuilder.swap_op(targets, objective, temp, objective),
                 ScoreboardBuilder.reset_score(temp, objective)]
@@ -95,7 +95,7 @@ class TemplateCommandHandler(CommandHandler):
             raise ValueError(f"找不到宏命令模板: {template_name}")
 
         params = self.build_params(result, context, args, template)
-        engine = TemplateEngine(context.namespace, context.objective)
+        engine = TemplateEngine(context.namespace, context.objective, context.allocate_temp_var)
         commands = engine.render_from_template(template, params)
 
         for cmd in commands:
@@ -13,6 +13,18 @@ from dovetail.core.symbols import Reference
 from ...tools import LiteralPoolTools, DataPath, StorageLocation
 
 
+def get_value_domain(dtype: DataTypeBase | None) -> tuple[int, ...] | None:
+    """
+    获取记分项中存储的变量可能取到的全部值
+
+    Returns:
+        取值元组；取值范围未知时返回 None
+    """
+    if dtype == PrimitiveDataType.BOOLEAN:
+        return 0, 1
+    return None
+
+
 class ParamBindingType(Enum):
     """参数绑定类型"""
     LITERAL = "literal"  # 直接值
@@ -21,13 +33,19 @@ class ParamBindingType(Enum):
 
 @define(slots=True, frozen=True)
 class TemplateParameter:
-    """命令参数"""
+    """
+    命令参数
+
+    Attributes:
+        domain: 变量参数可能取到的全部值，已知时模板引擎可按取值分派而不走宏调用
+    """
     name: str
     value: Optional[int | str | bool]
     binding_type: ParamBindingType
     storage_path: str | None = None
     objective: str | None = None
     dtype: DataTypeBase | None = None
+    domain: tuple[int, ...] | None = None
 
     @classmethod
     def from_reference(cls, name: str, ref: Reference, scope: Scope, objective: str):
@@ -48,7 +66,8 @@ class TemplateParameter:
                 binding_type=ParamBindingType.REFERENCE,
                 storage_path=scope.get_symbol_path(ref),
                 objective=objective,
-                dtype=ref.get_dtype()
+                dtype=ref.get_dtype(),
+                domain=get_value_domain(ref.get_dtype())
             )
 
     @classmethod
@@ -3,16 +3,17 @@
 模板命令引擎
 """
 import hashlib
+import itertools
+import math
 import re
-import uuid
-from typing import Optional
+from typing import Callable, Optional
 
 from dovetail.utils.logger import get_logger
 from .parameter import TemplateParameter
 from .template import CommandTemplate, TemplateRegistry
 from ...tools import LiteralPoolTools, DataPath, StorageLocation
 from ...copy import Copy
-from ....commands import FunctionBuilder
+from ....commands import FunctionBuilder, Execute, ScoreboardBuilder
 
 logger = get_logger(__name__)
 
@@ -22,14 +23,31 @@ class TemplateEngine:
     模板命令引擎
 
     核心逻辑：渲染时自动内联所有字面量参数，仅变量参数走宏调用。
+    变量参数的取值有限（如布尔值）时，为每组取值预先实例化普通命令并按取值分派，
+    避免宏调用在每次执行时按参数重新解析命令。
     handler 不再需要关心渲染模式选择和动态模板注册。
     """
 
     VAR_PATTERN = re.compile(r'\$\((\w+)\)')
+    # 按取值分派时最多展开的命令数，超过时仍走宏调用
+    MAX_DISPATCH_VARIANTS = 8
 
-    def __init__(self, namespace: str, objective: str):
+    def __init__(self, namespace: str, objective: str, allocate_name: Optional[Callable[[str], str]] = None):
+        """
+        Args:
+            namespace: 命名空间
+            objective: 记分板名称
+            allocate_name: 宏参数存储路径的名称分配函数，通常为 GenerationContext.allocate_temp_var，
+                           未提供时在引擎内按顺序编号
+        """
         self.namespace = namespace
         self.objective = objective
+        self._allocate_name = allocate_name or self._next_local_name
+        self._local_counter = 0
+
+    def _next_local_name(self, prefix: str) -> str:
+        self._local_counter += 1
+        return f"{prefix}_{self._local_counter}"
 
     # ==================== 公开接口 ====================
 
@@ -41,7 +59,8 @@ class TemplateEngine:
 
         1. 把所有字面量参数内联进模板字符串
         2. 如果没有残留 $(var) → 返回一行纯命令
-        3. 如果有残留 $(var) → 自动注册烘焙模板，走宏调用
+        3. 如果残留的变量取值有限 → 为每组取值实例化一行命令，按取值分派
+        4. 否则自动注册烘焙模板，走宏调用
         """
         # 第一步：内联所有字面量
         baked_str = template_str
@@ -57,7 +76,12 @@ class TemplateEngine:
         if not self.VAR_PATTERN.search(baked_str):
             return [baked_str]
 
-        # 第三步：自动注册烘焙模板（供 .mcfunction 文件生成使用）
+        # 第三步：按取值分派
+        dispatch = self._dispatch(baked_str, variable_params)
+        if dispatch is not None:
+            return dispatch
+
+        # 第四步：自动注册烘焙模板（供 .mcfunction 文件生成使用）
         baked_id = self._baked_id(function_path, baked_str)
         if not TemplateRegistry.has(baked_id):
             TemplateRegistry.register(CommandTemplate(
@@ -70,7 +94,7 @@ class TemplateEngine:
             ))
             TemplateRegistry.get.cache_clear()
 
-        # 第四步：仅变量参数走宏调用
+        # 第五步：仅变量参数走宏调用
         return self._macro_call(baked_id, variable_params)
 
     def render_from_template(self, template: CommandTemplate,
@@ -109,11 +133,47 @@ class TemplateEngine:
         h = hashlib.sha256(baked_str.encode()).hexdigest()[:8]
         return f"{function_path}_{h}"
 
+    def _dispatch(self, baked_str: str, variable_params: dict[str, TemplateParameter]) -> Optional[list[str]]:
+        """
+        为变量参数的每组取值实例化命令，以记分项条件分派
+
+        仅处理单行且不含 return 的模板：多行模板的各行分别加条件后，前面的命令可能改变后面的条件；
+        return 在宏函数中只结束宏函数，展开到调用方后会提前结束调用方。
+        分派的命令也可能修改参数所在的记分项，因此先把参数复制到临时记分项，条件只读取复制的值。
+
+        Returns:
+            分派命令；无法分派时返回 None
+        """
+        if '\n' in baked_str or re.search(r'(^|\brun )return\b', baked_str):
+            return None
+        params = {name: param for name, param in variable_params.items() if f"$({name})" in baked_str}
+        if any(
+                param.domain is None or param.get_data_path().location != StorageLocation.SCORE
+                for param in params.values()
+        ):
+            return None
+        if math.prod(len(param.domain) for param in params.values()) > self.MAX_DISPATCH_VARIANTS:
+            return None
+
+        holders = {name: f"#{self._allocate_name('dispatch')}" for name in params}
+        commands = [
+            ScoreboardBuilder.set_op(holders[name], self.objective, *param.get_data_path())
+            for name, param in params.items()
+        ]
+        for values in itertools.product(*(param.domain for param in params.values())):
+            command = baked_str
+            execute = Execute.execute()
+            for name, value in zip(params, values):
+                command = command.replace(f"$({name})", str(value))
+                execute = execute.if_score_matches(holders[name], self.objective, str(value))
+            commands.append(execute.run(command))
+        return commands
+
     def _macro_call(self, function_path: str,
                     variable_params: dict[str, TemplateParameter]) -> list[str]:
         """生成宏调用命令（仅传入变量参数）"""
         commands = []
-        args_path = f"args.{uuid.uuid4().hex}"
+        args_path = f"args.{self._allocate_name('args')}"
 
         for name, param in variable_params.items():
             if param.is_literal():
@@ -143,7 +203,7 @@ class TemplateEngine:
         字面量从 literal pool 拷贝，变量从存储路径拷贝
         """
         commands = []
-        args_path = f"args.{uuid.uuid4().hex}"
+        args_path = f"args.{self._allocate_name('args')}"
 
         for name, param in params.items():
             if param.is_literal():
@@ -1,6 +1,4 @@
 # coding=utf-8
-import uuid
-
 from dovetail.core.enums import CompareOps
 from dovetail.utils.constant_operator_handlers import COMPARE_OP_HANDLERS
 from ._execute import Execute
@@ -11,6 +9,11 @@ from .unary_op import UnaryOp
 
 
 class Compare:
+    # 比较用的临时存储只在相邻两条命令间使用，固定路径即可，不会随构建变化
+    TEMP_PATH = "temp.compare"
+    # 记分板与存储比较时，记分板一侧先复制到此路径，不在存储中留下与持有者同名的数据
+    OPERAND_PATH = "temp.compare_operand"
+
     @staticmethod
     def _compare_literals(op: CompareOps, a: int | bool, b: int | bool) -> bool:
         return COMPARE_OP_HANDLERS[op](a, b)
@@ -26,7 +29,7 @@ class Compare:
             a: DataPath,
             b: DataPath,
     ):
-        temp = DataPath(f"temp.{uuid.uuid4().hex}", result.target, StorageLocation.STORAGE)
+        temp = DataPath(Compare.TEMP_PATH, result.target, StorageLocation.STORAGE)
         commands = [
             # 将左侧的值复制到临时变量
             Copy.copy(temp, a),
@@ -64,11 +67,13 @@ class Compare:
             commands: list[str] = []
             # 将待比较的两项复制到存储中
             if a.location == StorageLocation.SCORE:
-                a = DataPath(a.path, a.target, StorageLocation.STORAGE)
-                commands.append(Copy.copy_score_to_storage(a, a))
+                operand = DataPath(Compare.OPERAND_PATH, a.target, StorageLocation.STORAGE)
+                commands.append(Copy.copy_score_to_storage(operand, a))
+                a = operand
             else:
-                b = DataPath(b.path, b.target, StorageLocation.STORAGE)
-                commands.append(Copy.copy_score_to_storage(b, b))
+                operand = DataPath(Compare.OPERAND_PATH, b.target, StorageLocation.STORAGE)
+                commands.append(Copy.copy_score_to_storage(operand, b))
+                b = operand
             # 比较是否相等
             commands.extend(Compare.compare_equality_storage(result, op, a, b))
             return commands
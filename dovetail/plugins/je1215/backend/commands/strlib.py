@@ -7,6 +7,9 @@ from .tools import DataPath, StorageLocation, LiteralPoolTools
 
 logger = get_logger(__name__)
 
+# 整数转字符串时的中间存储路径，只在相邻两条命令间使用
+TO_STR_PATH = "temp.to_str"
+
 
 def strcat_literal(result: DataPath, a: str, b: str):
     return Copy.copy_literals(result, str(a) + str(b))
@@ -57,8 +60,9 @@ def to_str(result: DataPath, value: DataPath | int):
         return [Copy.copy_literals(result, str(value))]
 
     if value.location == StorageLocation.SCORE:
-        return [Copy.copy_score_to_storage(value, value),
-                DataBuilder.modify_storage_set_string_storage(*reversed(result), *reversed(value))
+        temp = DataPath(TO_STR_PATH, value.target, StorageLocation.STORAGE)
+        return [Copy.copy_score_to_storage(temp, value),
+                DataBuilder.modify_storage_set_string_storage(*reversed(result), *reversed(temp))
                 ]
     else:
         return [DataBuilder.modify_storage_set_string_storage(*reversed(result), *reversed(value))]
@@ -0,0 +1,196 @@
+# coding=utf-8
+"""
+等值比较链的二分分派
+
+形如 `if (s == 0) {…} else if (s == 1) {…} else if …` 的链逐级生成时，
+每一级都在 else 作用域中比较一次，最坏情况下执行 N 次比较和 N 层函数调用。
+比较链的分支数达到 MIN_DISPATCH_CASES 时改为按取值二分：
+
+    scoreboard players operation #<holder> = s        快照被比较的值，分支体修改 s 不影响分派
+    function <root>                                 root: matches ..k 与 k+1.. 各调用一个子节点
+                                                    叶子: matches k 调用对应分支，其余取值调用 else 分支
+
+识别依赖指令处理器在作用域元数据中留下的记录：
+    - IRCompareProcessor 记录最近一次“记分项 == 整数字面量”比较（COMPARE_KEY）
+    - IRCondJumpProcessor 判断条件是否就是该比较的结果，是则记录比较链（CHAIN_KEY）；
+      else 作用域中只有同一记分项的比较链时，将其分支并入外层的比较链；
+      内层已生成的分派随之作废，由外层按合并后的全部分支重新生成
+
+分派节点代替被并入的各级 else 作用域调用分支，控制流标志与分支的返回值按跳过的层数折算（见 scope_call）。
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from attrs import define, field
+
+from dovetail.core.backend import GenerationContext, Scope
+from dovetail.core.enums import StructureType
+from .commands import Execute, ScoreboardBuilder
+from .commands._execute import ExecuteBuilder
+from .commands.tools import DataPath
+from .scope_call import call_scope
+
+COMPARE_KEY = "compare"
+CHAIN_KEY = "compare_chain"
+
+# 分支数达到该值时按二分分派
+MIN_DISPATCH_CASES = 4
+# 叶子节点最多直接比较的分支数
+LEAF_CASES = 2
+
+
+@define(slots=True)
+class CompareRecord:
+    """
+    作用域中最近一次等值比较
+
+    Attributes:
+        result:    比较结果的记分项
+        operand:   被比较的记分项
+        key:       比较的整数字面量
+        start:     比较命令在作用域命令列表中的起始位置
+        end:       比较命令的结束位置（不含）
+        temporary: 比较结果是否为临时变量，临时变量只被条件跳转读取
+    """
+    result: str
+    operand: DataPath
+    key: int
+    start: int
+    end: int
+    temporary: bool
+
+
+@define(slots=True)
+class CompareChain:
+    """
+    等值比较链
+
+    Attributes:
+        operand: 被比较的记分项
+        cases:   按出现顺序排列的 (取值, 分支作用域)
+        default: 所有取值都不匹配时执行的作用域
+        links:   被并入的各级 else 作用域
+        nodes:   已生成的分派节点作用域
+        pure:    作用域中除注释外是否只有本比较链的命令
+        end:     比较链命令的结束位置（不含）
+    """
+    operand: DataPath
+    cases: list[tuple[int, Scope]]
+    default: Optional[Scope]
+    links: list[Scope] = field(factory=list)
+    nodes: list[Scope] = field(factory=list)
+    pure: bool = False
+    end: int = 0
+
+
+def _only_comments(commands: list[str]) -> bool:
+    return all(command.startswith("#") for command in commands)
+
+
+def match_chain(
+        context: GenerationContext,
+        cond_path: str,
+        true_scope: Scope,
+        false_scope: Optional[Scope]
+) -> Optional[CompareChain]:
+    """
+    判断条件跳转是否构成等值比较链，需在生成条件跳转命令之前调用
+
+    Args:
+        context:     生成上下文
+        cond_path:   条件的记分项
+        true_scope:  条件成立时跳转的作用域
+        false_scope: 条件不成立时跳转的作用域
+
+    Returns:
+        比较链；条件不是紧邻的等值比较结果时返回 None
+    """
+    scope = context.current_scope
+    record: Optional[CompareRecord] = scope.metadata.get(COMPARE_KEY)
+    if record is None or record.result != cond_path or not _only_comments(scope.commands[record.end:]):
+        return None
+
+    chain = CompareChain(record.operand, [(record.key, true_scope)], false_scope)
+    link: Optional[CompareChain] = false_scope.metadata.get(CHAIN_KEY) if false_scope else None
+    if (
+            link is not None and link.pure and link.operand == record.operand
+            and _only_comments(false_scope.commands[link.end:])
+    ):
+        chain.cases.extend(link.cases)
+        chain.default = link.default
+        chain.links = [false_scope, *link.links, *link.nodes]
+    chain.pure = _only_comments(scope.commands[:record.start])
+    return chain
+
+
+def emit_dispatch(context: GenerationContext, chain: CompareChain) -> bool:
+    """
+    为比较链生成二分分派
+
+    Returns:
+        分支数不足 MIN_DISPATCH_CASES 而未生成时返回 False
+    """
+    cases: dict[int, Scope] = {}
+    for key, case_scope in chain.cases:
+        # 同一取值只有第一个分支可达
+        cases.setdefault(key, case_scope)
+    if len(cases) < MIN_DISPATCH_CASES:
+        return False
+
+    scope = context.current_scope
+    record: CompareRecord = scope.metadata[COMPARE_KEY]
+    if record.temporary:
+        # 比较结果只用于本次跳转，分派不再需要它
+        del scope.commands[record.start:record.end]
+    # 被并入的 else 作用域及其中已生成的分派节点不再被调用
+    for link in chain.links:
+        link.commands.clear()
+
+    holder = context.allocate_temp_var("dispatch")
+    counter = iter(range(len(cases) * 2))
+    root = _build_node(context, f"#{holder}", holder, counter, sorted(cases.items()), chain.default, chain.nodes)
+    scope.add_command(ScoreboardBuilder.set_op(f"#{holder}", context.objective, *chain.operand))
+    for command in call_scope(context, root):
+        scope.add_command(command)
+    return True
+
+
+def _call(context: GenerationContext, node: Scope, target: Scope, execute: ExecuteBuilder):
+    """在分派节点中条件调用 target（分支或子节点）"""
+    # 节点与分派所在作用域的子节点、直接分支同级，分支每深一层跳过一个 else 作用域
+    skipped = target.get_absolute_path().count(".") - node.get_absolute_path().count(".")
+    for command in call_scope(context, target, execute, skipped):
+        node.add_command(command)
+    node.flags.update((flag, depth - skipped) for flag, depth in target.flags.items())
+
+
+def _build_node(
+        context: GenerationContext,
+        holder: str,
+        name: str,
+        counter,
+        cases: list[tuple[int, Scope]],
+        default: Optional[Scope],
+        nodes: list[Scope]
+) -> Scope:
+    """生成覆盖 cases 所在取值区间的分派节点"""
+    node = context.create_scope(f"{name}_{next(counter)}", StructureType.CONDITIONAL)
+    nodes.append(node)
+    if len(cases) <= LEAF_CASES:
+        for key, case_scope in cases:
+            _call(context, node, case_scope, Execute.execute().if_score_matches(holder, context.objective, str(key)))
+        if default is not None:
+            execute = Execute.execute()
+            for key, _ in cases:
+                execute = execute.unless_score_matches(holder, context.objective, str(key))
+            _call(context, node, default, execute)
+        return node
+
+    middle = len(cases) // 2
+    split = cases[middle][0]
+    left = _build_node(context, holder, name, counter, cases[:middle], default, nodes)
+    right = _build_node(context, holder, name, counter, cases[middle:], default, nodes)
+    _call(context, node, left, Execute.execute().if_score_matches(holder, context.objective, f"..{split - 1}"))
+    _call(context, node, right, Execute.execute().if_score_matches(holder, context.objective, f"{split}.."))
+    return node
@@ -11,29 +11,32 @@
 """
 
 from dovetail.core.backend import OutputWriter, GenerationContext
+from dovetail.core.optimize.execution_profile import PROFILE_OBJECTIVE
 from .commands import FunctionBuilder, DataBuilder, ScoreboardBuilder
 
 
 class InitializerFunctionWriter(OutputWriter):
     init_functions: list[str] = []
-    tick_functions: list[str] = []
+    # tick 函数登记: (函数路径, 执行间隔)
+    tick_functions: list[tuple[str, int]] = []
 
     def write(self, context: GenerationContext):
         function_dir_path = context.target / context.namespace / "data" / context.namespace / "function"
-        function_dir_path.mkdir(parents=True, exist_ok=True)
         initializer_path = function_dir_path / "initializer.mcfunction"
-        with open(initializer_path, "w") as f:
-            # 初始化常量池
-            f.write(ScoreboardBuilder.add_objective(context.objective, "dummy", "Main objective") + "\n")
-            f.write(FunctionBuilder.run(f"{context.namespace}:literal_pool_init") + "\n")
-            f.write(DataBuilder.modify_storage_set_value("dnt:ram", "in", "['','']") + "\n")
-
-            # 执行初始化函数
-            for init_function in self.init_functions:
-                f.write(FunctionBuilder.run(f"{context.namespace}:{init_function}") + "\n")
-
-            if context.config.debug:
-                f.write(f"say Datapack '{context.config.namespace}' is initialized\n")
+        # 初始化常量池
+        content = ScoreboardBuilder.add_objective(context.objective, "dummy", "Main objective") + "\n"
+        content += FunctionBuilder.run(f"{context.namespace}:literal_pool_init") + "\n"
+        content += DataBuilder.modify_storage_set_value("dnt:ram", "in", "['','']") + "\n"
+        if context.config.instrument:
+            content += ScoreboardBuilder.add_objective(PROFILE_OBJECTIVE, "dummy") + "\n"
+
+        # 执行初始化函数
+        for init_function in self.init_functions:
+            content += FunctionBuilder.run(f"{context.namespace}:{init_function}") + "\n"
+
+        if context.config.debug:
+            content += f"say Datapack '{context.config.namespace}' is initialized\n"
+        context.output_files.write_text(initializer_path, content)
 
     def get_name(self) -> str:
         return "initializer_function_writer"
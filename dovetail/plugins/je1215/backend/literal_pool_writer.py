@@ -4,8 +4,6 @@
 
 用于收集字面量并将字面量加载
 """
-import uuid
-
 from dovetail.core.backend import OutputWriter, GenerationContext
 from dovetail.core.enums import ValueType
 from dovetail.core.symbols import Reference, Literal
@@ -13,6 +11,7 @@ from dovetail.utils.logger import get_logger
 from .commands import ReturnBuilder, Execute, ScoreboardBuilder
 from .commands.copy import Copy
 from .commands.tools import LiteralPoolTools
+from .initializer_function_writer import InitializerFunctionWriter
 
 logger = get_logger(__name__)
 
@@ -23,10 +22,10 @@ class LiteralPoolWriter(OutputWriter):
     def write(self, context: GenerationContext):
         function_dir_path = context.target / context.namespace / "data" / context.namespace / "function"
         literal_pool_path = function_dir_path / "literal_pool_init.mcfunction"
-        function_dir_path.mkdir(parents=True, exist_ok=True)
         commands = []
-        # 记录标志以保证仅加载一次
-        flag = uuid.uuid4().hex[:5]
+        literals = sorted(self._collect_literals(context), key=lambda value: (type(value).__name__, str(value)))
+        # 记录标志以保证仅加载一次；标志由常量内容决定，常量变化后重新加载
+        flag = context.names.stable_hash(repr(literals))[:5]
 
         commands.append(
             Execute.execute().if_score_matches(
@@ -37,15 +36,14 @@ class LiteralPoolWriter(OutputWriter):
         )
         commands.append(ScoreboardBuilder.set_score(f"literal_pool.flag.{flag}", context.objective, 9999))
 
-        for literal in self._collect_literals(context):
+        for literal in literals:
             commands.append(
                 Copy.copy_literals(
                     LiteralPoolTools.get_literal_path(literal, context.objective),
                     literal
                 )
             )
-        with open(literal_pool_path, "w", encoding='utf-8') as f:
-            f.write("\n".join(commands))
+        context.output_files.write_text(literal_pool_path, "\n".join(commands))
 
     @staticmethod
     def _collect_literal(value, literals):
@@ -75,6 +73,8 @@ class LiteralPoolWriter(OutputWriter):
         # 收集特殊常量以支持编译器的功能
         literals.add(context.objective)
         literals.update(LiteralPoolWriter.builtin_literals)
+        # tick 调度器取模用的执行间隔
+        literals.update(interval for _, interval in InitializerFunctionWriter.tick_functions if interval > 1)
 
         return literals
 
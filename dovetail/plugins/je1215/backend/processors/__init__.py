@@ -13,6 +13,7 @@ from .ir_compare import IRCompareProcessor
 from .ir_cond_jump import IRCondJumpProcessor
 from .ir_continue import IRContinueProcessor
 from .ir_declare import IRDeclareProcessor
+from .ir_free import IRFreeProcessor
 from .ir_function import IRFunctionProcessor
 from .ir_jump import IRJumpProcessor
 from .ir_return import IRReturnProcessor
@@ -6,7 +6,7 @@ from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext
 from dovetail.core.instructions import IRInstruction, IROpCode
 from dovetail.utils.logger import get_logger
 from ..backend import JE1215Backend
-from ..commands import ReturnBuilder, ScoreboardBuilder
+from ..scope_call import BREAK_FLAG, exit_flag, exit_scope
 
 logger = get_logger(__name__)
 
@@ -26,15 +26,7 @@ class IRBreakProcessor(IRProcessor):
             logger.error("找不到需要被跳出的循环作用域")
             context.add_command("# Can't find a loop scope to break out of")
             return
-        # 标记循环已跳出
-        context.current_scope.flags[f"break:{loop_check_path}"] = current_path.count(".") - loop_check_path.count(".")
-
-        context.current_scope.add_command(
-            ScoreboardBuilder.set_score(
-                f"#break_{loop_check_path}",
-                context.objective,
-                1
-            )
+        # 退出至循环体，调用循环体的循环检查作用域随之退出，不再递归
+        exit_scope(
+            context, exit_flag(BREAK_FLAG, loop_check_path), current_path.count(".") - loop_check_path.count(".") + 1
         )
-        # 退出作用域
-        context.current_scope.add_command(ReturnBuilder.return_value(0))
@@ -89,7 +89,7 @@ class IRCallProcessor(IRProcessor):
                 Copy.copy(
                     DataPath.from_symbol(context, result),
                     DataPath(
-                        f"return_{hash(func_path)}",
+                        context.names.function_symbol("return", func_path),
                         objective,
                         StorageLocation.get_storage(func.return_type),
                     ),
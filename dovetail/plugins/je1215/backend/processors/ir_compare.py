@@ -3,11 +3,12 @@
 IRCompare 指令处理器
 """
 from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext
-from dovetail.core.enums import ValueType
+from dovetail.core.enums import ValueType, CompareOps, VariableType
 from dovetail.core.instructions import IRInstruction, IROpCode
 from ..backend import JE1215Backend
 from ..commands.compare import Compare
-from ..commands.tools import DataPath
+from ..commands.tools import DataPath, StorageLocation
+from ..compare_chain import COMPARE_KEY, CompareRecord
 
 
 @ir_processor(JE1215Backend, IROpCode.COMPARE)
@@ -23,6 +24,7 @@ class IRCompareProcessor(IRProcessor):
             b_path = b.value.value
         else:
             b_path = DataPath.from_symbol(context, b)
+        start = len(context.current_scope.commands)
         context.add_commands(
             Compare.compare(
                 result_path,
@@ -31,3 +33,17 @@ class IRCompareProcessor(IRProcessor):
                 b_path
             )
         )
+
+        # 记录“记分项 == 整数字面量”比较，供条件跳转识别等值比较链
+        if isinstance(b_path, DataPath):
+            a_path, b_path = b_path, a_path
+        if (
+                op == CompareOps.EQ and isinstance(a_path, DataPath) and a_path.location == StorageLocation.SCORE
+                and type(b_path) is int and result_path.location == StorageLocation.SCORE
+        ):
+            context.current_scope.metadata[COMPARE_KEY] = CompareRecord(
+                result_path.path, a_path, b_path, start, len(context.current_scope.commands),
+                result.var_type == VariableType.TEMPORARY
+            )
+        else:
+            context.current_scope.metadata.pop(COMPARE_KEY, None)
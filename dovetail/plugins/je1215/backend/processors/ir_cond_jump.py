@@ -7,7 +7,9 @@ from dovetail.core.instructions import IRInstruction, IROpCode
 from dovetail.core.symbols import Variable, Literal, Reference
 from .ir_jump import IRJumpProcessor
 from ..backend import JE1215Backend
-from ..commands import FunctionBuilder, Execute
+from ..commands import Execute
+from ..compare_chain import CHAIN_KEY, match_chain, emit_dispatch
+from ..scope_call import call_scope
 
 
 @ir_processor(JE1215Backend, IROpCode.COND_JUMP)
@@ -21,44 +23,60 @@ class IRCondJumpProcessor(IRJumpProcessor):
             scope_name = true_scope_name if cond.value.value else false_scope_name
             if scope_name:
                 scope = context.current_scope.resolve_scope(scope_name)
-                context.current_scope.add_command(
-                    FunctionBuilder.run(
-                        f"{context.namespace}:{scope.get_absolute_path('/')}"
-                    )
-                )
-                scope = context.current_scope.resolve_scope(scope_name)
+                context.add_commands(call_scope(context, scope, offset=int(scope is not context.current_scope)))
                 self._handle_flags(scope, context)
 
         else:
-            if true_scope_name:  # 生成条件满足时的作用域
-                true_scope = context.current_scope.resolve_scope(true_scope_name)
-                context.current_scope.add_command(
-                    Execute.execute()
-                    .if_score_matches(
-                        context.current_scope.get_symbol_path(cond),
-                        context.objective,
-                        "1"
-                    )
-                    .run(
-                        FunctionBuilder.run(
-                            f"{context.namespace}:{true_scope.get_absolute_path('/')}"
-                        )
-                    )
+            chain = None
+            if true_scope_name:
+                chain = match_chain(
+                    context,
+                    context.current_scope.get_symbol_path(cond),
+                    context.current_scope.resolve_scope(true_scope_name),
+                    context.current_scope.resolve_scope(false_scope_name) if false_scope_name else None
+                )
+            if chain is not None and emit_dispatch(context, chain):
+                # 等值比较链按取值二分分派，所有分支共用一次调用
+                self._handle_flags(context.current_scope.resolve_scope(true_scope_name), context)
+                if false_scope_name:
+                    self._handle_flags(context.current_scope.resolve_scope(false_scope_name), context)
+            else:
+                self._emit_branches(cond, true_scope_name, false_scope_name, context)
+            if chain is not None:
+                chain.end = len(context.current_scope.commands)
+                context.current_scope.metadata[CHAIN_KEY] = chain
+
+    def _emit_branches(
+            self,
+            cond: Reference[Variable],
+            true_scope_name: str | None,
+            false_scope_name: str | None,
+            context: GenerationContext
+    ):
+        """逐个分支生成条件调用"""
+        if true_scope_name:  # 生成条件满足时的作用域
+            true_scope = context.current_scope.resolve_scope(true_scope_name)
+            context.add_commands(
+                call_scope(
+                    context,
+                    true_scope,
+                    Execute.execute().if_score_matches(
+                        context.current_scope.get_symbol_path(cond), context.objective, "1"
+                    ),
+                    int(true_scope is not context.current_scope)
                 )
-                self._handle_flags(true_scope, context)
-            if false_scope_name:  # 生成条件不满足时的作用域
-                false_scope = context.current_scope.resolve_scope(false_scope_name)
-                context.current_scope.add_command(
-                    Execute.execute()
-                    .unless_score_matches(
-                        context.current_scope.get_symbol_path(cond),
-                        context.objective,
-                        "1"
-                    )
-                    .run(
-                        FunctionBuilder.run(
-                            f"{context.namespace}:{false_scope.get_absolute_path('/')}"
-                        )
-                    )
+            )
+            self._handle_flags(true_scope, context)
+        if false_scope_name:  # 生成条件不满足时的作用域
+            false_scope = context.current_scope.resolve_scope(false_scope_name)
+            context.add_commands(
+                call_scope(
+                    context,
+                    false_scope,
+                    Execute.execute().unless_score_matches(
+                        context.current_scope.get_symbol_path(cond), context.objective, "1"
+                    ),
+                    int(false_scope is not context.current_scope)
                 )
-                self._handle_flags(false_scope, context)
+            )
+            self._handle_flags(false_scope, context)
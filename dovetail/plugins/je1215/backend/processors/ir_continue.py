@@ -6,7 +6,7 @@ from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext
 from dovetail.core.instructions import IRInstruction, IROpCode
 from dovetail.utils.logger import get_logger
 from ..backend import JE1215Backend
-from ..commands import ReturnBuilder, ScoreboardBuilder
+from ..scope_call import CONTINUE_FLAG, exit_flag, exit_scope
 
 logger = get_logger(__name__)
 
@@ -26,16 +26,7 @@ class IRContinueProcessor(IRProcessor):
             logger.error("找不到需要被跳出的循环作用域")
             context.add_command("# Can't find a loop scope to break out of")
             return
-        # 标记循环继续
-        context.current_scope.flags[f"continue:{loop_check_path}"] = current_path.count(".") - loop_check_path.count(
-            ".") - 1
-
-        context.current_scope.add_command(
-            ScoreboardBuilder.set_score(
-                f"#continue_{loop_check_path}",
-                context.objective,
-                1
-            )
+        # 退出至循环体，循环检查作用域继续下一次迭代；直接位于循环体中时只需退出循环体
+        exit_scope(
+            context, exit_flag(CONTINUE_FLAG, loop_check_path), current_path.count(".") - loop_check_path.count(".")
         )
-        # 退出作用域
-        context.current_scope.add_command(ReturnBuilder.return_value(0))
@@ -0,0 +1,23 @@
+# coding=utf-8
+"""
+IRFree 指令处理器
+"""
+from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext
+from dovetail.core.instructions import IRInstruction, IROpCode
+from dovetail.core.symbols import Variable
+from ..backend import JE1215Backend
+from ..commands import DataBuilder, ScoreboardBuilder
+from ..commands.tools import DataPath, StorageLocation
+
+
+@ir_processor(JE1215Backend, IROpCode.FREE)
+class IRFreeProcessor(IRProcessor):
+    def process(self, instruction: IRInstruction, context: GenerationContext):
+        var: Variable = instruction.operands[0]
+        path = DataPath.from_symbol(context, var)
+        if path.location == StorageLocation.STORAGE:
+            # /data remove storage {target} {path}
+            context.current_scope.add_command(DataBuilder.remove_storage(path.target, path.path))
+        else:
+            # /scoreboard players reset {holder} {objective}
+            context.current_scope.add_command(ScoreboardBuilder.reset_score(path.path, path.target))
@@ -20,6 +20,6 @@ class IRFunctionProcessor(IRProcessor):
             if name == "init":
                 InitializerFunctionWriter.init_functions.append(function_path)
             elif name == "tick":
-                InitializerFunctionWriter.tick_functions.append(function_path)
+                InitializerFunctionWriter.tick_functions.append((function_path, attachment.metadata.get("interval", 1)))
 
         context.current_scope.add_symbol(function)
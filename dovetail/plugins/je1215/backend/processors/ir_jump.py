@@ -5,7 +5,7 @@ IRJump 指令处理器
 from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext, Scope
 from dovetail.core.instructions import IRInstruction, IROpCode
 from ..backend import JE1215Backend
-from ..commands import FunctionBuilder, Execute, ReturnBuilder
+from ..scope_call import call_scope
 
 
 @ir_processor(JE1215Backend, IROpCode.JUMP)
@@ -13,21 +13,14 @@ class IRJumpProcessor(IRProcessor):
     def process(self, instruction: IRInstruction, context: GenerationContext):
         scope_name: str = instruction.get_operands()[0]
         jump_scope = context.current_scope.resolve_scope(scope_name)
-        context.add_command(FunctionBuilder.run(f"{context.namespace}:{jump_scope.get_absolute_path('/')}"))
+        context.add_commands(call_scope(context, jump_scope, offset=int(jump_scope is not context.current_scope)))
         self._handle_flags(jump_scope, context)
 
     def _handle_flags(self, scope: Scope, context: GenerationContext):
-        for flag in scope.flags:
-            if scope.flags[flag] > 1:
-                context.current_scope.flags[flag] = scope.flags[flag] - 1
-            context.current_scope.add_command(
-                Execute.execute()
-                .if_score_matches(
-                    f"#{flag.split(':')[0]}_{flag.split(':')[1]}",
-                    context.objective,
-                    '1'
-                )
-                .run(
-                    ReturnBuilder.return_value("0")
-                )
-            )
+        """被调作用域退出后当前作用域随之退出，仍需继续退出的层数记入当前作用域的标志"""
+        if scope is context.current_scope:
+            # 循环检查作用域的递归调用只转交返回值
+            return
+        for flag, depth in scope.flags.items():
+            if depth > 1:
+                context.current_scope.flags[flag] = depth - 1
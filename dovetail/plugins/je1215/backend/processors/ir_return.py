@@ -10,9 +10,9 @@ from dovetail.core.instructions import IRInstruction, IROpCode
 from dovetail.core.symbols import Reference
 from dovetail.utils.logger import get_logger
 from ..backend import JE1215Backend
-from ..commands import ScoreboardBuilder, ReturnBuilder
 from ..commands.copy import Copy
 from ..commands.tools import DataPath, StorageLocation
+from ..scope_call import RETURN_FLAG, exit_flag, exit_scope
 
 logger = get_logger(__name__)
 
@@ -34,7 +34,7 @@ class IRReturnProcessor(IRProcessor):
             return
         if return_value_ref:  # 如果存在返回值
             return_path = DataPath(
-                f"return_{hash(func_path)}",
+                context.names.function_symbol("return", func_path),
                 context.objective,
                 StorageLocation.get_storage(return_value_ref.dtype)
             )
@@ -53,18 +53,7 @@ class IRReturnProcessor(IRProcessor):
                     )
                 )
 
-        # 标记函数已返回
-        context.current_scope.flags[f"return:{func_path}"] = current_path.count(".") - func_path.count(".")
-
-        context.current_scope.add_command(
-            "# 设置返回哨兵值"
-        )
-        context.current_scope.add_command(
-            ScoreboardBuilder.set_score(
-                f"#return_{func_path}",
-                context.objective,
-                1
-            )
+        # 退出至函数作用域
+        exit_scope(
+            context, exit_flag(RETURN_FLAG, func_path), current_path.count(".") - func_path.count(".")
         )
-        # 退出作用域
-        context.current_scope.add_command(ReturnBuilder.return_value(0))
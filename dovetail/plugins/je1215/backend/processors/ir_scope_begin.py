@@ -6,7 +6,6 @@ from dovetail.core.backend import ir_processor, IRProcessor, GenerationContext
 from dovetail.core.enums import StructureType
 from dovetail.core.instructions import IROpCode, IRScopeBegin
 from ..backend import JE1215Backend
-from ..commands import ScoreboardBuilder
 
 
 @ir_processor(JE1215Backend, IROpCode.SCOPE_BEGIN)
@@ -17,26 +16,3 @@ class IRScopeBeginProcessor(IRProcessor):
         sub_scope = context.create_scope(name, stype)
 
         context.push_scope(sub_scope)
-        if stype == StructureType.LOOP_CHECK:
-            context.current_scope.parent.add_command(
-                ScoreboardBuilder.set_score(
-                    f"#break_{context.current_scope.get_absolute_path()}",
-                    context.objective,
-                    0
-                )
-            )
-            context.current_scope.add_command(
-                ScoreboardBuilder.set_score(
-                    f"#continue_{context.current_scope.get_absolute_path()}",
-                    context.objective,
-                    0
-                )
-            )
-        elif stype == StructureType.FUNCTION:
-            context.current_scope.add_command(
-                ScoreboardBuilder.set_score(
-                    f"#return_{context.current_scope.get_absolute_path()}",
-                    context.objective,
-                    0
-                )
-            )
@@ -0,0 +1,48 @@
+# coding=utf-8
+"""
+执行计数写入器
+
+插桩编译时写入计数器的导出与清零函数：
+- profile/dump: 以 `[profile] <函数路径> <次数>` 的格式逐行输出所有计数器
+- profile/reset: 清零所有计数器
+
+计数器本身由 JE1215Backend 在生成结束后插入到每个函数的开头。
+"""
+import json
+
+from dovetail.core.backend import OutputWriter, GenerationContext
+from dovetail.core.optimize.execution_profile import PROFILE_OBJECTIVE, DUMP_PREFIX
+from .commands import ScoreboardBuilder
+
+
+class ProfileCounterWriter(OutputWriter):
+
+    def write(self, context: GenerationContext):
+        if not context.config.instrument:
+            return
+        function_dir_path = context.target / context.namespace / "data" / context.namespace / "function"
+
+        dump = [
+            "tellraw @a " + json.dumps([
+                {"text": f"{DUMP_PREFIX} {path} "},
+                {"score": {"name": path, "objective": PROFILE_OBJECTIVE}}
+            ], ensure_ascii=False)
+            for path in self.get_counter_names(context)
+        ]
+        context.output_files.write_text(function_dir_path / "profile" / "dump.mcfunction", "\n".join(dump))
+        context.output_files.write_text(
+            function_dir_path / "profile" / "reset.mcfunction",
+            ScoreboardBuilder.reset_score("*", PROFILE_OBJECTIVE)
+        )
+
+    @staticmethod
+    def get_counter_names(context: GenerationContext) -> list[str]:
+        """计数器名称：作用域的函数文件路径（不含后缀）"""
+        return [
+            scope.get_file_path().with_suffix("").as_posix()
+            for scope in context.get_all_scopes()
+            if scope.has_commands()
+        ]
+
+    def get_name(self) -> str:
+        return "profile_counter_writer"
@@ -0,0 +1,94 @@
+# coding=utf-8
+"""
+作用域调用与控制流的原生传播
+
+每个作用域生成为独立的函数，进入作用域即调用对应的函数。
+return/break/continue 需要退出的不只是当前作用域，还有调用它的若干层作用域，
+作用域标志记录这一层数：flags[标志] = d 表示本作用域退出后，调用链上还有 d 层作用域需要随之退出：
+
+    return:   退出至函数作用域
+    break:    退出至循环体，循环检查作用域随之不再递归
+    continue: 退出至循环体，循环检查作用域继续下一次迭代
+
+控制流语句处以 `return d` 退出，调用含有标志的作用域时按返回值逐层退出：
+
+    execute [条件] if function <作用域> run return <d - 1>
+
+被调作用域中各标志的层数不同时（如循环体中同一分支既可能 return 也可能 continue），
+由运行时的返回值决定调用方的返回值：
+
+    scoreboard players set #dovetail.exit <obj> 0
+    execute [条件] store result score #dovetail.exit <obj> run function <作用域>
+    execute if score #dovetail.exit <obj> matches 1.. run return run scoreboard players remove #dovetail.exit <obj> 1
+
+没有执行控制流语句的作用域不返回值，`execute if function` 的条件不成立，调用方继续执行。
+因此不需要哨兵记分项，函数与循环的入口也不需要重置哨兵；不含 break/continue 的循环不产生任何额外命令。
+"""
+from typing import Optional
+
+from dovetail.core.backend import GenerationContext, Scope
+from .commands import Execute, FunctionBuilder, ReturnBuilder, ScoreboardBuilder
+from .commands._execute import ExecuteBuilder
+
+RETURN_FLAG = "return"
+BREAK_FLAG = "break"
+CONTINUE_FLAG = "continue"
+EXIT_FLAGS = (RETURN_FLAG, BREAK_FLAG, CONTINUE_FLAG)
+
+# 被调作用域的返回值不唯一时暂存返回值
+EXIT_HOLDER = "#dovetail.exit"
+
+
+def exit_flag(kind: str, target_path: str) -> str:
+    """控制流标志的键，target_path 为 return 所在的函数或 break/continue 所在的循环体"""
+    return f"{kind}:{target_path}"
+
+
+def exit_scope(context: GenerationContext, flag: str, depth: int):
+    """
+    退出当前作用域
+
+    Args:
+        context: 生成上下文
+        flag:    控制流标志
+        depth:   调用链上需要随之退出的作用域层数
+    """
+    if depth > 0:
+        context.current_scope.flags[flag] = depth
+    context.current_scope.add_command(ReturnBuilder.return_value(depth))
+
+
+def call_scope(
+        context: GenerationContext,
+        scope: Scope,
+        execute: Optional[ExecuteBuilder] = None,
+        offset: int = 1
+) -> list[str]:
+    """
+    生成调用作用域的命令
+
+    Args:
+        context: 生成上下文
+        scope:   被调用的作用域
+        execute: 调用的前置条件，不填时无条件调用
+        offset:  调用方对应的层数：直接调用子作用域为 1；
+                 循环检查作用域的递归调用为 0，原样转交返回值；
+                 分派节点调用分支时为被跳过的 else 作用域层数
+    """
+    function = f"{context.namespace}:{scope.get_absolute_path('/')}"
+    results = {depth - offset for flag, depth in scope.flags.items() if flag.split(":")[0] in EXIT_FLAGS}
+    if not results:
+        return [execute.run(FunctionBuilder.run(function)) if execute else FunctionBuilder.run(function)]
+    if len(results) == 1:
+        return [(execute or Execute.execute()).if_function(function).run(ReturnBuilder.return_value(results.pop()))]
+
+    objective = context.objective
+    result = (
+        ScoreboardBuilder.sub_score(EXIT_HOLDER, objective, offset)[0] if offset
+        else ScoreboardBuilder.get_score(EXIT_HOLDER, objective)
+    )
+    return [
+        ScoreboardBuilder.set_score(EXIT_HOLDER, objective, 0),
+        (execute or Execute.execute()).store_result_score(EXIT_HOLDER, objective).run(FunctionBuilder.run(function)),
+        Execute.execute().if_score_matches(EXIT_HOLDER, objective, "1..").run(ReturnBuilder.return_run(result)),
+    ]
@@ -0,0 +1,123 @@
+# coding=utf-8
+"""
+tick 调度器写入器
+
+所有 @tick 函数由同一个调度函数 tick_scheduler 统一分发，只有它登记在 minecraft:tick 标签中：
+- 共享计数器 #dovetail.tick 每 tick 加一，在所有间隔的最小公倍数（超周期）处归零
+- interval 为 1 的函数每 tick 直接调用
+- 其余函数按 计数器 % interval == 相位 调用，取模结果按间隔缓存在 #dovetail.tick.<interval>
+
+相位自动分配：按间隔从小到大依次为每个函数选择使超周期内最繁忙 tick 的负载最小的相位，
+多个 @tick(20) 函数因此分散在不同的 tick 上执行，而不是在同一 tick 集中触发。
+"""
+import math
+
+from dovetail.core.backend import OutputWriter, GenerationContext
+from dovetail.core.backend.cost import MAX_SIMULATED_PERIOD
+from .commands import Execute, FunctionBuilder, ScoreboardBuilder, LiteralPoolTools
+
+COUNTER_HOLDER = "#dovetail.tick"
+# 计分板分数上限，超周期超过该值时计数器不归零
+MAX_SCORE = (1 << 31) - 1
+
+
+def hyperperiod(intervals: list[int]) -> int:
+    """所有间隔的最小公倍数"""
+    return math.lcm(*intervals) if intervals else 1
+
+
+def assign_phases(intervals: list[int]) -> list[int]:
+    """
+    为每个周期性任务分配相位
+
+    Args:
+        intervals: 各任务的执行间隔
+
+    Returns:
+        与 intervals 一一对应的相位，满足 0 <= 相位 < 间隔
+    """
+    phases = [0] * len(intervals)
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i])
+    period = hyperperiod(intervals)
+    if period > MAX_SIMULATED_PERIOD:
+        # 超周期过长时不再逐 tick 模拟负载，同一间隔内的函数按登记顺序轮流占用相位
+        used: dict[int, int] = {}
+        for i in order:
+            phases[i] = used.get(intervals[i], 0) % intervals[i]
+            used[intervals[i]] = phases[i] + 1
+        return phases
+
+    load = [0] * period
+    for i in order:
+        interval = intervals[i]
+        if interval == 1:
+            continue
+        # 最繁忙 tick 的负载优先，其次是被占用 tick 的总负载，相同时取最小相位
+        phases[i] = min(
+            range(interval),
+            key=lambda phase: (max(load[phase::interval]), sum(load[phase::interval]))
+        )
+        for tick in range(phases[i], period, interval):
+            load[tick] += 1
+    return phases
+
+
+def schedule_ticks(tick_functions: list[tuple[str, int]]) -> list[tuple[str, int, int]]:
+    """为登记的 (函数路径, 执行间隔) 分配相位，返回 (函数路径, 执行间隔, 相位)"""
+    phases = assign_phases([interval for _, interval in tick_functions])
+    return [(path, interval, phase) for (path, interval), phase in zip(tick_functions, phases)]
+
+
+class TickSchedulerWriter(OutputWriter):
+    FUNCTION_PATH = "tick_scheduler"
+
+    def __init__(self, tick_functions: list[tuple[str, int]]):
+        """
+        Args:
+            tick_functions: 登记的 (函数路径, 执行间隔)，生成期间由处理器填充
+        """
+        self.tick_functions = tick_functions
+
+    def write(self, context: GenerationContext):
+        if not self.tick_functions:
+            return
+        function_dir_path = context.target / context.namespace / "data" / context.namespace / "function"
+        context.output_files.write_text(
+            function_dir_path / f"{self.FUNCTION_PATH}.mcfunction",
+            "\n".join(self.build_commands(context.namespace, context.objective))
+        )
+
+    def build_commands(self, namespace: str, objective: str) -> list[str]:
+        """生成调度函数的命令"""
+        schedule = schedule_ticks(self.tick_functions)
+        period = hyperperiod([interval for _, interval, _ in schedule])
+        commands = []
+        if period > 1:
+            commands.extend(ScoreboardBuilder.add_score(COUNTER_HOLDER, objective, 1))
+            if period <= MAX_SCORE:
+                commands.append(
+                    Execute.execute().if_score_matches(COUNTER_HOLDER, objective, f"{period}..")
+                    .run(ScoreboardBuilder.set_score(COUNTER_HOLDER, objective, 0))
+                )
+
+        prepared = set()
+        for path, interval, phase in schedule:
+            call = FunctionBuilder.run(f"{namespace}:{path}")
+            if interval == 1:
+                commands.append(call)
+                continue
+            holder = COUNTER_HOLDER
+            if interval != period:
+                # 计数器在超周期处归零，间隔等于超周期时计数器本身就是取模结果
+                holder = f"{COUNTER_HOLDER}.{interval}"
+                if interval not in prepared:
+                    prepared.add(interval)
+                    commands.append(ScoreboardBuilder.set_op(holder, objective, COUNTER_HOLDER, objective))
+                    commands.append(ScoreboardBuilder.mod_op(
+                        holder, objective, LiteralPoolTools.get_literal_path_str(interval), objective
+                    ))
+            commands.append(Execute.execute().if_score_matches(holder, objective, str(phase)).run(call))
+        return commands
+
+    def get_name(self) -> str:
+        return "tick_scheduler_writer"
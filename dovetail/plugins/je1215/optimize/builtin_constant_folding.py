@@ -5,7 +5,7 @@ from dovetail.core.compile_config import CompileConfig
 from dovetail.core.ir_builder import IRBuilder
 
 from dovetail.core.optimize.base import IROptimizationPass
-from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase
+from dovetail.core.optimize.pass_metadata import PassMetadata, PassPhase, IRFact
 from dovetail.core.optimize.pass_registry import register_pass
 from dovetail.core.enums import OptimizationLevel, ValueType, FunctionType
 from dovetail.core.instructions import IROpCode, IRAssign
@@ -22,6 +22,9 @@ from dovetail.utils.naming import NameDecorator
     phase=PassPhase.TRANSFORM,
     depends_on=("constant_folding",),  # 先让符号传播跑一轮
     provided_features=("simplified_arithmetic",),
+    consumes=(IRFact.DATA_FLOW,),
+    invalidates=(IRFact.DATA_FLOW, IRFact.CONTROL_FLOW),
+    function_local=True,
 ))
 class BuiltinConstantFoldingPass(IROptimizationPass):
 
@@ -31,7 +34,7 @@ class BuiltinConstantFoldingPass(IROptimizationPass):
 
     def execute(self) -> bool:
         changed = False
-        iterator = self.builder.__iter__()
+        iterator = self.builder.iter_opcode(IROpCode.CALL)
 
         while True:
             try:
@@ -39,9 +42,6 @@ class BuiltinConstantFoldingPass(IROptimizationPass):
             except StopIteration:
                 break
 
-            if instr.opcode != IROpCode.CALL:
-                continue
-
             result, func, args = cast(tuple[Optional[Variable], Function, dict[str, Reference]], instr.operands)
 
             # 检查是否为内置函数
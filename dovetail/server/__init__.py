@@ -0,0 +1,17 @@
+# coding=utf-8
+"""
+常驻编译服务（dovetail serve）
+
+服务端常驻 Lark 解析器、已加载的插件与已解析的标准库，
+客户端（dovetail-build）在服务可用时通过它编译，省去每次启动编译器进程的开销。
+"""
+from dovetail.server.client import CompileClient, CompileServerError
+from dovetail.server.protocol import (
+    DEFAULT_HOST, DEFAULT_PORT, SERVER_ENV, ServerAddress, default_address, format_address, get_server_address
+)
+
+__all__ = [
+    "CompileClient", "CompileServerError",
+    "DEFAULT_HOST", "DEFAULT_PORT", "SERVER_ENV", "ServerAddress",
+    "default_address", "format_address", "get_server_address"
+]
@@ -0,0 +1,104 @@
+# coding=utf-8
+"""
+编译服务客户端
+
+供 dovetail-build 使用：服务可用时通过套接字提交编译请求，不可用时由调用方回退到子进程。
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import socket
+from pathlib import Path
+from typing import Any, Optional
+
+from dovetail.server.protocol import (
+    ALLOWED_ENV, ServerAddress, get_server_address, read_token, encode_message, decode_message
+)
+
+
+class CompileServerError(Exception):
+    """编译服务返回了错误响应"""
+    pass
+
+
+class CompileClient:
+    """
+    编译服务客户端
+
+    Attributes:
+        address: 服务地址，Unix 套接字路径或 (host, port)
+        timeout: 连接超时（秒），编译本身不设超时
+        token: 会话令牌，连接 TCP 地址时从令牌文件读取
+    """
+
+    def __init__(self, address: ServerAddress, timeout: float = 0.2, token: Optional[str] = None):
+        self.address = address
+        self.timeout = timeout
+        self.token = token if token is not None or isinstance(address, str) else read_token()
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def from_env(cls) -> Optional[CompileClient]:
+        """按环境变量 DOVETAIL_SERVER 构造客户端，显式禁用或运行时目录不可用时返回 None"""
+        try:
+            address = get_server_address()
+        except OSError:
+            return None
+        return cls(address) if address is not None else None
+
+    def _connect(self) -> socket.socket:
+        if isinstance(self.address, str):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.settimeout(self.timeout)
+                sock.connect(self.address)
+            except OSError:
+                sock.close()
+                raise
+            return sock
+        return socket.create_connection(self.address, timeout=self.timeout)
+
+    def _request(self, method: str, params: Optional[dict[str, Any]] = None) -> Any:
+        params = dict(params or {})
+        if self.token is not None:
+            params["token"] = self.token
+        with self._connect() as sock:
+            sock.settimeout(None)
+            sock.sendall(encode_message({
+                "jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params
+            }))
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        if not line:
+            raise ConnectionError("编译服务提前关闭了连接")
+        response = decode_message(line)
+        if "error" in response:
+            raise CompileServerError(response["error"].get("message"))
+        return response.get("result")
+
+    def is_available(self) -> bool:
+        """探测服务是否在线"""
+        try:
+            self._request("ping")
+            return True
+        except (OSError, ValueError, CompileServerError):
+            return False
+
+    def compile(self, argv: list[str], cwd: Path) -> tuple[int, str]:
+        """
+        提交编译请求
+
+        Args:
+            argv: 编译器命令行参数（不含可执行文件）
+            cwd: 编译时的工作目录
+
+        Returns:
+            (退出码, 编译期间的终端输出)
+        """
+        env = {key: value for key, value in os.environ.items() if key in ALLOWED_ENV}
+        result = self._request("compile", {"argv": argv, "cwd": str(cwd), "env": env})
+        return result["exit_code"], result["output"]
+
+    def shutdown(self) -> None:
+        self._request("shutdown")
@@ -0,0 +1,156 @@
+# coding=utf-8
+"""
+编译服务通信协议
+
+每行一条 JSON-RPC 2.0 消息（UTF-8，以换行结尾），套接字与标准输入输出两种传输方式共用。
+
+访问控制：
+    - 默认监听当前用户运行时目录（$XDG_RUNTIME_DIR/dovetail，或临时目录下的 dovetail-<uid>，权限 0700）
+      中的 Unix 套接字，套接字权限为 0600，只有当前用户可以连接
+    - 不支持 Unix 套接字的平台或显式指定 TCP 地址时，服务端为本次会话生成令牌，
+      写入运行时目录中只有当前用户可读的令牌文件，每个请求都需要在 params.token 中携带该令牌
+
+请求：
+    {"jsonrpc": "2.0", "id": 1, "method": "compile",
+     "params": {"argv": [...], "cwd": "...", "env": {...}, "token": "..."}}
+
+    argv 与 dovetail 命令行参数一致（不含可执行文件本身）；
+    cwd 为编译时的工作目录；env 为需要覆盖的环境变量，服务端只应用 ALLOWED_ENV 中的变量。
+
+响应：
+    {"jsonrpc": "2.0", "id": 1, "result": {"exit_code": 0, "output": "..."}}
+    {"jsonrpc": "2.0", "id": 1, "error": {"code": -32601, "message": "..."}}
+
+方法：
+    compile  - 编译，返回退出码与编译期间的终端输出
+    ping     - 探活，返回服务端版本
+    shutdown - 关闭服务
+"""
+from __future__ import annotations
+
+import getpass
+import json
+import os
+import secrets
+import socket
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any, Optional
+
+__all__ = [
+    "DEFAULT_HOST", "DEFAULT_PORT", "SERVER_ENV", "SOCKET_NAME", "TOKEN_NAME", "ALLOWED_ENV", "ServerAddress",
+    "PARSE_ERROR", "INVALID_REQUEST", "METHOD_NOT_FOUND", "INTERNAL_ERROR", "UNAUTHORIZED",
+    "runtime_dir", "default_address", "get_server_address", "format_address", "write_token", "read_token",
+    "encode_message", "decode_message", "make_response", "make_error"
+]
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47115
+# Unix 套接字路径，或形如 "127.0.0.1:47115" 的 TCP 地址，设为空字符串则禁用编译服务
+SERVER_ENV = "DOVETAIL_SERVER"
+SOCKET_NAME = "serve.sock"
+TOKEN_NAME = "serve.token"
+
+# 编译请求可以覆盖的环境变量，只包含编译器读取的变量
+ALLOWED_ENV = frozenset({"DOVETAIL_LIB_PATH", "DOVETAIL_DESCRIPTION", "DOVETAIL_CODEGEN_WORKERS"})
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INTERNAL_ERROR = -32603
+UNAUTHORIZED = -32001  # 服务端自定义错误：缺少令牌或令牌错误
+
+ServerAddress = str | tuple[str, int]  # Unix 套接字路径或 (host, port)
+
+
+def runtime_dir() -> Path:
+    """
+    当前用户专用的运行时目录，不存在时以 0700 权限创建
+
+    Raises:
+        PermissionError: 目录不属于当前用户或其他用户可以访问
+    """
+    if base := os.environ.get("XDG_RUNTIME_DIR"):
+        path = Path(base) / "dovetail"
+    else:
+        user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+        path = Path(tempfile.gettempdir()) / f"dovetail-{user}"
+    path.mkdir(mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        info = path.lstat()
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+            raise PermissionError(f"运行时目录 '{path}' 不属于当前用户或权限过宽")
+    return path
+
+
+def default_address() -> ServerAddress:
+    """默认服务地址：支持时为运行时目录中的 Unix 套接字，否则为本机 TCP 端口"""
+    if hasattr(socket, "AF_UNIX"):
+        return str(runtime_dir() / SOCKET_NAME)
+    return DEFAULT_HOST, DEFAULT_PORT
+
+
+def get_server_address() -> Optional[ServerAddress]:
+    """
+    获取编译服务地址
+
+    Returns:
+        Unix 套接字路径或 (host, port)，环境变量显式置空时返回 None
+    """
+    value = os.environ.get(SERVER_ENV)
+    if value is None:
+        return default_address()
+    if not value:
+        return None
+    host, separator, port = value.rpartition(":")
+    if separator and port.isdigit():
+        return host or DEFAULT_HOST, int(port)
+    return value
+
+
+def format_address(address: ServerAddress) -> str:
+    if isinstance(address, str):
+        return address
+    return f"{address[0]}:{address[1]}"
+
+
+def write_token() -> str:
+    """生成本次会话的令牌，写入只有当前用户可读的令牌文件"""
+    token = secrets.token_hex(32)
+    path = runtime_dir() / TOKEN_NAME
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        os.chmod(path, 0o600)
+        file.write(token)
+    return token
+
+
+def read_token() -> Optional[str]:
+    """读取服务端写入的会话令牌，令牌文件不存在时返回 None"""
+    try:
+        return (runtime_dir() / TOKEN_NAME).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+
+def encode_message(message: dict[str, Any]) -> bytes:
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def decode_message(line: bytes | str) -> dict[str, Any]:
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("消息必须是 JSON 对象")
+    return message
+
+
+def make_response(request_id: Any, result: Any) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+def make_error(request_id: Any, code: int, message: str) -> dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
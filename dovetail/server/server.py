@@ -0,0 +1,289 @@
+# coding=utf-8
+"""
+常驻编译服务
+
+dovetail serve 启动后预热一次（加载插件、构建 Lark 解析表、预解析标准库），
+之后通过本地套接字或标准输入输出接收编译请求。
+
+套接字默认为当前用户运行时目录中权限 0600 的 Unix 套接字；
+监听 TCP 时要求每个请求携带写入用户专用令牌文件的会话令牌。
+编译请求只能覆盖 ALLOWED_ENV 中的环境变量。
+
+每次编译的隔离方式：
+    - 支持 fork 的平台：从已预热的服务进程 fork 子进程编译，全局状态不会泄漏到下一次编译
+    - 其他平台（Windows）：在服务进程内直接编译，由编译回调负责重置全局状态
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import traceback
+from contextlib import contextmanager, chdir
+from typing import Any, BinaryIO, Callable, Iterator, Optional
+
+from dovetail.core.config import PROJECT_VERSION
+from dovetail.server.protocol import (
+    ALLOWED_ENV, TOKEN_NAME, ServerAddress,
+    PARSE_ERROR, INVALID_REQUEST, METHOD_NOT_FOUND, INTERNAL_ERROR, UNAUTHORIZED,
+    runtime_dir, default_address, format_address, write_token,
+    encode_message, decode_message, make_response, make_error
+)
+from dovetail.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CompileHandler = Callable[[list[str]], int]
+
+
+@contextmanager
+def _capture_output(file: BinaryIO) -> Iterator[None]:
+    """在文件描述符层面把标准输出与标准错误重定向到文件，日志处理器持有的流同样生效"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    os.dup2(file.fileno(), 1)
+    os.dup2(file.fileno(), 2)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.dup2(saved[0], 1)
+        os.dup2(saved[1], 2)
+        os.close(saved[0])
+        os.close(saved[1])
+
+
+def claim_stdout() -> BinaryIO:
+    """
+    为标准输入输出传输独占原始标准输出
+
+    此后写往文件描述符 1 的内容（日志、报错）都改写到标准错误，不会混入协议消息。
+    需要在预热之前调用。
+
+    Returns:
+        指向原始标准输出的二进制流
+    """
+    sys.stdout.flush()
+    protocol_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    return protocol_out
+
+
+@contextmanager
+def _patched_environ(env: dict[str, str]) -> Iterator[None]:
+    """临时覆盖环境变量"""
+    saved = {key: os.environ.get(key) for key in env}
+    os.environ.update(env)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _remove_stale_socket(path: str) -> None:
+    """删除上一次服务遗留的 Unix 套接字文件，套接字仍有服务监听或路径不是套接字时报错"""
+    try:
+        info = os.lstat(path)
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(info.st_mode):
+        raise FileExistsError(f"'{path}' 已存在且不是套接字")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except OSError:
+            os.unlink(path)
+            return
+    raise OSError(f"编译服务已在 '{path}' 上运行")
+
+
+class CompileServer:
+    """
+    编译服务
+
+    Attributes:
+        handler: 编译回调，接收命令行参数（不含可执行文件），返回退出码
+        use_fork: 是否为每次编译 fork 子进程
+        token: 会话令牌，不为 None 时拒绝未携带该令牌的请求
+    """
+
+    def __init__(self, handler: CompileHandler, use_fork: Optional[bool] = None, token: Optional[str] = None):
+        self.handler = handler
+        self.use_fork = hasattr(os, "fork") if use_fork is None else use_fork
+        self.token = token
+        self._running = False
+
+    # ==================== 请求分派 ====================
+
+    def handle_message(self, line: bytes | str) -> dict[str, Any]:
+        """处理一行请求，返回响应"""
+        try:
+            message = decode_message(line)
+        except ValueError as e:
+            return make_error(None, PARSE_ERROR, str(e))
+
+        request_id = message.get("id")
+        method = message.get("method")
+        params = message.get("params") or {}
+        if not isinstance(method, str) or not isinstance(params, dict):
+            return make_error(request_id, INVALID_REQUEST, "请求缺少 method 或 params 格式错误")
+        if self.token is not None:
+            token = params.get("token")
+            if not isinstance(token, str) or not hmac.compare_digest(token, self.token):
+                return make_error(request_id, UNAUTHORIZED, "缺少会话令牌或令牌错误")
+
+        if method == "ping":
+            return make_response(request_id, {"version": PROJECT_VERSION, "pid": os.getpid()})
+        if method == "shutdown":
+            self._running = False
+            return make_response(request_id, None)
+        if method != "compile":
+            return make_error(request_id, METHOD_NOT_FOUND, f"未知方法 '{method}'")
+
+        argv = params.get("argv")
+        if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+            return make_error(request_id, INVALID_REQUEST, "argv 必须是字符串列表")
+        cwd = params.get("cwd") or os.getcwd()
+        if not isinstance(cwd, str) or not os.path.isdir(cwd):
+            return make_error(request_id, INVALID_REQUEST, "cwd 必须是存在的目录")
+        env = params.get("env") or {}
+        if not isinstance(env, dict) or not all(isinstance(value, str) for value in env.values()):
+            return make_error(request_id, INVALID_REQUEST, "env 必须是字符串到字符串的映射")
+        ignored = sorted(key for key in env if key not in ALLOWED_ENV)
+        if ignored:
+            logger.debug(f"忽略不允许覆盖的环境变量: {', '.join(ignored)}")
+        env = {key: value for key, value in env.items() if key in ALLOWED_ENV}
+        try:
+            exit_code, output = self.compile(argv, cwd, env)
+        except Exception as e:
+            logger.error(f"编译请求处理失败: {e!r}")
+            return make_error(request_id, INTERNAL_ERROR, repr(e))
+        return make_response(request_id, {"exit_code": exit_code, "output": output})
+
+    # ==================== 编译 ====================
+
+    def compile(self, argv: list[str], cwd: str, env: dict[str, str]) -> tuple[int, str]:
+        """
+        执行一次编译
+
+        Returns:
+            (退出码, 编译期间的终端输出)
+        """
+        with tempfile.TemporaryFile() as output:
+            if self.use_fork:
+                exit_code = self._compile_forked(argv, cwd, env, output)
+            else:
+                with _capture_output(output), chdir(cwd), _patched_environ(env):
+                    exit_code = self._run_handler(argv)
+            output.seek(0)
+            return exit_code, output.read().decode("utf-8", errors="replace")
+
+    def _compile_forked(self, argv: list[str], cwd: str, env: dict[str, str], output: BinaryIO) -> int:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                with _capture_output(output):
+                    os.chdir(cwd)
+                    os.environ.update(env)
+                    exit_code = self._run_handler(argv)
+            finally:
+                os._exit(exit_code)
+        _, status = os.waitpid(pid, 0)
+        return os.waitstatus_to_exitcode(status)
+
+    def _run_handler(self, argv: list[str]) -> int:
+        """调用编译回调，退出码与子进程调用编译器时保持一致"""
+        try:
+            exit_code = self.handler(argv)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except Exception:  # NOQA
+            traceback.print_exc()
+            exit_code = 1
+        return (exit_code or 0) & 0xFF
+
+    # ==================== 传输 ====================
+
+    def serve_socket(self, address: Optional[ServerAddress] = None) -> None:
+        """
+        在本地套接字上提供服务，逐个处理连接
+
+        Args:
+            address: Unix 套接字路径或 (host, port)，默认为当前用户运行时目录中的 Unix 套接字；
+                监听 TCP 时生成会话令牌写入令牌文件，服务关闭时删除
+        """
+        if address is None:
+            address = default_address()
+        server_self = self
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    if not line.strip():
+                        continue
+                    self.wfile.write(encode_message(server_self.handle_message(line)))
+                    self.wfile.flush()
+                    if not server_self._running:
+                        break
+
+        class _Server(socketserver.TCPServer):
+            allow_reuse_address = True
+
+        if isinstance(address, str):
+            _remove_stale_socket(address)
+            # 绑定时即以 0600 权限创建套接字文件，避免 chmod 之前被其他用户连接
+            umask = os.umask(0o177)
+            try:
+                server = socketserver.UnixStreamServer(address, _Handler)
+            finally:
+                os.umask(umask)
+            cleanup = address
+        else:
+            self.token = write_token()
+            cleanup = str(runtime_dir() / TOKEN_NAME)
+            server = _Server(address, _Handler)
+            address = (address[0], server.server_address[1])
+
+        try:
+            with server:
+                logger.info(f"编译服务已启动: {format_address(address)}")
+                self._running = True
+                while self._running:
+                    server.handle_request()
+        finally:
+            try:
+                os.unlink(cleanup)
+            except OSError:
+                pass
+        logger.info("编译服务已关闭")
+
+    def serve_stdio(self, protocol_out: Optional[BinaryIO] = None) -> None:
+        """
+        在标准输入输出上提供服务
+
+        Args:
+            protocol_out: claim_stdout 返回的协议输出流，未提供时在此处独占标准输出
+        """
+        if protocol_out is None:
+            protocol_out = claim_stdout()
+
+        self._running = True
+        with protocol_out:
+            for line in sys.stdin.buffer:
+                if not line.strip():
+                    continue
+                protocol_out.write(encode_message(self.handle_message(line)))
+                protocol_out.flush()
+                if not self._running:
+                    break
@@ -0,0 +1,75 @@
+# coding=utf-8
+"""
+文件变化监视
+
+以轮询修改时间与大小的方式监视一组文件，不依赖平台相关的文件系统通知接口。
+"""
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+class FileWatcher:
+    """
+    轮询式文件监视器
+
+    Attributes:
+        interval: 轮询间隔（秒）
+        debounce: 检测到变化后的静默等待时间（秒），用于合并编辑器保存时的多次写入
+    """
+
+    def __init__(self, interval: float = 0.5, debounce: float = 0.1):
+        self.interval = interval
+        self.debounce = debounce
+        self._snapshot: dict[Path, Optional[tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def watch(self, paths: Iterable[Path]) -> None:
+        """设置监视的文件集合，并以当前状态作为比较基准"""
+        self._snapshot = {path: self._stat(path) for path in paths}
+
+    def get_paths(self) -> list[Path]:
+        """获取正在监视的文件"""
+        return list(self._snapshot)
+
+    def poll(self) -> list[Path]:
+        """
+        检查一次文件变化，并更新比较基准
+
+        Returns:
+            list[Path]: 内容变化、被创建或被删除的文件
+        """
+        changed = []
+        for path, old in self._snapshot.items():
+            new = self._stat(path)
+            if new != old:
+                self._snapshot[path] = new
+                changed.append(path)
+        return changed
+
+    def wait_for_changes(self) -> list[Path]:
+        """
+        阻塞直到监视的文件发生变化
+
+        Returns:
+            list[Path]: 发生变化的文件
+        """
+        while True:
+            changed = self.poll()
+            if changed:
+                # 等待写入平静下来，合并同一次保存产生的多次变化
+                while True:
+                    time.sleep(self.debounce)
+                    more = self.poll()
+                    if not more:
+                        break
+                    changed.extend(path for path in more if path not in changed)
+                return changed
+            time.sleep(self.interval)
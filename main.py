@@ -1,6 +1,7 @@
 # coding=utf-8
 """主程序"""
 import argparse
+import multiprocessing
 import os
 import sys
 import time
@@ -12,18 +13,24 @@ from typing import NoReturn, Optional
 from dovetail.core.backend import BackendFactory
 from dovetail.core.compile_config import CompileConfig
 from dovetail.core.config import PROJECT_NAME, PROJECT_VERSION, \
-    PROJECT_WEBSITE, PROJECT_LICENSE, IR_CACHE_FILE_PREFIX, COMMIT_HASH
+    PROJECT_WEBSITE, PROJECT_LICENSE, IR_CACHE_FILE_PREFIX, COMMIT_HASH, FILE_PREFIX
 from dovetail.core.enums.minecraft import MinecraftVersion
 from dovetail.core.enums.optimization import OptimizationLevel
+from dovetail.core.enums.output import OutputFormat
 from dovetail.core.errors import CompilationError, report_count
 from dovetail.core.errors import report, Errors
 from dovetail.core.ir_builder import IRBuilder
 from dovetail.core.optimize.optimizer import Optimizer
 from dovetail.core.optimize.pass_registry import get_registry
-from dovetail.core.parser.parser import parser_file
+from dovetail.core.optimize.profiler import PassProfiler
+from dovetail.core.parser.components.include_manager import IncludeManager
+from dovetail.core.parser.parser import parser_file, preparse_include_graph, keep_ast_in_memory
 from dovetail.core.parser.visitor import ASTVisitor
 from dovetail.plugins.plugin_loader.loader import plugin_loader
+from dovetail.server.protocol import DEFAULT_HOST, DEFAULT_PORT, get_server_address
+from dovetail.server.server import CompileServer, claim_stdout
 from dovetail.utils.annotations import timed
+from dovetail.utils.file_watcher import FileWatcher
 from dovetail.utils.ir_serializer import IRSymbolSerializer
 from dovetail.utils.logger import get_logger, ThreadSafeLogger
 from dovetail.utils.naming import NameDecorator
@@ -41,6 +48,13 @@ class Compiler:
         backend_name (str): 后端名(不填时自动选择)
         generate (bool): 生成指令
         output_temp_file (bool): 输出临时文件
+        profile_passes (bool): 分析每个优化 Pass 的用时并输出表格
+        profile_json (Optional[Path]): 优化 Pass 性能分析 JSON 报告路径
+        profile_trace (Optional[Path]): 优化 Pass Chrome 跟踪文件路径
+        cost_report (bool): 估算生成的数据包的命令开销并输出表格
+        cost_json (Optional[Path]): 命令开销 JSON 报告路径
+        tick_budget (Optional[int]): 每 tick 峰值开销预算，超出时编译失败
+        include_manager (Optional[IncludeManager]): 最近一次编译的包含管理器
     """
 
     def __init__(
@@ -48,7 +62,13 @@ class Compiler:
             config: CompileConfig,
             backend_name: Optional[str] = None,
             generate: bool = True,
-            output_temp_file: bool = False
+            output_temp_file: bool = False,
+            profile_passes: bool = False,
+            profile_json: Optional[Path] = None,
+            profile_trace: Optional[Path] = None,
+            cost_report: bool = False,
+            cost_json: Optional[Path] = None,
+            tick_budget: Optional[int] = None
     ):
         """
         初始化编译器
@@ -58,11 +78,24 @@ class Compiler:
             backend_name (Optional[str]): 后端名(不填时自动选择)
             generate (bool): 是否生成指令
             output_temp_file (bool): 输出临时文件
+            profile_passes (bool): 分析每个优化 Pass 的用时并输出表格
+            profile_json (Optional[Path]): 优化 Pass 性能分析 JSON 报告路径
+            profile_trace (Optional[Path]): 优化 Pass Chrome 跟踪文件路径
+            cost_report (bool): 估算生成的数据包的命令开销并输出表格
+            cost_json (Optional[Path]): 命令开销 JSON 报告路径
+            tick_budget (Optional[int]): 每 tick 峰值开销预算，超出时编译失败
         """
         self.config = config
         self.backend_name = backend_name
         self.generate = generate
         self.output_temp_file = output_temp_file
+        self.profile_passes = profile_passes
+        self.profile_json = profile_json
+        self.profile_trace = profile_trace
+        self.cost_report = cost_report
+        self.cost_json = cost_json
+        self.tick_budget = tick_budget
+        self.include_manager: Optional[IncludeManager] = None
 
     def compile(self, source_path: Path, target_path: Path) -> int:
         """
@@ -118,9 +151,11 @@ class Compiler:
             return -1
 
         generator = ASTVisitor(self.config, source_path)
+        self.include_manager = generator.include_manager
 
         with chdir(working_directory or source_path.parent):
             try:
+                self._preparse_includes(source_path, generator)
                 ast_tree = parser_file(source_path)
 
                 if ast_tree is not None:
@@ -150,8 +185,8 @@ class Compiler:
                 if self.output_temp_file:
                     self._write_ir(builder, target_dir_path)
 
-                if self.generate:
-                    self._generate_backend_code(builder, target_dir_path)
+                if self.generate and not self._generate_backend_code(builder, target_dir_path):
+                    return -1
 
             except CompilationError as e:
                 # 预期的编译失败，记录结构化信息后返回错误码
@@ -166,6 +201,61 @@ class Compiler:
 
         return 0
 
+    def watch(self, source_path: Path, target_path: Path, interval: float = 0.5) -> int:
+        """
+        监视模式：编译后监视包含图中的所有文件，发生变化时重新编译
+
+        重新编译在同一进程内进行，AST 与模块缓存保持热状态；
+        输出阶段仅重写内容与上一次生成不同的文件。
+
+        Args:
+            source_path (Path): 源文件路径
+            target_path (Path): 目标路径
+            interval (float): 轮询间隔（秒）
+
+        Returns:
+            int: 退出码，通过 Ctrl+C 退出时为 0
+        """
+        keep_ast_in_memory()
+        watcher = FileWatcher(interval)
+        source_path = source_path.resolve()
+
+        while True:
+            # 同一进程内多次编译，清空上一次编译留下的报错计数
+            report_count.current = 0
+            try:
+                result = self.compile(source_path, target_path)
+            except Exception as e:
+                logger.error(f"编译时发生未预期的异常: {e!r}")
+                result = -1
+
+            paths = {source_path}
+            if self.include_manager is not None:
+                paths.update(Path(path) for path in self.include_manager.get_included_paths())
+            if result != 0:
+                # 编译中途失败时包含图可能不完整，保留上一次监视的文件
+                paths.update(watcher.get_paths())
+            watcher.watch(sorted(paths))
+            logger.info(f"正在监视 {len(paths)} 个文件的变化，按 Ctrl+C 退出")
+
+            try:
+                changed = watcher.wait_for_changes()
+            except KeyboardInterrupt:
+                logger.info("已退出监视模式")
+                return 0
+            logger.info(f"检测到文件变化: {', '.join(path.name for path in changed)}，重新编译")
+
+    @timed("预解析包含文件用时 {:.3f}s")
+    def _preparse_includes(self, source_path: Path, generator: ASTVisitor):
+        """
+        并行预解析包含图，预热 AST 缓存
+
+        Args:
+            source_path (Path): 源文件路径
+            generator (ASTVisitor): AST 访问器，复用其包含路径搜索规则
+        """
+        preparse_include_graph(source_path, generator.include_manager)
+
     @timed("写入临时文件用时{:.3f}s")
     def _write_ir(self, builder: IRBuilder, target_dir_path: Path):
         """
@@ -180,15 +270,33 @@ class Compiler:
             f.write(IRSymbolSerializer.dump(builder))
 
     @timed("最终代码生成与写入用时{:.3f}s")
-    def _generate_backend_code(self, builder: IRBuilder, target_path: Path):
+    def _generate_backend_code(self, builder: IRBuilder, target_path: Path) -> bool:
         """
         生成后端代码
 
         Args:
             builder (IRBuilder): IR构建器
             target_path (Path): 目标目录路径
+
+        Returns:
+            bool: 每 tick 峰值开销是否在预算之内，未设置预算时总为 True
         """
-        BackendFactory.auto_select(self.config, self.backend_name)(builder, target_path, self.config).generate()
+        backend = BackendFactory.auto_select(self.config, self.backend_name)(builder, target_path, self.config)
+        backend.generate()
+        if not (self.cost_report or self.cost_json or self.tick_budget is not None):
+            return True
+
+        report = backend.estimate_cost()
+        if self.cost_report:
+            print("命令开销估算:")
+            print(report.format_table())
+        if self.cost_json:
+            report.write_json(self.cost_json)
+            logger.info(f"命令开销报告已写入 {self.cost_json}")
+        if self.tick_budget is not None and report.peak_tick_cost() > self.tick_budget:
+            logger.error(f"每 tick 峰值开销 {report.peak_tick_cost()} 超出预算 {self.tick_budget}")
+            return False
+        return True
 
     @timed("IR 优化用时 {:.3f}s")
     def _optimize_ir(self, builder: IRBuilder):
@@ -198,7 +306,21 @@ class Compiler:
         Args:
             builder (IRBuilder): IR构建器
         """
-        return Optimizer(builder, self.config).optimize()
+        if not (self.profile_passes or self.profile_json or self.profile_trace):
+            return Optimizer(builder, self.config).optimize()
+
+        profiler = PassProfiler()
+        builder = Optimizer(builder, self.config, profiler).optimize()
+        if self.profile_passes:
+            print(f"优化 Pass 性能分析（{self.config.optimization_level.name}）:")
+            print(profiler.format_table())
+        if self.profile_json:
+            profiler.write_json(self.profile_json)
+            logger.info(f"优化 Pass 性能分析报告已写入 {self.profile_json}")
+        if self.profile_trace:
+            profiler.write_chrome_trace(self.profile_trace)
+            logger.info(f"优化 Pass 跟踪文件已写入 {self.profile_trace}")
+        return builder
 
 
 def main():
@@ -229,6 +351,33 @@ def main():
 
         return
 
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        sys.exit(serve(sys.argv[2:]))
+
+    sys.exit(run(sys.argv[1:]))
+
+
+def _get_lib_path(lib_path: Optional[str]) -> Path:
+    """处理标准库路径：命令行参数 > 环境变量 DOVETAIL_LIB_PATH > 内置标准库"""
+    if lib_path:
+        return Path(lib_path).resolve()
+    elif os.environ.get("DOVETAIL_LIB_PATH"):
+        return Path(os.environ["DOVETAIL_LIB_PATH"]).resolve()
+    else:
+        return resolve_project_path("lib")
+
+
+def run(argv: list[str], load_plugins: bool = True) -> int:
+    """
+    解析编译参数并执行一次编译
+
+    Args:
+        argv: 命令行参数（不含程序名）
+        load_plugins: 是否加载插件，常驻编译服务已预先加载时传 False
+
+    Returns:
+        int: 编译结果状态码
+    """
     parser = argparse.ArgumentParser(description="dovetail")
 
     parser.add_argument('input', type=str, help='输入文件路径')
@@ -240,6 +389,11 @@ def main():
     parser.add_argument('-O', metavar='level', type=int, choices=[0, 1, 2, 3], default=2, help='优化级别')
     parser.add_argument('--no-generate-commands', '-ngc', action='store_true', help='不生成指令')
     parser.add_argument('--output-temp-file', action='store_true', help='生成中间文件')
+    parser.add_argument(
+        '--output-format', metavar='format', type=str, choices=[f.value for f in OutputFormat],
+        default=OutputFormat.DIRECTORY.value,
+        help='数据包输出格式: directory(目录), zip(直接写入 .zip), zip-stored(写入不压缩的 .zip)'
+    )
     parser.add_argument('--recursion', action='store_true', help='启用递归(需后端支持)')
     parser.add_argument('--disable-deprecated-function', action='store_true', help='禁用已弃用函数编译')
     # args.add_argument('--first-class-functions', action='store_true',help='启用函数一等公民(所有代码都未适配，开不开都那样)')
@@ -248,32 +402,37 @@ def main():
     parser.add_argument('--disable-plugins', action='store_true', help='禁用插件加载')
     parser.add_argument('--disable-info-logger', action='store_true', help='仅输出 warring 及以上的日志信息')
     parser.add_argument('--debug', action='store_true', help='启用调试模式')
+    parser.add_argument('--watch', '-w', action='store_true', help='监视源文件及其包含的文件，变化时增量重新编译')
+    parser.add_argument('--profile-passes', action='store_true', help='分析每个优化 Pass 的用时并输出表格')
+    parser.add_argument('--profile-json', metavar='path', type=str, help='将优化 Pass 性能分析报告写入 JSON 文件')
+    parser.add_argument('--profile-trace', metavar='path', type=str, help='将优化 Pass 执行过程写入 Chrome 跟踪文件')
+    parser.add_argument('--cost-report', action='store_true', help='估算生成的数据包的命令开销并输出表格')
+    parser.add_argument('--cost-json', metavar='path', type=str, help='将命令开销报告写入 JSON 文件')
+    parser.add_argument('--tick-budget', metavar='cost', type=int, help='每 tick 峰值开销预算，超出时编译失败')
+    parser.add_argument('--instrument', action='store_true', help='为生成的每个函数插入执行计数器，运行 profile/dump 函数导出计数')
+    parser.add_argument('--profile-data', metavar='path', type=str, help='读取导出的执行计数，按真实调用频率决定内联')
+    parser.add_argument('--unroll-factor', metavar='factor', type=int, default=4, help='常量循环部分展开的倍数（O3），小于 2 时不部分展开')
     parser.add_argument('--version', action='store_true', help='显示版本后退出')
 
-    parsed_args = parser.parse_args()
+    parsed_args = parser.parse_args(argv)
 
     # 解析路径
     entry = Path(parsed_args.input)
     target_path = Path(parsed_args.output or "target")
 
     # 加载插件
-    if not parsed_args.disable_plugins:
+    if load_plugins and not parsed_args.disable_plugins:
         plugin_loader.load_plugin("plugin_loader")
 
     # 开启或关闭命名修饰
     NameDecorator.enable = not parsed_args.disable_names_decorator
 
     # 处理标准库路径
-    if parsed_args.lib_path:
-        lib_path = Path(parsed_args.lib_path).resolve()
-    elif os.environ.get("DOVETAIL_LIB_PATH"):
-        lib_path = Path(os.environ["DOVETAIL_LIB_PATH"]).resolve()
-    else:
-        lib_path = resolve_project_path("lib")
+    lib_path = _get_lib_path(parsed_args.lib_path)
 
     if not lib_path.exists() or not lib_path.is_dir():
         logger.critical(f"标准库路径 '{lib_path}' 不存在或不是一个目录")
-        return
+        return -1
 
     # 读取环境变量获得数据包描述
     description = os.environ.get("DOVETAIL_DESCRIPTION", "A datapack of Minecraft")
@@ -289,15 +448,87 @@ def main():
             parsed_args.disable_deprecated_function,
             parsed_args.experimental,
             lib_path,
-            description
+            description,
+            OutputFormat(parsed_args.output_format),
+            instrument=parsed_args.instrument,
+            profile_path=Path(parsed_args.profile_data).resolve() if parsed_args.profile_data else None,
+            unroll_factor=parsed_args.unroll_factor
         ),
         parsed_args.backend,
         generate=not parsed_args.no_generate_commands,
-        output_temp_file=parsed_args.output_temp_file
+        output_temp_file=parsed_args.output_temp_file,
+        profile_passes=parsed_args.profile_passes,
+        profile_json=Path(parsed_args.profile_json).resolve() if parsed_args.profile_json else None,
+        profile_trace=Path(parsed_args.profile_trace).resolve() if parsed_args.profile_trace else None,
+        cost_report=parsed_args.cost_report,
+        cost_json=Path(parsed_args.cost_json).resolve() if parsed_args.cost_json else None,
+        tick_budget=parsed_args.tick_budget
     )
 
-    sys.exit(compiler.compile(entry, target_path))
+    if parsed_args.watch:
+        return compiler.watch(entry, target_path)
+    return compiler.compile(entry, target_path)
+
+
+def serve(argv: list[str]) -> int:
+    """
+    启动常驻编译服务（dovetail serve）
+
+    预热一次插件、解析器与标准库 AST，之后在本地套接字或标准输入输出上接收编译请求。
+
+    Args:
+        argv: serve 子命令的参数
+
+    Returns:
+        int: 退出码
+    """
+    parser = argparse.ArgumentParser(prog="dovetail serve", description="dovetail 常驻编译服务")
+    parser.add_argument('--socket', metavar='path', type=str, help='Unix 套接字路径，默认位于当前用户的运行时目录')
+    parser.add_argument('--host', metavar='host', type=str, help=f'改为监听 TCP 地址（默认 {DEFAULT_HOST}），请求需携带会话令牌')
+    parser.add_argument('--port', '-p', metavar='port', type=int, help=f'TCP 监听端口（默认 {DEFAULT_PORT}）')
+    parser.add_argument('--stdio', action='store_true', help='通过标准输入输出通信（JSON-RPC，每行一条消息）')
+    parser.add_argument('--lib-path', '-l', metavar='path', type=str, help='需要预解析的标准库路径')
+    parser.add_argument('--no-fork', action='store_true', help='在服务进程内编译，而不是为每次编译 fork 子进程')
+    parser.add_argument('--disable-plugins', action='store_true', help='禁用插件加载')
+    parser.add_argument('--disable-info-logger', action='store_true', help='仅输出 warring 及以上的日志信息')
+    parser.add_argument('--debug', action='store_true', help='启用调试模式')
+    parsed_args = parser.parse_args(argv)
+
+    # 标准输入输出模式下协议独占标准输出，预热日志改写到标准错误
+    protocol_out = claim_stdout() if parsed_args.stdio else None
+
+    # 预热：插件、优化 Pass 注册表、标准库 AST
+    if not parsed_args.disable_plugins:
+        plugin_loader.load_plugin("plugin_loader")
+    import dovetail.core.optimize.passes  # noqa
+
+    keep_ast_in_memory()
+    lib_path = _get_lib_path(parsed_args.lib_path)
+    for lib_file in sorted(lib_path.glob(f"*{FILE_PREFIX}")):
+        try:
+            parser_file(lib_file)
+        except Exception as e:
+            logger.warning(f"预解析标准库 '{lib_file.name}' 失败: {e!r}")
+
+    def _compile(compile_argv: list[str]) -> int:
+        # 进程内编译时需要清空上一次编译留下的报错计数
+        report_count.current = 0
+        return run(compile_argv, load_plugins=False)
+
+    server = CompileServer(_compile, use_fork=False if parsed_args.no_fork else None)
+    if parsed_args.stdio:
+        server.serve_stdio(protocol_out)
+    else:
+        if parsed_args.host is not None or parsed_args.port is not None:
+            address = (parsed_args.host or DEFAULT_HOST, parsed_args.port or DEFAULT_PORT)
+        else:
+            # 与客户端一致：DOVETAIL_SERVER 指定的地址优先，未指定时为运行时目录中的 Unix 套接字
+            address = parsed_args.socket or get_server_address()
+        server.serve_socket(address)
+    return 0
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，进程池的工作进程会重新运行入口，需要在此接管
+    multiprocessing.freeze_support()
     main()
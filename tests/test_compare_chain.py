@@ -0,0 +1,105 @@
+# coding=utf-8
+"""
+等值比较链二分分派测试
+
+测试策略：手工构造 else 逐级嵌套的作用域并写入比较记录，模拟指令处理器由内向外生成，
+验证内层链并入外层后按取值生成平衡的分派节点，分支数不足时保持逐级比较。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.backend import GenerationContext
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel, MinecraftVersion
+from dovetail.core.enums.types import StructureType
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.plugins.je1215.backend.commands.tools import DataPath, StorageLocation
+from dovetail.plugins.je1215.backend.compare_chain import (
+    COMPARE_KEY, CHAIN_KEY, CompareRecord, match_chain, emit_dispatch
+)
+from dovetail.plugins.je1215.backend.scope_call import RETURN_FLAG, exit_flag
+
+OPERAND = DataPath("ns.f.s", "dovetail", StorageLocation.SCORE)
+
+
+class TestCompareChain(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        config = CompileConfig("ns", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"))
+        self.context = GenerationContext(config, Path(self._tmp.name), IRBuilder())
+        self.context.push_scope(self.context.create_scope("f", StructureType.FUNCTION))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _level(self, key: int, index: int, false_scope, returning: bool = False):
+        """在当前作用域生成一级 `if (s == key) … else …`，返回比较链是否改为分派"""
+        scope = self.context.current_scope
+        true_scope = self.context.create_scope(f"if_{index}", StructureType.CONDITIONAL)
+        if returning:
+            function_scope = self.context.scope_stack[1]
+            true_scope.flags[exit_flag(RETURN_FLAG, function_scope.get_absolute_path())] = (
+                    true_scope.get_absolute_path().count(".") - function_scope.get_absolute_path().count(".")
+            )
+        scope.add_command("scoreboard players set #r0 dovetail 0")
+        scope.metadata[COMPARE_KEY] = CompareRecord("#r0", OPERAND, key, len(scope.commands) - 1,
+                                                    len(scope.commands), True)
+        chain = match_chain(self.context, "#r0", true_scope, false_scope)
+        dispatched = emit_dispatch(self.context, chain)
+        if not dispatched:
+            scope.add_command("execute if score #r0 dovetail matches 1 run function ns:f/if")
+        chain.end = len(scope.commands)
+        scope.metadata[CHAIN_KEY] = chain
+        return dispatched
+
+    def _build(self, keys: list[int], returning: int = -1) -> list[bool]:
+        """由内向外生成 else 逐级嵌套的比较链，第 returning 个分支中执行函数返回"""
+        scopes = [self.context.current_scope]
+        for index in range(1, len(keys)):
+            scopes.append(self.context.create_scope(f"else_{index}", StructureType.CONDITIONAL))
+            self.context.push_scope(scopes[-1])
+        results = []
+        for index in reversed(range(len(keys))):
+            false_scope = scopes[index + 1] if index + 1 < len(scopes) else None
+            results.append(self._level(keys[index], index, false_scope, index == returning))
+            if index:
+                self.context.pop_scope()
+        return results
+
+    def test_chain_is_merged_and_dispatched(self):
+        results = self._build([4, 0, 2, 4, 6, 1])
+        self.assertEqual(results, [False, False, False, True, True, True])
+        commands = self.context.current_scope.commands
+        self.assertEqual(len(commands), 2)
+        self.assertTrue(commands[0].endswith("= ns.f.s dovetail"))
+        root = next(
+            scope for scope in self.context.get_all_scopes()
+            if commands[1].endswith(scope.get_absolute_path('/'))
+        )
+        self.assertIn("matches ..1", root.commands[0])
+        self.assertIn("matches 2..", root.commands[1])
+        # 被并入的 else 作用域不再有命令
+        self.assertFalse(self.context.current_scope.resolve_scope("else_1").has_commands())
+
+    def test_return_propagates_through_dispatch(self):
+        self._build([0, 1, 2, 3], returning=2)
+        commands = self.context.current_scope.commands
+        self.assertTrue(commands[1].endswith("run return 0"))
+        root = next(
+            scope for scope in self.context.get_all_scopes()
+            if f":{scope.get_absolute_path('/')} " in commands[1]
+        )
+        # 只有包含该分支的右半区间需要随之返回，分支的返回值按跳过的 else 层数折算
+        self.assertNotIn("if function", root.commands[0])
+        self.assertIn("matches 2.. if function", root.commands[1])
+        self.assertTrue(root.commands[1].endswith("run return 1"))
+
+    def test_short_chain_keeps_cascade(self):
+        self.assertEqual(self._build([0, 1, 2]), [False, False, False])
+        self.assertIn("#r0", self.context.current_scope.commands[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# coding=utf-8
+"""
+常驻编译服务测试
+
+测试策略：直接调用 CompileServer.handle_message 验证会话令牌校验与环境变量白名单，
+并在临时运行时目录中启动 Unix 套接字服务，验证套接字只有当前用户可以访问、客户端可以完成请求。
+"""
+import os
+import socket
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from dovetail.server.client import CompileClient
+from dovetail.server.protocol import UNAUTHORIZED, default_address, encode_message
+from dovetail.server.server import CompileServer
+
+
+def _request(method: str, params: dict) -> bytes:
+    return encode_message({"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+
+
+class TestCompileServer(unittest.TestCase):
+
+    def test_token_is_required(self):
+        server = CompileServer(lambda argv: 0, use_fork=False, token="secret")
+        response = server.handle_message(_request("ping", {}))
+        self.assertEqual(response["error"]["code"], UNAUTHORIZED)
+        response = server.handle_message(_request("ping", {"token": "wrong"}))
+        self.assertEqual(response["error"]["code"], UNAUTHORIZED)
+        self.assertIn("result", server.handle_message(_request("ping", {"token": "secret"})))
+
+    def test_only_allowed_env_is_applied(self):
+        seen = {}
+
+        def handler(argv):
+            seen.update(lib=os.environ.get("DOVETAIL_LIB_PATH"), path=os.environ.get("PATH"))
+            return 0
+
+        server = CompileServer(handler, use_fork=False)
+        path = os.environ.get("PATH")
+        response = server.handle_message(_request("compile", {
+            "argv": [], "cwd": os.getcwd(), "env": {"DOVETAIL_LIB_PATH": "lib", "PATH": "/tmp/evil"},
+        }))
+        self.assertEqual(response["result"]["exit_code"], 0)
+        self.assertEqual(seen, {"lib": "lib", "path": path})
+
+        response = server.handle_message(_request("compile", {"argv": [], "cwd": "/nonexistent/dir"}))
+        self.assertIn("error", response)
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "需要 Unix 套接字")
+    def test_unix_socket_is_private(self):
+        with tempfile.TemporaryDirectory() as runtime, mock.patch.dict(os.environ, {"XDG_RUNTIME_DIR": runtime}):
+            address = default_address()
+            self.assertEqual(stat.S_IMODE(os.stat(os.path.dirname(address)).st_mode), 0o700)
+
+            server = CompileServer(lambda argv: 3, use_fork=False)
+            thread = threading.Thread(target=server.serve_socket, args=(address,), daemon=True)
+            thread.start()
+            client = CompileClient(address, timeout=1)
+            for _ in range(100):
+                if client.is_available():
+                    break
+                time.sleep(0.01)
+            self.assertEqual(stat.S_IMODE(os.stat(address).st_mode), 0o600)
+            self.assertEqual(client.compile(["x"], runtime)[0], 3)
+            client.shutdown()
+            thread.join(timeout=5)
+            self.assertFalse(os.path.exists(address))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# coding=utf-8
+"""
+命令开销估算测试
+
+测试策略：手工构造若干函数的命令，验证命令分类、沿调用图累加的最坏开销、
+调用图中的环以及 tick 入口按间隔换算的开销。
+"""
+import unittest
+
+from dovetail.core.backend.cost import CostAnalyzer, CostModel, CommandKind, classify_command
+
+
+class TestCostEstimator(unittest.TestCase):
+
+    def test_classify_command(self):
+        self.assertEqual(classify_command("# comment"), ([], None))
+        self.assertEqual(
+            classify_command("execute if score a x matches 1 run function ns:a/b"),
+            ([CommandKind.EXECUTE, CommandKind.FUNCTION], "ns:a/b")
+        )
+        self.assertEqual(
+            classify_command("$data modify storage ns:x a set value $(v)"),
+            ([CommandKind.MACRO, CommandKind.DATA], None)
+        )
+        self.assertEqual(classify_command("return run scoreboard players get a x")[0],
+                         [CommandKind.RETURN, CommandKind.SCOREBOARD])
+        self.assertEqual(
+            classify_command("execute if score a x matches 1 if function ns:a/b run return 1"),
+            ([CommandKind.EXECUTE, CommandKind.FUNCTION, CommandKind.RETURN], "ns:a/b")
+        )
+
+    def test_worst_cost_along_call_graph(self):
+        functions = {
+            "ns:main": ["scoreboard players set a x 1", "function ns:leaf", "execute if score a x matches 1 run function ns:leaf"],
+            "ns:leaf": ["data modify storage ns:x a set value 1"],
+            "ns:loop": ["scoreboard players add i x 1", "execute if score i x matches ..9 run function ns:loop",
+                        "function ns:leaf", "function dnt:external"],
+        }
+        report = CostAnalyzer().analyze(functions, [("ns:main", 1), ("ns:loop", 4)])
+        main, loop = report.functions["ns:main"], report.functions["ns:loop"]
+        # 1 + 2 + (1 + 2) + 2 × 4
+        self.assertEqual((main.worst_commands, main.worst_cost), (5, 14))
+        self.assertFalse(main.recursive)
+        self.assertTrue(loop.recursive)
+        self.assertEqual(report.external, {"dnt:external"})
+        # 1 + (1 + 2) + (2 + 4) + 2
+        self.assertEqual(loop.worst_cost, 12)
+
+        report = CostAnalyzer(CostModel(loop_iterations=10)).analyze(functions, [("ns:main", 1), ("ns:loop", 4)])
+        self.assertEqual(report.functions["ns:loop"].worst_cost, 120)
+        self.assertEqual(report.peak_tick_cost(), 134)
+        self.assertAlmostEqual(report.average_tick_cost(), 14 + 120 / 4)
+        self.assertTrue(report.format_table().splitlines()[-1].startswith("合计"))
+
+
+if __name__ == '__main__':
+    unittest.main()
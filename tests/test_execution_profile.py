@@ -0,0 +1,117 @@
+# coding=utf-8
+"""
+执行计数与基于计数的内联测试
+
+测试策略：解析手写的导出文本，再手工构造两个被调函数的 IR，
+验证热函数超过静态阈值仍被内联、从未执行的函数不被内联，
+未提供执行计数时的内联结果与原有行为一致，以及插桩编译不内联，使短小的热函数被如实计数。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import BinaryOps, OptimizationLevel, PrimitiveDataType, MinecraftVersion
+from dovetail.core.enums.types import StructureType
+from dovetail.core.instructions import (
+    IRFunction, IRCall, IRReturn, IRScopeBegin, IRScopeEnd, IRBinaryOp, IRDeclare, IROpCode
+)
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.execution_profile import ExecutionProfile
+from dovetail.core.optimize.passes.function_inlining import FunctionInliningPass, INLINE_THRESHOLD
+from dovetail.core.symbols import Function, Variable, Reference
+
+INT = PrimitiveDataType.INT
+
+
+def _function(builder: IRBuilder, name: str, body: list) -> Function:
+    func = Function(name, [], INT)
+    builder.insert(IRFunction(func))
+    builder.insert(IRScopeBegin(name, StructureType.FUNCTION))
+    for instr in body:
+        builder.insert(instr)
+    builder.insert(IRScopeEnd(name, StructureType.FUNCTION))
+    return func
+
+
+def _long_body(size: int) -> list:
+    """构造 size 条指令的函数体"""
+    x = Variable("x", INT)
+    body = [IRDeclare(x)]
+    body.extend(IRBinaryOp(x, BinaryOps.ADD, Reference(x), Reference.literal(1)) for _ in range(size - 2))
+    body.append(IRReturn(Reference(x)))
+    return body
+
+
+class TestExecutionProfile(unittest.TestCase):
+
+    def test_parse_dump(self):
+        profile = ExecutionProfile.parse(
+            "[12:00:00] [Server thread/INFO]: [CHAT] [profile] n/main 1000\n"
+            "[profile] n/cold \n"
+            "unrelated line\n"
+            "[profile] n/main 5\n"
+        )
+        self.assertEqual(profile.counts, {"n/main": 1005, "n/cold": 0})
+        self.assertTrue(profile.is_hot("n/main"))
+        self.assertTrue(profile.is_cold("n/cold"))
+        self.assertFalse(profile.is_cold("n/unknown"))
+
+    def test_inlining_follows_profile(self):
+        builder = IRBuilder()
+        hot = _function(builder, "hot", _long_body(INLINE_THRESHOLD * 2))
+        cold = _function(builder, "cold", _long_body(3))
+        _function(builder, "main", [IRCall(None, hot, {}), IRCall(None, cold, {})])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = Path(tmp) / "profile.txt"
+            profile_path.write_text("[profile] n/hot 200\n[profile] n/cold 0\n[profile] n/main 1\n", encoding="utf-8")
+            config = CompileConfig(
+                "n", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"), profile_path=profile_path
+            )
+            FunctionInliningPass(builder, config).execute()
+
+        calls = [instr.get_operands()[1].name for instr in builder if instr.opcode == IROpCode.CALL]
+        self.assertEqual(calls, ["cold"])
+
+    def test_default_build_ignores_threshold(self):
+        # 未提供执行计数时保持原有行为，超过静态阈值的函数同样内联
+        for profile_text, expected in ((None, []), ("[profile] n/main 1\n", ["long"])):
+            builder = IRBuilder()
+            long = _function(builder, "long", _long_body(INLINE_THRESHOLD * 2))
+            _function(builder, "main", [IRCall(None, long, {})])
+            with tempfile.TemporaryDirectory() as tmp:
+                profile_path = None
+                if profile_text is not None:
+                    profile_path = Path(tmp) / "profile.txt"
+                    profile_path.write_text(profile_text, encoding="utf-8")
+                config = CompileConfig(
+                    "n", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"), profile_path=profile_path
+                )
+                FunctionInliningPass(builder, config).execute()
+            calls = [instr.get_operands()[1].name for instr in builder if instr.opcode == IROpCode.CALL]
+            self.assertEqual(calls, expected)
+
+    def test_instrumented_build_keeps_calls(self):
+        builder = IRBuilder()
+        helper = _function(builder, "helper", _long_body(3))
+        _function(builder, "main", [IRCall(None, helper, {}), IRCall(None, helper, {})])
+
+        config = CompileConfig("n", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"), instrument=True)
+        self.assertFalse(FunctionInliningPass(builder, config).execute())
+        calls = [instr.get_operands()[1].name for instr in builder if instr.opcode == IROpCode.CALL]
+        self.assertEqual(calls, ["helper", "helper"])
+
+        # 插桩数据包中每次调用都计入 helper，基于计数的编译把它当作热函数内联
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = Path(tmp) / "profile.txt"
+            profile_path.write_text("[profile] n/helper 400\n[profile] n/main 200\n", encoding="utf-8")
+            config = CompileConfig(
+                "n", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"), profile_path=profile_path
+            )
+            self.assertTrue(FunctionInliningPass(builder, config).execute())
+        self.assertFalse(any(instr.opcode == IROpCode.CALL for instr in builder))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# coding=utf-8
+"""
+监视模式测试
+
+测试策略：监视模式以 main.run(["--watch"]) 运行，在第一次等待变化时修改被包含的文件，
+第二次等待时模拟 Ctrl+C 退出，验证只重新编译一次，且只有内容变化的输出文件被重写。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main
+from dovetail.core.errors import report_count
+from dovetail.core.parser.parser import keep_ast_in_memory
+from dovetail.plugins.plugin_loader.loader import plugin_loader
+from dovetail.utils.file_watcher import FileWatcher
+
+_ENTRY = (
+    'include "lib.mcdl"\n'
+    "@init\n"
+    "fn main() { lib_a()\n lib_b() }\n"
+)
+_LIB = 'fn lib_a() { print("a") }\nfn lib_b() { print("b") }\n'
+
+
+def _snapshot(root: Path) -> dict[Path, tuple[int, bytes]]:
+    """数据包中每个文件的 修改时间, 内容"""
+    return {path: (path.stat().st_mtime_ns, path.read_bytes()) for path in root.rglob("*") if path.is_file()}
+
+
+class TestFileWatcher(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        plugin_loader.load_plugin("plugin_loader")
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+
+    def tearDown(self):
+        keep_ast_in_memory(False)
+        self._tmp.cleanup()
+
+    def test_included_file_change_rebuilds_once(self):
+        entry = self.root / "main.mcdl"
+        lib = self.root / "lib.mcdl"
+        entry.write_text(_ENTRY, encoding="utf-8")
+        lib.write_text(_LIB, encoding="utf-8")
+        datapack = self.root / "out" / "namespace"
+
+        snapshots = []
+        changes = []
+        wait_for_changes = FileWatcher.wait_for_changes
+
+        def fake_wait(watcher):
+            snapshots.append(_snapshot(datapack))
+            if len(snapshots) > 1:
+                raise KeyboardInterrupt()
+            self.assertIn(lib.resolve(), watcher.get_paths())
+            lib.write_text(_LIB.replace('"a"', '"changed"'), encoding="utf-8")
+            changes.append(wait_for_changes(watcher))
+            return changes[-1]
+
+        report_count.current = 0
+        with mock.patch.object(FileWatcher, "wait_for_changes", autospec=True, side_effect=fake_wait), \
+                mock.patch.object(main.Compiler, "compile", autospec=True, side_effect=main.Compiler.compile) as compile_, \
+                mock.patch("dovetail.core.backend.output.download_dependencies", return_value=None):
+            exit_code = main.run(
+                [str(entry), "-o", str(self.root / "out"), "-O", "0", "--disable-info-logger", "--watch"],
+                load_plugins=False
+            )
+
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(changes, [[lib.resolve()]])
+        self.assertEqual(compile_.call_count, 2)
+
+        before, after = snapshots
+        self.assertEqual(before.keys(), after.keys())
+        rewritten = {path for path in before if after[path][0] != before[path][0]}
+        changed = {path for path in before if after[path][1] != before[path][1]}
+        self.assertTrue(changed)
+        self.assertLess(len(changed), len(before))
+        self.assertEqual(rewritten, changed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# coding=utf-8
+"""
+函数引用完整性测试
+
+测试策略：编译被优化为空的函数，检查生成的数据包中每个 function 命令引用的本命名空间函数都有对应的文件，
+否则 Minecraft 会拒绝加载引用方；被优化为空的 tick 函数不再被调度。依赖数据包的下载被跳过。
+"""
+import re
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main
+from dovetail.core.errors import report_count
+from dovetail.plugins.plugin_loader.loader import plugin_loader
+
+_FUNCTION_REFERENCE = re.compile(r"\bfunction (namespace:[a-z0-9_./\-]+)")
+
+
+def _compile(source: str, level: int, directory: Path) -> Path:
+    """在 directory 中编译源码，返回数据包中的函数目录"""
+    entry = directory / "main.mcdl"
+    entry.write_text(source, encoding="utf-8")
+    report_count.current = 0
+    with mock.patch("dovetail.core.backend.output.download_dependencies", return_value=None):
+        exit_code = main.run(
+            [str(entry), "-o", str(directory / "out"), "-O", str(level), "--disable-info-logger"],
+            load_plugins=False
+        )
+    assert exit_code == 0, exit_code
+    return directory / "out" / "namespace" / "data" / "namespace" / "function"
+
+
+def _missing_targets(function_dir: Path) -> set[str]:
+    """被引用但不存在的函数"""
+    missing = set()
+    for path in function_dir.rglob("*.mcfunction"):
+        for target in _FUNCTION_REFERENCE.findall(path.read_text(encoding="utf-8")):
+            if not (function_dir / f"{target.split(':', 1)[1]}.mcfunction").is_file():
+                missing.add(target)
+    return missing
+
+
+class TestFunctionTargets(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        plugin_loader.load_plugin("plugin_loader")
+
+    def test_empty_callees_are_written(self):
+        source = (
+            "fn noop() {}\n"
+            "fn helper(x: int) { let y = x + 1; }\n"
+            "@init\n"
+            "fn main() { noop(); helper(3); }\n"
+        )
+        for level in (0, 1):
+            with self.subTest(level=level), tempfile.TemporaryDirectory() as tmp:
+                function_dir = _compile(source, level, Path(tmp))
+                main_function = (function_dir / "namespace" / "main.mcfunction").read_text(encoding="utf-8")
+                self.assertIn("function namespace:namespace/noop", main_function)
+                self.assertIn("function namespace:namespace/helper", main_function)
+                self.assertEqual(_missing_targets(function_dir), set())
+
+    def test_empty_tick_functions_are_not_scheduled(self):
+        emptied = "let c = 0\n@tick(20)\nfn a() { c = c + 100 }\n"
+        with tempfile.TemporaryDirectory() as tmp:
+            function_dir = _compile(emptied + "@tick(20)\nfn b() { print(\"b\") }\n", 1, Path(tmp))
+            scheduler = (function_dir / "tick_scheduler.mcfunction").read_text(encoding="utf-8")
+            self.assertNotIn("namespace:namespace/a", scheduler)
+            self.assertIn("namespace:namespace/b", scheduler)
+            self.assertEqual(_missing_targets(function_dir), set())
+
+        # 所有 tick 函数都为空时不生成调度函数，也不登记 minecraft:tick
+        with tempfile.TemporaryDirectory() as tmp:
+            function_dir = _compile(emptied, 1, Path(tmp))
+            tick_tag = function_dir.parents[1] / "minecraft" / "tags" / "function" / "tick.json"
+            self.assertFalse((function_dir / "tick_scheduler.mcfunction").exists())
+            self.assertFalse(tick_tag.exists())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# coding=utf-8
+"""
+IRBuilder 迭代器缓冲修改测试
+
+测试策略：以立即修改 list 的 IRBuilderIterator 为参照，对同一序列执行相同的随机编辑，
+验证缓冲修改的迭代器访问顺序与最终结果一致，迭代中途访问 IRBuilder 时缓冲会被正确提交。
+"""
+import random
+import unittest
+
+from dovetail.core.instructions import IRJump
+from dovetail.core.ir_builder import IRBuilder, IRBuilderIterator
+
+
+def _run_script(iterator, seed: int, on_step=None) -> list[str]:
+    rng = random.Random(seed)
+    visited = []
+    counter = 0
+    for instr in iterator:
+        visited.append(instr.operands[0])
+        if on_step is not None:
+            on_step(len(visited))
+        for _ in range(rng.randrange(3)):
+            action = rng.randrange(5)
+            counter += 1
+            if action == 0:
+                iterator.remove_current()
+                break
+            elif action == 1:
+                iterator.set_current(IRJump(f"s{counter}"))
+            elif action == 2:
+                iterator.insert_here(IRJump(f"h{counter}"))
+            elif action == 3:
+                iterator.insert_after_current(IRJump(f"a{counter}"))
+            elif counter % 7 == 0:
+                try:
+                    visited.append(f"peek:{iterator.peek().operands[0]}")
+                except StopIteration:
+                    visited.append("peek:end")
+    return visited
+
+
+class TestIRBuilderEdits(unittest.TestCase):
+
+    def _instructions(self) -> list:
+        # 插入的指令会被继续访问，限制序列长度避免脚本无限生长
+        return [IRJump(f"i{i}") for i in range(60)]
+
+    def test_buffered_edits_match_immediate(self):
+        for seed in range(20):
+            expected = self._instructions()
+            expected_visited = _run_script(IRBuilderIterator(expected), seed)
+            builder = IRBuilder()
+            builder.extend(self._instructions())
+            visited = _run_script(iter(builder), seed)
+            self.assertEqual(visited, expected_visited)
+            self.assertEqual([instr.operands[0] for instr in builder], [instr.operands[0] for instr in expected])
+
+    def test_builder_access_commits_midway(self):
+        expected = self._instructions()
+        expected_visited = _run_script(IRBuilderIterator(expected), 3)
+        builder = IRBuilder()
+        builder.extend(self._instructions())
+        lengths = []
+        visited = _run_script(iter(builder), 3, lambda step: step % 10 == 0 and lengths.append(len(builder)))
+        self.assertEqual(visited, expected_visited)
+        self.assertEqual(list(builder.get_instructions()), expected)
+        self.assertTrue(lengths)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# coding=utf-8
+"""
+紧凑指令存储测试
+
+测试策略：同一组指令分别放入 list 与 IRStore，经过相同的下标、切片与迭代器编辑后比较结果，
+并验证相同的字面量只驻留一份、最近读取的指令上的原地修改会被写回。
+"""
+import unittest
+
+from dovetail.core.__future__.ir_store import IRStore
+from dovetail.core.enums import PrimitiveDataType, BinaryOps
+from dovetail.core.instructions import IRAssign, IRBinaryOp, IRCall, IRCondJump, IRJump, IROpCode
+from dovetail.core.ir_builder import IRBuilderIterator
+from dovetail.core.symbols import Variable, Reference, Literal, Function
+
+INT = PrimitiveDataType.INT
+
+
+def _instructions() -> list:
+    x = Variable("x", INT)
+    func = Function("f", [], INT)
+    return [
+        IRAssign(x, Reference(Literal(INT, 1))),
+        IRBinaryOp(x, BinaryOps.ADD, Reference(x), Reference(Literal(INT, 1))),
+        IRCall(x, func, {"a": Reference(Literal(INT, 2))}),
+        IRCondJump(Reference(x), "if_0", "else_0"),
+        IRJump("end"),
+    ]
+
+
+class TestIRStore(unittest.TestCase):
+
+    def test_roundtrip_and_interning(self):
+        store = IRStore(_instructions())
+        self.assertEqual(list(store), _instructions())
+        self.assertEqual(store[-1].operands, ["end"])
+        # 两个 1 的字面量驻留为同一项
+        self.assertIs(store[0].operands[1], store[1].operands[3])
+        self.assertLess(store.nbytes(), 100)
+
+    def test_edits_match_list(self):
+        expected, store = _instructions(), IRStore(_instructions())
+        for target in (expected, store):
+            target[1:3] = [IRJump("a"), IRJump("b"), IRJump("c")]
+            del target[0]
+            target.insert(-1, IRJump("d"))
+            iterator = IRBuilderIterator(target)
+            for instr in iterator:
+                if instr.opcode == IROpCode.JUMP and instr.operands[0] == "b":
+                    iterator.remove_current()
+                    iterator.insert_here(IRJump("e"))
+        self.assertEqual(list(store), expected)
+
+    def test_in_place_update_is_written_back(self):
+        store = IRStore(_instructions())
+        for instr in store:
+            if instr.opcode == IROpCode.COND_JUMP:
+                instr.operands[2] = None
+        self.assertEqual(store[3].operands[1:], ["if_0", None])
+
+
+if __name__ == '__main__':
+    unittest.main()
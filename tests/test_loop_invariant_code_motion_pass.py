@@ -0,0 +1,138 @@
+# coding=utf-8
+"""
+循环不变量外提 Pass 测试
+
+测试策略：手工构造与 ASTVisitor 生成结构一致的 while 循环 IR，
+验证不变的运算、类型转换与纯内置函数调用连同声明被移到循环检查作用域之前，
+依赖循环变量的运算，以及循环中调用了其他函数时依赖全局变量的运算保持不变。
+"""
+import unittest
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel, PrimitiveDataType, MinecraftVersion
+from dovetail.core.enums.operations import BinaryOps, CompareOps
+from dovetail.core.enums.types import FunctionType, StructureType, VariableType
+from dovetail.core.instructions import (
+    IRAssign, IRBinaryOp, IRCall, IRCast, IRCompare, IRCondJump, IRDeclare, IRFunction, IRJump, IRReturn,
+    IRScopeBegin, IRScopeEnd, IROpCode,
+)
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.passes.loop_invariant_code_motion import LoopInvariantCodeMotionPass
+from dovetail.core.symbols import Function, Parameter, Variable, Reference
+
+INT = PrimitiveDataType.INT
+STRING = PrimitiveDataType.STRING
+
+MAX = Function("max", [Parameter.new("a", INT), Parameter.new("b", INT)], INT, FunctionType.BUILTIN, pure=True)
+BUMP = Function("bump", [], PrimitiveDataType.VOID)
+
+
+def _temp(name: str, dtype=INT) -> Variable:
+    return Variable(name, dtype, VariableType.TEMPORARY)
+
+
+def _build_loop(body, with_call: bool = False) -> IRBuilder:
+    """
+    构造：
+
+        let g = 0;
+        fn f(n: int) {
+            let i = 0;
+            while (i < n) { <body>; [bump();] i = i + 1; }
+        }
+    """
+    g = Variable("g", INT)
+    n = Variable("n", INT, VariableType.PARAMETER)
+    i = Variable("i", INT)
+    cond = _temp("cmp_0_", PrimitiveDataType.BOOLEAN)
+    step = _temp("calc_1_")
+
+    builder = IRBuilder()
+    builder.insert(IRDeclare(g))
+    builder.insert(IRAssign(g, Reference.literal(0)))
+    builder.insert(IRFunction(Function("f", [], INT)))
+    builder.insert(IRScopeBegin("f", StructureType.FUNCTION))
+    builder.insert(IRDeclare(n))
+    builder.insert(IRDeclare(i))
+    builder.insert(IRAssign(i, Reference.literal(0)))
+    builder.insert(IRScopeBegin("while_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRScopeBegin("while_body_0", StructureType.LOOP_BODY))
+    for instr in body(g, n, i):
+        builder.insert(instr)
+    if with_call:
+        builder.insert(IRCall(None, BUMP, {}))
+    builder.insert(IRDeclare(step))
+    builder.insert(IRBinaryOp(step, BinaryOps.ADD, Reference(i), Reference.literal(1)))
+    builder.insert(IRAssign(i, Reference(step)))
+    builder.insert(IRScopeEnd("while_body_0", StructureType.LOOP_BODY))
+    builder.insert(IRDeclare(cond))
+    builder.insert(IRCompare(cond, CompareOps.LT, Reference(i), Reference(n)))
+    builder.insert(IRCondJump(Reference(cond), "while_body_0"))
+    builder.insert(IRCondJump(Reference(cond), "while_check_0"))
+    builder.insert(IRScopeEnd("while_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRJump("while_check_0"))
+    builder.insert(IRReturn(Reference(i)))
+    builder.insert(IRScopeEnd("f", StructureType.FUNCTION))
+    return builder
+
+
+def _run(builder: IRBuilder) -> bool:
+    config = CompileConfig("n", OptimizationLevel.O2, MinecraftVersion.instance("1.21.5"))
+    return LoopInvariantCodeMotionPass(builder, config).execute()
+
+
+def _hoisted(builder: IRBuilder) -> list[str]:
+    """循环检查作用域之前由外提得到的指令的结果变量名（含声明）"""
+    instructions = list(builder.get_instructions())
+    begin = next(
+        k for k, instr in enumerate(instructions)
+        if instr.opcode is IROpCode.SCOPE_BEGIN and instr.operands[0] == "while_check_0"
+    )
+    start = next(
+        k for k, instr in enumerate(instructions)
+        if instr.opcode is IROpCode.ASSIGN and instr.operands[0].name == "i"
+    ) + 1
+    return [instr.operands[0].name for instr in instructions[start:begin]]
+
+
+class TestLoopInvariantCodeMotionPass(unittest.TestCase):
+
+    def test_invariants_are_hoisted_with_declarations(self):
+        def body(g, n, i):
+            text, calc = _temp("fstring_2_", STRING), _temp("calc_3_")
+            result, variant = _temp("result_4_"), _temp("calc_5_")
+            return [
+                IRDeclare(text), IRCast(text, STRING, Reference(n)),
+                IRDeclare(calc), IRBinaryOp(calc, BinaryOps.MUL, Reference(n), Reference.literal(3)),
+                IRDeclare(result), IRCall(result, MAX, {"a": Reference(calc), "b": Reference.literal(7)}),
+                IRDeclare(variant), IRBinaryOp(variant, BinaryOps.ADD, Reference(i), Reference(result)),
+            ]
+
+        builder = _build_loop(body)
+        self.assertTrue(_run(builder))
+        self.assertEqual(
+            _hoisted(builder),
+            ["fstring_2_", "fstring_2_", "calc_3_", "calc_3_", "result_4_", "result_4_"],
+        )
+        # 依赖循环变量的运算与循环条件保持在循环中
+        self.assertFalse(_run(builder))
+
+    def test_globals_are_kept_when_loop_calls_functions(self):
+        def body(g, n, i):
+            from_global, from_local = _temp("calc_2_"), _temp("calc_3_")
+            return [
+                IRDeclare(from_global), IRBinaryOp(from_global, BinaryOps.MUL, Reference(g), Reference.literal(2)),
+                IRDeclare(from_local), IRBinaryOp(from_local, BinaryOps.MUL, Reference(n), Reference.literal(2)),
+            ]
+
+        builder = _build_loop(body, with_call=True)
+        self.assertTrue(_run(builder))
+        self.assertEqual(_hoisted(builder), ["calc_3_", "calc_3_"])
+
+        builder = _build_loop(body)
+        self.assertTrue(_run(builder))
+        self.assertEqual(_hoisted(builder), ["calc_2_", "calc_2_", "calc_3_", "calc_3_"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+# coding=utf-8
+"""
+循环展开 Pass 测试
+
+测试策略：手工构造与 ASTVisitor 生成结构一致的 for 循环 IR，
+验证迭代次数的计算、完全展开与部分展开的结果，以及含 break 的循环保持不变；
+部分展开的循环与后续 Pass 组合后，用简单的 IR 求值器比较循环之后的值。
+"""
+import operator
+import unittest
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel, PrimitiveDataType, MinecraftVersion
+from dovetail.core.enums.operations import BinaryOps, CompareOps
+from dovetail.core.enums.types import StructureType, VariableType
+from dovetail.core.instructions import (
+    IRAssign, IRBinaryOp, IRBreak, IRCompare, IRCondJump, IRDeclare, IRFunction, IRJump, IRReturn,
+    IRScopeBegin, IRScopeEnd, IROpCode,
+)
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.passes.chain_assign_elimination import ChainAssignEliminationPass
+from dovetail.core.optimize.passes.loop_unrolling import LoopUnrollingPass, trip_count
+from dovetail.core.symbols import Function, Variable, Reference
+
+INT = PrimitiveDataType.INT
+
+
+def _build_loop(bound: int, with_break: bool = False) -> IRBuilder:
+    """
+    构造：
+
+        fn f() -> int {
+            let s = 0;
+            for (let i = 0; i < bound; i = i + 1) { s = s + i; }
+            return s;
+        }
+    """
+    s = Variable("s", INT)
+    i = Variable("i", INT)
+    cond = Variable("cmp_0_", PrimitiveDataType.BOOLEAN, VariableType.TEMPORARY)
+    calc = Variable("calc_1_", INT, VariableType.TEMPORARY)
+    step = Variable("calc_2_", INT, VariableType.TEMPORARY)
+
+    builder = IRBuilder()
+    builder.insert(IRFunction(Function("f", [], INT)))
+    builder.insert(IRScopeBegin("f", StructureType.FUNCTION))
+    for var in (s, i):
+        builder.insert(IRDeclare(var))
+        builder.insert(IRAssign(var, Reference.literal(0)))
+    builder.insert(IRScopeBegin("for_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRDeclare(cond))
+    builder.insert(IRCompare(cond, CompareOps.LT, Reference(i), Reference.literal(bound)))
+    builder.insert(IRScopeBegin("for_body_0", StructureType.LOOP_BODY))
+    if with_break:
+        builder.insert(IRBreak("for_body_0"))
+    builder.insert(IRDeclare(calc))
+    builder.insert(IRBinaryOp(calc, BinaryOps.ADD, Reference(s), Reference(i)))
+    builder.insert(IRAssign(s, Reference(calc)))
+    builder.insert(IRDeclare(step))
+    builder.insert(IRBinaryOp(step, BinaryOps.ADD, Reference(i), Reference.literal(1)))
+    builder.insert(IRAssign(i, Reference(step)))
+    builder.insert(IRScopeEnd("for_body_0", StructureType.LOOP_BODY))
+    builder.insert(IRCondJump(Reference(cond), "for_body_0"))
+    builder.insert(IRCondJump(Reference(cond), "for_check_0"))
+    builder.insert(IRScopeEnd("for_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRJump("for_check_0"))
+    builder.insert(IRReturn(Reference(s)))
+    builder.insert(IRScopeEnd("f", StructureType.FUNCTION))
+    return builder
+
+
+def _run(builder: IRBuilder, unroll_factor: int = 4) -> bool:
+    config = CompileConfig(
+        "n", OptimizationLevel.O3, MinecraftVersion.instance("1.21.5"), unroll_factor=unroll_factor
+    )
+    return LoopUnrollingPass(builder, config).execute()
+
+
+_BINARY = {
+    BinaryOps.ADD: operator.add, BinaryOps.SUB: operator.sub, BinaryOps.MUL: operator.mul,
+    BinaryOps.MOD: operator.mod,
+}
+_COMPARE = {CompareOps.LT: operator.lt, CompareOps.NE: operator.ne}
+
+
+class _Return(Exception):
+    def __init__(self, value):
+        self.value = value
+
+
+def _evaluate(instructions, function: str) -> int:
+    """
+    执行函数作用域并返回其返回值
+
+    只支持测试中用到的指令；作用域定义本身不执行，由 goto 调用，变量按名称存放
+    """
+    ends: dict[int, int] = {}
+    begins: dict[str, int] = {}
+    stack: list[int] = []
+    for index, instr in enumerate(instructions):
+        if instr.opcode is IROpCode.SCOPE_BEGIN:
+            stack.append(index)
+            begins[instr.operands[0]] = index
+        elif instr.opcode is IROpCode.SCOPE_END:
+            ends[stack.pop()] = index
+    values: dict[str, int] = {}
+
+    def value_of(ref):
+        return ref.value.value if ref.is_literal() else values[ref.get_name()]
+
+    def run(scope: str):
+        index = begins[scope] + 1
+        while index < ends[begins[scope]]:
+            instr = instructions[index]
+            opcode = instr.opcode
+            if opcode is IROpCode.SCOPE_BEGIN:
+                index = ends[index] + 1
+                continue
+            if opcode is IROpCode.ASSIGN:
+                values[instr.operands[0].name] = value_of(instr.operands[1])
+            elif opcode is IROpCode.BINARY_OP:
+                result, op, left, right = instr.operands
+                values[result.name] = _BINARY[op](value_of(left), value_of(right))
+            elif opcode is IROpCode.COMPARE:
+                result, op, left, right = instr.operands
+                values[result.name] = _COMPARE[op](value_of(left), value_of(right))
+            elif opcode is IROpCode.JUMP:
+                run(instr.operands[0])
+            elif opcode is IROpCode.COND_JUMP:
+                cond, true_scope, false_scope = instr.operands
+                target = true_scope if value_of(cond) else false_scope
+                if target is not None:
+                    run(target)
+            elif opcode is IROpCode.RETURN:
+                raise _Return(value_of(instr.operands[0]))
+            index += 1
+
+    try:
+        run(function)
+    except _Return as result:
+        return result.value
+    raise AssertionError("函数没有返回")
+
+
+def _build_while(step: int = 3) -> IRBuilder:
+    """
+    构造：
+
+        fn g() -> int {
+            let n = 1; let s = 0; let i = 30;
+            while (i != 0) { s = s * 2 % 1000 + i + n * 7; i = i - step; }
+            return s * 100 + i;
+        }
+    """
+    n, s, i = Variable("n", INT), Variable("s", INT), Variable("i", INT)
+    temps = [Variable(f"calc_{k}_", INT, VariableType.TEMPORARY) for k in range(8)]
+    cond = Variable("cmp_8_", PrimitiveDataType.BOOLEAN, VariableType.TEMPORARY)
+
+    builder = IRBuilder()
+    builder.insert(IRFunction(Function("g", [], INT)))
+    builder.insert(IRScopeBegin("g", StructureType.FUNCTION))
+    for var, value in ((n, 1), (s, 0), (i, 30)):
+        builder.insert(IRDeclare(var))
+        builder.insert(IRAssign(var, Reference.literal(value)))
+    builder.insert(IRScopeBegin("while_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRScopeBegin("while_body_0", StructureType.LOOP_BODY))
+    for temp in temps[:6]:
+        builder.insert(IRDeclare(temp))
+    builder.insert(IRBinaryOp(temps[0], BinaryOps.MUL, Reference(s), Reference.literal(2)))
+    builder.insert(IRBinaryOp(temps[1], BinaryOps.MOD, Reference(temps[0]), Reference.literal(1000)))
+    builder.insert(IRBinaryOp(temps[2], BinaryOps.ADD, Reference(temps[1]), Reference(i)))
+    builder.insert(IRBinaryOp(temps[3], BinaryOps.MUL, Reference(n), Reference.literal(7)))
+    builder.insert(IRBinaryOp(temps[4], BinaryOps.ADD, Reference(temps[2]), Reference(temps[3])))
+    builder.insert(IRAssign(s, Reference(temps[4])))
+    builder.insert(IRBinaryOp(temps[5], BinaryOps.SUB, Reference(i), Reference.literal(step)))
+    builder.insert(IRAssign(i, Reference(temps[5])))
+    builder.insert(IRScopeEnd("while_body_0", StructureType.LOOP_BODY))
+    builder.insert(IRDeclare(cond))
+    builder.insert(IRCompare(cond, CompareOps.NE, Reference(i), Reference.literal(0)))
+    builder.insert(IRCondJump(Reference(cond), "while_body_0"))
+    builder.insert(IRCondJump(Reference(cond), "while_check_0"))
+    builder.insert(IRScopeEnd("while_check_0", StructureType.LOOP_CHECK))
+    builder.insert(IRJump("while_check_0"))
+    for temp in temps[6:]:
+        builder.insert(IRDeclare(temp))
+    builder.insert(IRBinaryOp(temps[6], BinaryOps.MUL, Reference(s), Reference.literal(100)))
+    builder.insert(IRBinaryOp(temps[7], BinaryOps.ADD, Reference(temps[6]), Reference(i)))
+    builder.insert(IRReturn(Reference(temps[7])))
+    builder.insert(IRScopeEnd("g", StructureType.FUNCTION))
+    return builder
+
+
+def _updates(instructions) -> int:
+    """循环变量的更新次数（不含初值赋值）"""
+    return sum(
+        instr.opcode is IROpCode.ASSIGN and instr.operands[0].name == "i" and not instr.operands[1].is_literal()
+        for instr in instructions
+    )
+
+
+class TestTripCount(unittest.TestCase):
+
+    def test_trip_count(self):
+        self.assertEqual(trip_count(CompareOps.LT, 0, 10, 1), 10)
+        self.assertEqual(trip_count(CompareOps.LE, 1, 100, 1), 100)
+        self.assertEqual(trip_count(CompareOps.LT, 0, 10, 3), 4)
+        self.assertEqual(trip_count(CompareOps.GE, 10, 0, -2), 6)
+        self.assertEqual(trip_count(CompareOps.NE, 0, 10, 2), 5)
+        self.assertEqual(trip_count(CompareOps.LT, 5, 0, 1), 0)
+        # 不会终止
+        self.assertIsNone(trip_count(CompareOps.LT, 0, 10, -1))
+        self.assertIsNone(trip_count(CompareOps.NE, 0, 10, 3))
+
+
+class TestLoopUnrollingPass(unittest.TestCase):
+
+    def test_full_unroll(self):
+        builder = _build_loop(3)
+        self.assertTrue(_run(builder))
+        instructions = list(builder.get_instructions())
+        self.assertFalse(any(instr.opcode in (IROpCode.JUMP, IROpCode.COND_JUMP) for instr in instructions))
+        self.assertEqual(_updates(instructions), 3)
+        # 各副本的临时变量互不相同
+        declared = [instr.operands[0].name for instr in instructions if instr.opcode is IROpCode.DECLARE]
+        self.assertEqual(len(declared), len(set(declared)))
+
+    def test_partial_unroll_with_remainder(self):
+        builder = _build_loop(30)
+        self.assertTrue(_run(builder))
+        instructions = list(builder.get_instructions())
+        body_begin = next(
+            k for k, instr in enumerate(instructions)
+            if instr.opcode is IROpCode.SCOPE_BEGIN and instr.operands[0] == "for_body_0"
+        )
+        body_end = next(
+            k for k, instr in enumerate(instructions)
+            if instr.opcode is IROpCode.SCOPE_END and instr.operands[0] == "for_body_0"
+        )
+        check_begin = next(
+            k for k, instr in enumerate(instructions)
+            if instr.opcode is IROpCode.SCOPE_BEGIN and instr.operands[0] == "for_check_0"
+        )
+        # 循环体执行 4 次迭代，30 % 4 == 2 次迭代在循环检查作用域之前执行
+        self.assertEqual(_updates(instructions[body_begin:body_end]), 4)
+        self.assertEqual(_updates(instructions[:check_begin]), 2)
+        # 部分展开后不再被识别
+        self.assertFalse(_run(builder))
+
+    def test_partial_unroll_preserves_values_after_loop(self):
+        expected = _evaluate(list(_build_while().get_instructions()), "g")
+        self.assertEqual(expected, 81200)
+
+        builder = _build_while()
+        self.assertTrue(_run(builder))
+        config = CompileConfig("n", OptimizationLevel.O3, MinecraftVersion.instance("1.21.5"))
+        ChainAssignEliminationPass(builder, config).execute()
+        instructions = list(builder.get_instructions())
+        # 10 次迭代按 4 倍展开，余数 2 次迭代的前导副本位于循环检查作用域之前
+        check_begin = next(
+            k for k, instr in enumerate(instructions)
+            if instr.opcode is IROpCode.SCOPE_BEGIN and instr.operands[0] == "while_check_0"
+        )
+        self.assertEqual(_updates(instructions[:check_begin]), 2)
+        self.assertEqual(_evaluate(instructions, "g"), expected)
+
+    def test_factor_one_disables_partial_unroll(self):
+        builder = _build_loop(30)
+        self.assertFalse(_run(builder, unroll_factor=1))
+
+    def test_loop_with_break_is_kept(self):
+        builder = _build_loop(3, with_break=True)
+        before = list(builder.get_instructions())
+        self.assertFalse(_run(builder))
+        self.assertEqual(list(builder.get_instructions()), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# coding=utf-8
+"""
+模块级 IR 缓存测试
+
+测试策略：手工构造顶层作用域与 IRBuilder，模拟一次被包含文件的访问，
+验证写入后能否命中、外部符号是否按名解析回当前对象、以及失效条件。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel, PrimitiveDataType, MinecraftVersion
+from dovetail.core.enums.types import StructureType
+from dovetail.core.instructions import IRCall, IRDeclare, IRFunction, IRScopeBegin, IRScopeEnd
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.parser.components.module_cache import ModuleCache
+from dovetail.core.parser.scope import Scope
+from dovetail.core.symbols import Function, Variable, Reference
+
+
+def _make_config() -> CompileConfig:
+    """构造一个最小化 CompileConfig"""
+    return CompileConfig("n", version=MinecraftVersion.instance("1.21.5"), optimization_level=OptimizationLevel.O0)
+
+
+class TestModuleCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.filepath = Path(self._tmp.name) / "lib.mcdl"
+        self.filepath.write_text("fn f() {}", encoding="utf-8")
+        self.cache = ModuleCache(_make_config(), "grammar")
+
+        # 访问前已存在的外部符号
+        self.top = Scope("top", None, StructureType.GLOBAL)
+        self.external = Function("ext", [], PrimitiveDataType.VOID)
+        self.top.add_symbol(self.external)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _key(self, top: Scope) -> str:
+        return self.cache.make_key(self.filepath, top, [str(self.filepath)], (0, 0, 0))
+
+    def _record_module(self) -> tuple[list, Function]:
+        """模拟一次访问：定义函数 f，函数体内调用外部函数 ext"""
+        builder = IRBuilder()
+        key = self._key(self.top)
+        record = self.cache.begin(self.filepath, key, builder, self.top, 0)
+
+        func = Function("f", [], PrimitiveDataType.VOID)
+        self.top.add_symbol(func)
+        instructions = [
+            IRFunction(func),
+            IRScopeBegin("f", StructureType.FUNCTION),
+            IRDeclare(Variable("x", PrimitiveDataType.INT)),
+            IRCall(None, self.external, {}),
+            IRScopeEnd("f", StructureType.FUNCTION),
+        ]
+        builder.extend(iter(instructions))
+
+        self.cache.end(record, builder, self.top, 0, (3, 1, 0))
+        return instructions, func
+
+    def _fresh_top(self) -> tuple[Scope, Function]:
+        """模拟下一次编译：外部符号是新的同名对象"""
+        top = Scope("top", None, StructureType.GLOBAL)
+        external = Function("ext", [], PrimitiveDataType.VOID)
+        top.add_symbol(external)
+        return top, external
+
+    def test_hit_resolves_external_symbols(self):
+        instructions, _ = self._record_module()
+        top, external = self._fresh_top()
+
+        cached = self.cache.load(self.filepath, self._key(top), top, lambda _: None)
+
+        self.assertIsNotNone(cached)
+        self.assertEqual(list(map(repr, cached.instructions)), list(map(repr, instructions)))
+        self.assertEqual([s.get_name() for s in cached.symbols], ["f"])
+        self.assertEqual(cached.counters, (3, 1, 0))
+        # 外部符号解析回本次编译中的对象，而非反序列化出的副本
+        self.assertIs(cached.instructions[3].operands[1], external)
+        # 模块自身定义的符号与 IR 中的引用保持同一
+        self.assertIs(cached.instructions[0].operands[0], cached.symbols[0])
+
+    def test_reference_interning_survives_roundtrip(self):
+        builder = IRBuilder()
+        record = self.cache.begin(self.filepath, self._key(self.top), builder, self.top, 0)
+        var = Variable("y", PrimitiveDataType.INT)
+        builder.insert(IRCall(None, self.external, {"a": Reference(var)}))
+        self.cache.end(record, builder, self.top, 0, (0, 0, 0))
+
+        top, _ = self._fresh_top()
+        cached = self.cache.load(self.filepath, self._key(top), top, lambda _: None)
+
+        ref = cached.instructions[0].operands[2]["a"]
+        self.assertIs(ref, Reference(ref.value))
+
+    def test_source_change_invalidates(self):
+        self._record_module()
+        self.filepath.write_text("fn f() { }", encoding="utf-8")
+        top, _ = self._fresh_top()
+
+        self.assertIsNone(self.cache.load(self.filepath, self._key(top), top, lambda _: None))
+
+    def test_environment_change_invalidates(self):
+        self._record_module()
+        top, _ = self._fresh_top()
+        top.add_symbol(Variable("other", PrimitiveDataType.INT))
+
+        self.assertIsNone(self.cache.load(self.filepath, self._key(top), top, lambda _: None))
+
+    def test_errors_skip_writing(self):
+        builder = IRBuilder()
+        record = self.cache.begin(self.filepath, self._key(self.top), builder, self.top, 0)
+        self.cache.end(record, builder, self.top, 1, (0, 0, 0))
+
+        self.assertFalse(self.filepath.with_suffix(".mcdm").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
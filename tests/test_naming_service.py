@@ -0,0 +1,31 @@
+# coding=utf-8
+"""
+确定性命名服务测试
+
+测试策略：验证名称不依赖进程内状态，且按函数独立计数。
+"""
+import unittest
+
+from dovetail.core.backend.naming import NamingService
+
+
+class TestNamingService(unittest.TestCase):
+
+    def test_stable_hash(self):
+        # 固定值：不受 PYTHONHASHSEED 影响，跨进程一致
+        self.assertEqual(NamingService.stable_hash("ns.main"), "3bc7e54f4522")
+        self.assertEqual(NamingService().function_symbol("return", "ns.main"), "return_3bc7e54f4522")
+
+    def test_counters_are_per_function(self):
+        names = NamingService()
+        first = [names.next_name("args", "ns.a"), names.next_name("args", "ns.a")]
+        self.assertEqual(len(set(first)), 2)
+
+        # 其他函数分配名称不影响本函数的编号
+        other = NamingService()
+        other.next_name("args", "ns.b")
+        self.assertEqual(other.next_name("args", "ns.a"), first[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
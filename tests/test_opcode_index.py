@@ -0,0 +1,72 @@
+# coding=utf-8
+"""
+操作码索引测试
+
+测试策略：构造混合指令，经由 IRBuilder、迭代器与 get_instructions() 修改后，
+验证索引给出的位置始终与逐条扫描的结果一致，只迭代指定操作码时的编辑落在正确的位置上。
+"""
+import unittest
+
+from dovetail.core.enums import PrimitiveDataType
+from dovetail.core.instructions import IRAssign, IRCall, IRJump, IROpCode
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.symbols import Variable, Reference, Function
+
+INT = PrimitiveDataType.INT
+
+
+def _build() -> IRBuilder:
+    x = Variable("x", INT)
+    func = Function("f", [], INT)
+    builder = IRBuilder()
+    for i in range(6):
+        builder.insert(IRAssign(x, Reference.literal(i)))
+        if i % 2:
+            builder.insert(IRCall(x, func, {}))
+    builder.insert(IRJump("end"))
+    return builder
+
+
+def _scan(builder: IRBuilder, *opcodes: IROpCode) -> list[int]:
+    return [i for i, instr in enumerate(builder.get_instructions()) if instr.opcode in opcodes]
+
+
+class TestOpcodeIndex(unittest.TestCase):
+
+    def test_positions_follow_edits(self):
+        builder = _build()
+        self.assertEqual(builder.opcode_positions(IROpCode.CALL), _scan(builder, IROpCode.CALL))
+
+        builder.insert(IRJump("tail"))
+        iterator = iter(builder)
+        next(iterator)
+        iterator.set_current(IRJump("head"))
+        self.assertEqual(builder.opcode_positions(IROpCode.JUMP), [0, 9, 10])
+
+        builder.get_instructions()[2:4] = []
+        self.assertEqual(
+            builder.opcode_positions(IROpCode.CALL, IROpCode.JUMP), _scan(builder, IROpCode.CALL, IROpCode.JUMP)
+        )
+
+    def test_iter_opcode_edits(self):
+        builder = _build()
+        x = Variable("y", INT)
+        iterator = builder.iter_opcode(IROpCode.CALL)
+        visited = 0
+        for instr in iterator:
+            visited += 1
+            if visited == 1:
+                iterator.remove_current()
+            elif visited == 2:
+                iterator.insert_after_current(IRCall(x, instr.operands[1], {}))
+            else:
+                iterator.set_current(IRAssign(x, Reference.literal(-1)))
+        self.assertEqual(visited, 3)
+        opcodes = [instr.opcode for instr in builder]
+        self.assertEqual(opcodes.count(IROpCode.CALL), 2)
+        self.assertEqual(builder[-2].operands[1], Reference.literal(-1))
+        self.assertEqual(builder.opcode_positions(IROpCode.CALL), _scan(builder, IROpCode.CALL))
+
+
+if __name__ == '__main__':
+    unittest.main()
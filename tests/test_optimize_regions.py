@@ -0,0 +1,129 @@
+# coding=utf-8
+"""
+函数区域划分与脏区域跟踪测试
+
+测试策略：手工构造包含两个函数与全局语句的 IRBuilder，
+验证区域划分边界，只有被修改的函数会被标记为脏（包括原地修改参数字典），
+以及在函数区域上运行的 Pass 能看到全局语句、修改全局语句时放弃区域运行。
+"""
+import unittest
+
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import MinecraftVersion, OptimizationLevel, PrimitiveDataType
+from dovetail.core.enums.types import StructureType
+from dovetail.core.instructions import IRFunction, IRAssign, IRCall, IROpCode, IRScopeBegin, IRScopeEnd
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.base import IROptimizationPass
+from dovetail.core.optimize.pipeline import OptimizationPipeline
+from dovetail.core.optimize.regions import GLOBAL_REGION, RegionTracker, partition_regions
+from dovetail.core.symbols import Function, Variable, Reference
+
+INT = PrimitiveDataType.INT
+
+
+def _build() -> IRBuilder:
+    builder = IRBuilder()
+    builder.insert(IRAssign(Variable("g", PrimitiveDataType.INT), Reference.literal(0)))
+    for name in ("a", "b"):
+        builder.insert(IRFunction(Function(name, [], PrimitiveDataType.INT)))
+        builder.insert(IRScopeBegin(name, StructureType.FUNCTION))
+        builder.insert(IRScopeBegin(f"{name}_if", StructureType.CONDITIONAL))
+        builder.insert(IRScopeEnd(f"{name}_if", StructureType.CONDITIONAL))
+        builder.insert(IRCall(None, Function("h", [], INT), {"x": Reference.literal(0)}))
+        builder.insert(IRScopeEnd(name, StructureType.FUNCTION))
+    return builder
+
+
+class TestRegions(unittest.TestCase):
+
+    def test_partition(self):
+        regions = partition_regions(_build().get_instructions())
+        # 区域包含紧邻的 FUNCTION 声明，嵌套作用域不单独成区域
+        self.assertEqual([(r.name, r.start, r.end) for r in regions], [("a", 1, 7), ("b", 7, 13)])
+
+    def test_only_changed_region_is_dirty(self):
+        builder = _build()
+        tracker = RegionTracker()
+        self.assertIsNone(tracker.get_dirty_regions("p", builder))
+        tracker.record_full_run("p", 1)
+
+        snapshot = tracker.snapshot(builder)
+        instructions = builder.get_instructions()
+        instructions[9:10] = []  # 删除 b 中条件作用域的 SCOPE_BEGIN/SCOPE_END
+        instructions[9:10] = []
+        tracker.record_changes(snapshot, builder, 2)
+        self.assertEqual([r.name for r in tracker.get_dirty_regions("p", builder)], ["b"])
+
+        # 全局语句被修改后需要在整个程序上重新运行
+        snapshot = tracker.snapshot(builder)
+        instructions[0] = IRAssign(Variable("g", PrimitiveDataType.INT), Reference.literal(1))
+        tracker.record_changes(snapshot, builder, 3)
+        self.assertIn(GLOBAL_REGION, tracker.region_versions)
+        self.assertIsNone(tracker.get_dirty_regions("p", builder))
+
+    def test_in_place_mutation_is_dirty(self):
+        builder = _build()
+        tracker = RegionTracker()
+        tracker.record_full_run("p", 1)
+
+        snapshot = tracker.snapshot(builder)
+        builder.get_instructions()[5].operands[2]["x"] = Reference.literal(1)  # a 中调用的参数字典
+        tracker.record_changes(snapshot, builder, 2)
+        self.assertEqual([r.name for r in tracker.get_dirty_regions("p", builder)], ["a"])
+
+        # Pass 报告了修改而快照中找不到差异时，所有区域都视为被修改
+        tracker.record_changes(tracker.snapshot(builder), builder, 3)
+        self.assertIsNone(tracker.get_dirty_regions("p", builder))
+
+
+class _GlobalReader(IROptimizationPass):
+    """记录运行时能否看到全局语句，并修改所在函数中的调用"""
+    seen: list[bool] = []
+
+    def __init__(self, builder: IRBuilder, config: CompileConfig):
+        super().__init__(builder, config)
+
+    def execute(self) -> bool:
+        instructions = self.builder.get_instructions()
+        type(self).seen.append(any(
+            instr.opcode is IROpCode.ASSIGN and instr.operands[0].name == "g" for instr in instructions
+        ))
+        for index, instr in enumerate(instructions):
+            if instr.opcode is IROpCode.CALL:
+                instructions[index] = IRCall(None, instr.operands[1], {})
+                return True
+        return False
+
+
+class _GlobalWriter(_GlobalReader):
+    """修改全局语句"""
+
+    def execute(self) -> bool:
+        self.builder.get_instructions()[0] = IRAssign(Variable("g", INT), Reference.literal(1))
+        return True
+
+
+class TestRegionRuns(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = OptimizationPipeline(CompileConfig("n", OptimizationLevel.O0, MinecraftVersion.instance("1.21.5")))
+
+    def test_region_run_sees_global_context(self):
+        builder = _build()
+        regions = partition_regions(builder.get_instructions())
+        _GlobalReader.seen = []
+        analysis, changed = self.pipeline._run_on_regions(_GlobalReader, builder, regions[1:])
+        self.assertEqual(_GlobalReader.seen, [True])
+        self.assertEqual(changed, {"b"})
+        calls = [instr.operands[2] for instr in builder.get_instructions() if instr.opcode is IROpCode.CALL]
+        self.assertEqual(calls, [{"x": Reference.literal(0)}, {}])
+
+    def test_region_run_modifying_globals_falls_back(self):
+        builder = _build()
+        before = list(builder.get_instructions())
+        self.assertIsNone(self.pipeline._run_on_regions(_GlobalWriter, builder, partition_regions(before)))
+        self.assertEqual(list(builder.get_instructions()), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
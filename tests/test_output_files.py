@@ -0,0 +1,150 @@
+# coding=utf-8
+"""
+输出文件增量写入测试
+
+测试策略：在临时目录中模拟多次生成，验证内容未变化时跳过写入、
+内容变化或文件被删除、被手动编辑时重新写入、孤立文件被删除、文件权限遵循 umask；.zip 输出不创建目录树且可复现；
+以及监视器能检测到文件变化。
+"""
+import os
+import stat
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+
+from dovetail.core.backend.output_files import OutputFiles, ZipOutputFiles
+from dovetail.utils.file_watcher import FileWatcher
+
+
+class TestOutputFiles(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / "ns"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _generate(self, files: dict[str, str]) -> OutputFiles:
+        """模拟一次生成：写入给定文件后结束"""
+        output_files = OutputFiles(self.root)
+        for relative, content in files.items():
+            output_files.write_text(self.root / relative, content)
+        output_files.finish()
+        return output_files
+
+    def test_unchanged_content_is_skipped(self):
+        path = self.root / "a" / "f.mcfunction"
+        self._generate({"a/f.mcfunction": "say 1"})
+        mtime = path.stat().st_mtime_ns
+
+        output_files = self._generate({"a/f.mcfunction": "say 1"})
+        self.assertEqual(path.stat().st_mtime_ns, mtime)
+        self.assertEqual((output_files.written, output_files.skipped), (0, 1))
+
+    def test_changed_content_is_written(self):
+        self._generate({"f.mcfunction": "say 1"})
+
+        output_files = self._generate({"f.mcfunction": "say 2"})
+        self.assertEqual(output_files.written, 1)
+        self.assertEqual((self.root / "f.mcfunction").read_text(encoding="utf-8"), "say 2")
+        # 原子替换不应残留临时文件
+        self.assertEqual([p.name for p in self.root.iterdir()], ["f.mcfunction"])
+
+    def test_deleted_file_is_rewritten(self):
+        self._generate({"f.mcfunction": "say 1"})
+        (self.root / "f.mcfunction").unlink()
+
+        self.assertEqual(self._generate({"f.mcfunction": "say 1"}).written, 1)
+        self.assertTrue((self.root / "f.mcfunction").is_file())
+
+    def test_edited_file_is_repaired(self):
+        path = self.root / "f.mcfunction"
+        self._generate({"f.mcfunction": "say 1"})
+        # 大小不变的编辑依靠修改时间识别
+        path.write_text("say 9", encoding="utf-8")
+        os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+
+        self.assertEqual(self._generate({"f.mcfunction": "say 1"}).written, 1)
+        self.assertEqual(path.read_text(encoding="utf-8"), "say 1")
+        self.assertEqual(self._generate({"f.mcfunction": "say 1"}).skipped, 1)
+
+    @unittest.skipUnless(os.name == "posix", "需要 POSIX 文件权限")
+    def test_file_mode_follows_umask(self):
+        umask = os.umask(0o027)
+        try:
+            self._generate({"f.mcfunction": "say 1"})
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE((self.root / "f.mcfunction").stat().st_mode), 0o640)
+
+    def test_orphans_are_removed(self):
+        self._generate({"keep.mcfunction": "say 1", "old/gone.mcfunction": "say 2"})
+        (self.root / "user.txt").write_text("not generated", encoding="utf-8")
+
+        output_files = self._generate({"keep.mcfunction": "say 1"})
+        self.assertEqual(output_files.removed, 1)
+        self.assertFalse((self.root / "old").exists())
+        # 未被清单记录的文件不受影响
+        self.assertTrue((self.root / "user.txt").is_file())
+
+    def test_failed_generation_keeps_orphans(self):
+        self._generate({"a.mcfunction": "say 1", "b.mcfunction": "say 2"})
+
+        output_files = OutputFiles(self.root)
+        output_files.write_text(self.root / "a.mcfunction", "say 1")
+        output_files.finish(remove_orphans=False)
+        self.assertTrue((self.root / "b.mcfunction").is_file())
+
+        # 下一次成功生成仍能识别并删除孤立文件
+        self.assertEqual(self._generate({"a.mcfunction": "say 1"}).removed, 1)
+
+    def _generate_zip(self, store_only: bool = False) -> bytes:
+        """模拟一次 .zip 生成，并从另一个 .zip 逐条复制依赖条目"""
+        dependency = self.root.parent / "dep.zip"
+        with zipfile.ZipFile(dependency, "w") as z:
+            z.writestr("dep/pack.mcmeta", "{}")
+            z.writestr("dep/data/d/function/f.mcfunction", "say dep")
+
+        output_files = ZipOutputFiles(self.root, store_only)
+        output_files.write_text(self.root / "data" / "ns" / "function" / "a.mcfunction", "say 1")
+        with zipfile.ZipFile(dependency) as z:
+            member = z.getinfo("dep/data/d/function/f.mcfunction")
+            output_files.copy_zip_member(z, member, self.root / "overlay" / "data" / "d" / "function" / "f.mcfunction")
+        output_files.finish()
+        return output_files.zip_path.read_bytes()
+
+    def test_zip_output(self):
+        data = self._generate_zip()
+
+        self.assertFalse(self.root.exists())
+        with zipfile.ZipFile(self.root.parent / "ns.zip") as z:
+            self.assertEqual(z.read("data/ns/function/a.mcfunction"), b"say 1")
+            self.assertEqual(z.read("overlay/data/d/function/f.mcfunction"), b"say dep")
+        # 条目时间戳固定，相同输入的输出逐字节一致
+        self.assertEqual(self._generate_zip(), data)
+
+    def test_zip_store_only(self):
+        self._generate_zip(store_only=True)
+
+        with zipfile.ZipFile(self.root.parent / "ns.zip") as z:
+            self.assertTrue(all(info.compress_type == zipfile.ZIP_STORED for info in z.infolist()))
+
+    def test_watcher_detects_changes(self):
+        kept = self.root.parent / "kept.mcdl"
+        edited = self.root.parent / "edited.mcdl"
+        kept.write_text("fn a() {}", encoding="utf-8")
+        edited.write_text("fn b() {}", encoding="utf-8")
+
+        watcher = FileWatcher()
+        watcher.watch([kept, edited])
+        self.assertEqual(watcher.poll(), [])
+
+        edited.write_text("fn b() { }", encoding="utf-8")
+        self.assertEqual(watcher.poll(), [edited])
+        self.assertEqual(watcher.poll(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
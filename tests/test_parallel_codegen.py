@@ -0,0 +1,76 @@
+# coding=utf-8
+"""
+并行指令生成测试
+
+测试策略：分别强制以 2 个工作进程与顺序方式编译同一个包含多个函数、tick 函数与标准库调用的程序，
+验证生成的数据包逐文件一致；环境变量不是整数时回退为顺序生成而不是中止编译。
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import main
+from dovetail.core.backend.base import Backend
+from dovetail.core.errors import report_count
+from dovetail.plugins.plugin_loader.loader import plugin_loader
+
+_EXAMPLE = Path(__file__).resolve().parent.parent / "examples" / "example3.mcdl"
+_SOURCE = (
+    "let counter = 0\n"
+    "@tick(20)\n"
+    "fn tick_a() { counter = counter + 1\n print(f\"a {counter}\") }\n"
+    "@tick(20)\n"
+    "fn tick_b() { print(f\"b {counter}\") }\n"
+)
+
+
+def _compile(directory: Path, workers: str) -> dict[str, bytes]:
+    """以指定的 DOVETAIL_CODEGEN_WORKERS 编译，返回 相对路径 → 文件内容"""
+    entry = directory / "main.mcdl"
+    output = directory / f"out_{workers}"
+    report_count.current = 0
+    with mock.patch.dict(os.environ, {"DOVETAIL_CODEGEN_WORKERS": workers}), \
+            mock.patch("dovetail.core.backend.output.download_dependencies", return_value=None):
+        exit_code = main.run([str(entry), "-o", str(output), "-O", "1", "--disable-info-logger"], load_plugins=False)
+    assert exit_code == 0, exit_code
+    return {
+        str(path.relative_to(output)): path.read_bytes()
+        for path in sorted(output.rglob("*")) if path.is_file() and "manifest" not in path.name
+    }
+
+
+class TestParallelCodegen(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        plugin_loader.load_plugin("plugin_loader")
+
+    def test_parallel_matches_serial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            shutil.copy(_EXAMPLE, directory / "main.mcdl")
+            with open(directory / "main.mcdl", "a", encoding="utf-8") as f:
+                f.write("\n" + _SOURCE)
+            serial = _compile(directory, "0")
+            with mock.patch.object(
+                    Backend, "_process_instructions_parallel", autospec=True,
+                    side_effect=Backend._process_instructions_parallel
+            ) as spy:
+                parallel = _compile(directory, "2")
+            self.assertTrue(spy.called)
+        self.assertGreater(len(serial), 10)
+        self.assertEqual(serial.keys(), parallel.keys())
+        for path, content in serial.items():
+            self.assertEqual(parallel[path], content, path)
+
+    def test_invalid_worker_count_falls_back_to_serial(self):
+        with mock.patch.dict(os.environ, {"DOVETAIL_CODEGEN_WORKERS": "auto"}):
+            with self.assertLogs("dovetail.core.backend.base", "WARNING"):
+                self.assertEqual(Backend._get_codegen_workers(100000), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# coding=utf-8
+"""
+AST 缓存与包含图预解析测试
+
+测试策略：在临时目录中构造入口文件与被包含文件，
+验证 include 扫描跳过注释、进程池预解析写入缓存、被包含文件变化后其缓存被识别为失效，
+以及旧版单段 pickle 格式的 .mcdc 文件被拒绝并按新格式重写。
+"""
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.parser.components import ErrorReporter
+from dovetail.core.parser.components.include_manager import IncludeManager
+from dovetail.core.parser.parser import (
+    _find_stale_files, _get_ast_cache_path, _is_ast_cache_valid, _compute_file_hash, _load_ast_cache,
+    _scan_includes, parser_code, parser_file, preparse_include_graph
+)
+
+_ENTRY = (
+    'include "lib.mcdl"\n'
+    '// include "commented.mcdl"\n'
+    '/* include "blocked.mcdl"\n'
+    '   include "blocked.mcdl" */\n'
+    'fn main() {}\n'
+)
+
+
+class TestParserCache(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.entry = self.root / "main.mcdl"
+        self.entry.write_text(_ENTRY, encoding="utf-8")
+        for name in ("lib", "commented", "blocked"):
+            (self.root / f"{name}.mcdl").write_text(f"fn {name}() {{}}\n", encoding="utf-8")
+        self.include_manager = IncludeManager(ErrorReporter(self.entry), self.entry, self.root)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_scan_skips_comments(self):
+        self.assertEqual(_scan_includes(_ENTRY), ["lib.mcdl"])
+
+    def test_changed_include_is_stale(self):
+        lib = (self.root / "lib.mcdl").resolve()
+        self.assertEqual(
+            sorted(_find_stale_files(self.entry, self.include_manager)), sorted([self.entry.resolve(), lib])
+        )
+
+        self.assertEqual(preparse_include_graph(self.entry, self.include_manager, max_workers=2), 2)
+        self.assertEqual(_find_stale_files(self.entry, self.include_manager), [])
+
+        lib.write_text("fn lib() { let x = 1 }\n", encoding="utf-8")
+        self.assertEqual(_find_stale_files(self.entry, self.include_manager), [lib])
+
+    def test_single_pickle_cache_is_rejected(self):
+        lib = self.root / "lib.mcdl"
+        code = lib.read_text(encoding="utf-8")
+        cache_path = _get_ast_cache_path(lib)
+        # 旧格式：只有一段序列化的 AST，没有文件头
+        with open(cache_path, "wb") as f:
+            pickle.dump(parser_code(code), f)
+
+        file_hash = _compute_file_hash(code)
+        self.assertFalse(_is_ast_cache_valid(cache_path, file_hash, "program"))
+        self.assertIsNone(_load_ast_cache(cache_path, file_hash, "program"))
+
+        self.assertIsNotNone(parser_file(lib))
+        with open(cache_path, "rb") as f:
+            self.assertIsInstance(pickle.load(f), dict)
+        self.assertTrue(_is_ast_cache_valid(cache_path, file_hash, "program"))
+
+
+if __name__ == '__main__':
+    unittest.main()
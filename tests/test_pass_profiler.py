@@ -0,0 +1,52 @@
+# coding=utf-8
+"""
+优化 Pass 性能分析测试
+
+测试策略：手工记录若干次 Pass 执行，验证汇总、表格与两种文件输出。
+"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.optimize.passes.constant_folding import ConstantFoldingPass
+from dovetail.core.optimize.passes.tail_call_optimization import TailCallOptimizationPass
+from dovetail.core.optimize.profiler import PassProfiler
+
+
+class TestPassProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = PassProfiler()
+        start = self.profiler.clock()
+        self.profiler.record(ConstantFoldingPass, 0, start, start + 0.003, 100, 90, True)
+        self.profiler.record(TailCallOptimizationPass, 0, start + 0.003, start + 0.004, 90, 90, False)
+        self.profiler.record(ConstantFoldingPass, 1, start + 0.004, start + 0.005, 90, 90, False)
+
+    def test_summarize(self):
+        summary = {item["name"]: item for item in self.profiler.summarize()}
+        folding = summary[ConstantFoldingPass.get_metadata().name]
+        self.assertEqual((folding["runs"], folding["changed_runs"], folding["instruction_delta"]), (2, 1, -10))
+        self.assertAlmostEqual(folding["total_time"], 0.004)
+        self.assertAlmostEqual(self.profiler.total_time(), 0.005)
+
+    def test_table_sorted_by_time(self):
+        lines = self.profiler.format_table().splitlines()
+        self.assertTrue(lines[2].startswith(ConstantFoldingPass.get_metadata().name))
+        self.assertTrue(lines[-1].startswith("合计"))
+
+    def test_write_files(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            report = Path(tmp) / "report.json"
+            trace = Path(tmp) / "trace.json"
+            self.profiler.write_json(report)
+            self.profiler.write_chrome_trace(trace)
+
+            self.assertEqual(len(json.loads(report.read_text(encoding="utf-8"))["records"]), 3)
+            events = json.loads(trace.read_text(encoding="utf-8"))["traceEvents"]
+            # 3 个执行事件 + 2 条迭代命名元数据
+            self.assertEqual([event["ph"] for event in events], ["X"] * 3 + ["M"] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
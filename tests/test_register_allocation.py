@@ -0,0 +1,125 @@
+# coding=utf-8
+"""
+记分板临时变量寄存器分配测试
+
+测试策略：手工构造函数区域，验证活跃区间不重叠的临时变量复用同一寄存器、
+被合并的临时变量的声明被删除，跨越调用和循环的临时变量不会被错误复用，
+以及存储寄存器在函数退出前被释放。
+"""
+import unittest
+
+from dovetail.core.enums import BinaryOps, PrimitiveDataType, VariableType
+from dovetail.core.enums.types import StructureType
+from dovetail.core.instructions import (
+    IRFunction, IRScopeBegin, IRScopeEnd, IRDeclare, IRBinaryOp, IRCall, IRReturn, IRCondJump, IRJump, IROpCode,
+    IRAssign
+)
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.core.optimize.register_allocation import allocate_registers
+from dovetail.core.symbols import Function, Variable, Reference
+
+INT = PrimitiveDataType.INT
+
+
+def _temp(name: str) -> Variable:
+    return Variable(name, INT, VariableType.TEMPORARY)
+
+
+def _add(result: Variable, left: Variable | int) -> list:
+    left_ref = Reference(left) if isinstance(left, Variable) else Reference.literal(left)
+    return [IRDeclare(result), IRBinaryOp(result, BinaryOps.ADD, left_ref, Reference.literal(1))]
+
+
+def _function(*body) -> IRBuilder:
+    func = Function("f", [], INT)
+    builder = IRBuilder()
+    builder.insert(IRFunction(func))
+    builder.insert(IRScopeBegin("f", StructureType.FUNCTION))
+    for instr in body:
+        builder.insert(instr)
+    builder.insert(IRScopeEnd("f", StructureType.FUNCTION))
+    return builder
+
+
+def _written(builder: IRBuilder) -> list[str]:
+    """按顺序列出被写入的变量名"""
+    return [
+        instr.operands[0].get_name() for instr in builder
+        if instr.opcode in (IROpCode.BINARY_OP, IROpCode.CALL) and instr.operands[0] is not None
+    ]
+
+
+class TestRegisterAllocation(unittest.TestCase):
+
+    def test_non_overlapping_temporaries_share_register(self):
+        a, b, c = _temp("a_0_"), _temp("b_1_"), _temp("c_2_")
+        builder = _function(*_add(a, 0), *_add(b, a), *_add(c, b), IRReturn(Reference(c)))
+
+        self.assertEqual(allocate_registers(builder), 3)
+        # 同一指令中读取与写入的变量不共用寄存器
+        self.assertEqual(_written(builder), ["#r0", "#r1", "#r0"])
+        self.assertFalse(any(instr.opcode == IROpCode.DECLARE for instr in builder))
+
+    def test_temporary_live_across_call_is_kept(self):
+        a, b, c = _temp("a_0_"), _temp("b_1_"), _temp("c_2_")
+        callee = Function("g", [], INT)
+        builder = _function(
+            *_add(a, 0),
+            IRDeclare(b), IRCall(b, callee, {}),
+            *_add(c, b),
+            IRReturn(Reference(a)),
+        )
+
+        allocate_registers(builder)
+        self.assertEqual(_written(builder), ["a_0_", "#r0", "#r1"])
+
+    def test_temporary_live_into_loop_is_not_reused(self):
+        outer, used, inner = _temp("outer_0_"), _temp("used_1_"), _temp("inner_2_")
+        cond = Variable("cond_3_", PrimitiveDataType.BOOLEAN, VariableType.TEMPORARY)
+        builder = _function(
+            *_add(outer, 0),
+            IRScopeBegin("check", StructureType.LOOP_CHECK),
+            IRScopeBegin("body", StructureType.LOOP_BODY),
+            # 循环体中最后一次读取循环外定义的临时变量之后，再写入另一个临时变量
+            *_add(used, outer),
+            *_add(inner, 0),
+            IRScopeEnd("body", StructureType.LOOP_BODY),
+            *_add(cond, Variable("n", INT)),
+            IRCondJump(Reference(cond), "body"),
+            IRCondJump(Reference(cond), "check"),
+            IRScopeEnd("check", StructureType.LOOP_CHECK),
+            IRJump("check"),
+        )
+
+        allocate_registers(builder)
+        registers = dict(zip(["outer", "used", "inner", "cond"], _written(builder)))
+        # 下一次迭代仍会读取 outer，不能与循环体中之后写入的 inner 共用寄存器
+        self.assertNotEqual(registers["outer"], registers["inner"])
+        # 条件在循环体执行之后还会被读取
+        self.assertNotIn(registers["cond"], (registers["used"], registers["inner"]))
+
+    def test_storage_slots_are_freed_before_return(self):
+        a = Variable("a_0_", PrimitiveDataType.STRING, VariableType.TEMPORARY)
+        b = Variable("b_1_", PrimitiveDataType.STRING, VariableType.TEMPORARY)
+        name = Variable("name", PrimitiveDataType.STRING)
+        builder = _function(
+            IRDeclare(a), IRAssign(a, Reference.literal("x")),
+            IRDeclare(name), IRAssign(name, Reference(a)),
+            IRDeclare(b), IRAssign(b, Reference(name)),
+            IRReturn(Reference(b)),
+        )
+
+        allocate_registers(builder)
+        opcodes = [instr.opcode for instr in builder]
+        self.assertEqual([instr.operands[0].get_name() for instr in builder if instr.opcode == IROpCode.ASSIGN],
+                         ["temp.s0", "name", "temp.s0"])
+        # 被返回的寄存器不能在 RETURN 之前释放，以 RETURN 结尾时函数作用域结束处不再释放
+        self.assertNotIn(IROpCode.FREE, opcodes)
+
+        builder = _function(IRDeclare(a), IRAssign(a, Reference.literal("x")), IRAssign(name, Reference(a)))
+        allocate_registers(builder)
+        self.assertEqual([repr(instr) for instr in builder][-2:], ["free temp.s0", "} // end scope f"])
+
+
+if __name__ == '__main__':
+    unittest.main()
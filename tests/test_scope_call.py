@@ -0,0 +1,63 @@
+# coding=utf-8
+"""
+作用域调用与控制流传播测试
+
+测试策略：手工构造函数、循环检查、循环体与分支作用域并写入控制流标志，
+验证调用命令按退出层数生成：无标志时直接调用，层数唯一时以 execute if function 返回，
+层数不唯一时暂存被调作用域的返回值，循环检查作用域的递归调用原样转交返回值。
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from dovetail.core.backend import GenerationContext
+from dovetail.core.compile_config import CompileConfig
+from dovetail.core.enums import OptimizationLevel, MinecraftVersion
+from dovetail.core.enums.types import StructureType
+from dovetail.core.ir_builder import IRBuilder
+from dovetail.plugins.je1215.backend.scope_call import (
+    RETURN_FLAG, CONTINUE_FLAG, EXIT_HOLDER, call_scope, exit_flag, exit_scope
+)
+
+
+class TestScopeCall(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        config = CompileConfig("ns", OptimizationLevel.O1, MinecraftVersion.instance("1.21.5"))
+        self.context = GenerationContext(config, Path(self._tmp.name), IRBuilder())
+        self.scopes = {}
+        for name, stype in (("f", StructureType.FUNCTION), ("check", StructureType.LOOP_CHECK),
+                            ("body", StructureType.LOOP_BODY), ("if_0", StructureType.CONDITIONAL)):
+            self.scopes[name] = self.context.create_scope(name, stype)
+            self.context.push_scope(self.scopes[name])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_exit_depths(self):
+        branch, body, check = self.scopes["if_0"], self.scopes["body"], self.scopes["check"]
+        self.assertEqual(call_scope(self.context, branch), ["function ns:ns/f/check/body/if_0"])
+
+        exit_scope(self.context, exit_flag(RETURN_FLAG, self.scopes["f"].get_absolute_path()), 3)
+        self.assertEqual(branch.commands, ["return 3"])
+        self.assertEqual(
+            call_scope(self.context, branch), ["execute if function ns:ns/f/check/body/if_0 run return 2"]
+        )
+
+        # 同一分支既可能 return 也可能 continue，返回值由运行时决定
+        exit_scope(self.context, exit_flag(CONTINUE_FLAG, body.get_absolute_path()), 1)
+        commands = call_scope(self.context, branch)
+        self.assertEqual(len(commands), 3)
+        self.assertIn(f"store result score {EXIT_HOLDER}", commands[1])
+        self.assertTrue(commands[2].endswith(f"return run scoreboard players remove {EXIT_HOLDER} dovetail 1"))
+
+        # 循环检查作用域的递归调用原样转交返回值
+        check.flags[exit_flag(RETURN_FLAG, self.scopes["f"].get_absolute_path())] = 1
+        self.assertEqual(
+            call_scope(self.context, check, offset=0), ["execute if function ns:ns/f/check run return 1"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
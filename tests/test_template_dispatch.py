@@ -0,0 +1,71 @@
+# coding=utf-8
+"""
+模板引擎按取值分派测试
+
+测试策略：直接渲染模板字符串，验证取值有限的变量参数先复制到临时记分项，
+再展开为以复制的值为条件的普通命令，取值未知、多行或含 return 的模板仍走宏调用。
+"""
+import unittest
+
+from dovetail.core.enums import PrimitiveDataType
+from dovetail.plugins.je1215.backend.commands.builtins.template.parameter import (
+    TemplateParameter, ParamBindingType, get_value_domain
+)
+from dovetail.plugins.je1215.backend.commands.builtins.template.template_engine import TemplateEngine
+
+
+def _variable(name: str, path: str, dtype: PrimitiveDataType) -> TemplateParameter:
+    return TemplateParameter(
+        name, None, ParamBindingType.REFERENCE, path, "obj", dtype, get_value_domain(dtype)
+    )
+
+
+class TestTemplateDispatch(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = TemplateEngine("ns", "obj")
+
+    def test_boolean_parameters_are_dispatched(self):
+        commands = self.engine.render(
+            "gamerule $(rule) $(flag)$(other)", "test/gamerule",
+            {
+                "rule": TemplateParameter.literal("rule", "doDaylightCycle"),
+                "flag": _variable("flag", "ns.main.flag", PrimitiveDataType.BOOLEAN),
+                "other": _variable("other", "ns.main.other", PrimitiveDataType.BOOLEAN),
+            }
+        )
+        self.assertEqual(len(commands), 6)
+        self.assertEqual(commands[:2], [
+            "scoreboard players operation #dispatch_1 obj = ns.main.flag obj",
+            "scoreboard players operation #dispatch_2 obj = ns.main.other obj",
+        ])
+        self.assertEqual(
+            commands[3],
+            "execute if score #dispatch_1 obj matches 0 if score #dispatch_2 obj matches 1 "
+            "run gamerule doDaylightCycle 01"
+        )
+        self.assertFalse(any("with storage" in command for command in commands))
+
+    def test_guards_do_not_read_written_parameter(self):
+        # 分派的命令修改参数自身时，后面的变体不能因此被执行
+        commands = self.engine.render(
+            "scoreboard players add ns.main.flag obj $(flag)", "test/toggle",
+            {"flag": _variable("flag", "ns.main.flag", PrimitiveDataType.BOOLEAN)}
+        )
+        self.assertEqual(commands[0], "scoreboard players operation #dispatch_1 obj = ns.main.flag obj")
+        self.assertTrue(all(command.startswith("execute if score #dispatch_1 obj ") for command in commands[1:]))
+
+    def test_unbounded_or_unsafe_templates_use_macro(self):
+        flag = _variable("flag", "ns.main.flag", PrimitiveDataType.BOOLEAN)
+        count = _variable("count", "ns.main.count", PrimitiveDataType.INT)
+        for template, params in (
+                ("say $(count)", {"count": count}),
+                ("say $(flag)\nsay done", {"flag": flag}),
+                ("return $(flag)", {"flag": flag}),
+        ):
+            commands = self.engine.render(template, "test/macro", params)
+            self.assertIn("with storage", commands[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
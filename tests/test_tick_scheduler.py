@@ -0,0 +1,41 @@
+# coding=utf-8
+"""
+tick 调度器测试
+
+测试策略：验证相同间隔的函数被分配到不同相位、不同间隔之间按超周期内的负载错开，
+并检查生成的调度函数与开销报告中的峰值开销反映错开后的结果。
+"""
+import unittest
+
+from dovetail.core.backend.cost import CostAnalyzer
+from dovetail.plugins.je1215.backend.tick_scheduler_writer import TickSchedulerWriter, assign_phases, schedule_ticks
+
+
+class TestTickScheduler(unittest.TestCase):
+
+    def test_assign_phases(self):
+        self.assertEqual(assign_phases([20, 20, 20]), [0, 1, 2])
+        self.assertEqual(assign_phases([1, 2, 2, 2]), [0, 0, 1, 0])
+        # 40 的相位避开两个 20 已占用的 0、1、20、21
+        self.assertEqual(assign_phases([40, 20, 20]), [2, 0, 1])
+
+    def test_scheduler_commands(self):
+        writer = TickSchedulerWriter([("every", 1), ("a", 20), ("b", 20), ("c", 40)])
+        commands = writer.build_commands("ns", "obj")
+        self.assertEqual(commands[:3], [
+            "scoreboard players add #dovetail.tick obj 1",
+            "execute if score #dovetail.tick obj matches 40.. run scoreboard players set #dovetail.tick obj 0",
+            "function ns:every",
+        ])
+        self.assertIn("execute if score #dovetail.tick.20 obj matches 1 run function ns:b", commands)
+        self.assertEqual(commands[-1], "execute if score #dovetail.tick obj matches 2 run function ns:c")
+
+    def test_staggered_peak_cost(self):
+        functions = {f"ns:{name}": ["scoreboard players set a x 1"] for name in "abc"}
+        ticks = [(f"ns:{path}", interval) for path, interval in (("a", 20), ("b", 20), ("c", 20))]
+        self.assertEqual(CostAnalyzer().analyze(functions, ticks).peak_tick_cost(), 3)
+        self.assertEqual(CostAnalyzer().analyze(functions, schedule_ticks(ticks)).peak_tick_cost(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()